@@ -0,0 +1,88 @@
+"""자동 저장 벤치마크 (변경마다 바로 기록 vs 모아서 기록).
+
+큰 데이터 파일 위에서 카드를 한 장씩 추가하면서 append()가 돌아오기까지의 시간과
+실제 파일 기록 횟수를 잰다. 자동 저장은 append()가 메모리만 바꾸고 바로 돌아오며,
+연달아 들어온 변경은 AutoSaver가 한 번에 기록한다.
+
+    python benchmarks/bench_autosave.py --rows 100000 --appends 50
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+logging.disable(logging.WARNING)
+from card_magic_core import open_store  # noqa: E402
+from datagen import make_data  # noqa: E402
+
+
+def make_row(i):
+    return {'카드명': f"Bench Deck {i}", '구매가격($)': 10.0, '현재가격($)': 12.0 + i % 5, '제조사': "Bicycle"}
+
+
+def count_writes(backend, writes):
+    """저장소가 부른 기록(append/save) 횟수 세기 (append 안에서 부르는 save는 한 번으로 친다)"""
+    depth = [0]
+
+    def wrap(method):
+        def counted(*args, **kwargs):
+            if not depth[0]:
+                writes.append(method.__name__)
+            depth[0] += 1
+            try:
+                return method(*args, **kwargs)
+            finally:
+                depth[0] -= 1
+        return counted
+
+    backend.append = wrap(backend.append)
+    backend.save = wrap(backend.save)
+
+
+def bench(storage, rows, appends, autosave):
+    os.chdir(tempfile.mkdtemp())
+    open_store("", storage).put(make_data(rows, rows // 10, rows // 20))
+    store = open_store("", storage, autosave=autosave)
+    store.refresh()
+    writes = []
+    count_writes(store.backend, writes)
+
+    times = []
+    for i in range(appends):
+        start = time.perf_counter()
+        store.append([('insert', 'card_collection', make_row(i))])
+        times.append(time.perf_counter() - start)
+    # 남은 변경까지 파일에 기록될 때까지
+    start = time.perf_counter()
+    store.flush()
+    drain = time.perf_counter() - start
+
+    check = open_store("", storage)
+    check.refresh()
+    assert len(check.table('card_collection')) == rows + appends
+    return times, len(writes), drain
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--appends", type=int, default=50)
+    parser.add_argument("--window", type=float, default=0.5, help="자동 저장 간격(초)")
+    parser.add_argument("--storage", default="journal,pickle,sqlite")
+    args = parser.parse_args()
+
+    print(f"rows: {args.rows}, appends: {args.appends}")
+    print(f"{'storage':<8} {'mode':<9} {'median ms':>10} {'max ms':>8} {'writes':>7} {'drain ms':>9}")
+    for storage in args.storage.split(","):
+        for mode, autosave in (("sync", None), ("autosave", args.window)):
+            times, writes, drain = bench(storage, args.rows, args.appends, autosave)
+            print(f"{storage:<8} {mode:<9} {statistics.median(times) * 1000:>10.2f} "
+                  f"{max(times) * 1000:>8.2f} {writes:>7} {drain * 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
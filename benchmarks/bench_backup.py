@@ -0,0 +1,92 @@
+"""전체 백업 vs 변경분 백업 벤치마크.
+
+큰 컬렉션을 전체 백업한 뒤 하루치 변경(추가/수정/삭제)을 주고 변경분 백업을 만든다.
+파일 크기와 만드는 시간, 체인 검사(데이터를 불러오지 않음) 시간, 체인 복원 시간을 잰다.
+
+    python benchmarks/bench_backup.py --rows 100000 --days 7 --changes 50
+"""
+import argparse
+import io
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+logging.disable(logging.WARNING)
+from card_magic_core import (  # noqa: E402
+    ROW_ID, Library, open_store, restore_backup, scan_backup_chain,
+)
+from datagen import make_data  # noqa: E402
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def write_backup(library, base=None):
+    buffer = io.BytesIO()
+    index, seconds = timed(lambda: library.write_backup(buffer, base))
+    buffer.seek(0)
+    return buffer, index, seconds
+
+
+def change_day(library, day, changes):
+    """하루치 변경: 카드 추가, 가격 수정, 삭제를 changes개씩"""
+    cards = library.store.table('card_collection')
+    ids = cards[ROW_ID].tolist()
+    start = day * changes * 2
+    library.store.append([
+        ('extend', 'card_collection', make_data(changes, 0, 0)['card_collection']),
+        ('edit', 'card_collection', [(row_id, {'현재가격($)': 100.0 + day}) for row_id in ids[start:start + changes]]),
+        ('remove', 'card_collection', ids[start + changes:start + changes * 2]),
+    ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--changes", type=int, default=50, help="하루에 추가/수정/삭제하는 행 수 (각각)")
+    parser.add_argument("--storage", default="journal", choices=["journal", "pickle", "sqlite"])
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp())
+    open_store("", args.storage).put(make_data(args.rows, args.rows // 10, args.rows // 20))
+    library = Library.open("", args.storage)
+
+    full, index, full_seconds = write_backup(library)
+    chain = [full]
+    print(f"rows: {args.rows}, {args.days} days × {args.changes} adds/edits/removes")
+    print(f"{'backup':<10} {'bytes':>12} {'write ms':>9}")
+    print(f"{'full':<10} {len(full.getvalue()):>12,} {full_seconds * 1000:>9.1f}")
+    full_sizes = []
+    for day in range(args.days):
+        change_day(library, day, args.changes)
+        delta, index, seconds = write_backup(library, index)
+        chain.append(delta)
+        print(f"{f'delta {day + 1}':<10} {len(delta.getvalue()):>12,} {seconds * 1000:>9.1f}")
+        # 같은 날 전체 백업을 했다면
+        full_sizes.append(len(write_backup(library)[0].getvalue()))
+
+    chain_bytes = sum(len(f.getvalue()) for f in chain)
+    print(f"chain total {chain_bytes:,} bytes vs daily full backups {len(full.getvalue()) + sum(full_sizes):,} bytes")
+    _, verify = timed(lambda: scan_backup_chain(chain))
+    _, deep = timed(lambda: scan_backup_chain(chain, track_rows=True))
+    print(f"verify chain:        {verify * 1000:8.1f} ms")
+    print(f"verify + row hashes: {deep * 1000:8.1f} ms")
+
+    expected = library.store.table('card_collection')[ROW_ID].tolist()
+    _, restore_chain = timed(lambda: library.restore_chain(chain))
+    assert library.store.table('card_collection')[ROW_ID].tolist() == expected
+    last_full = write_backup(library)[0]
+    _, restore_full = timed(lambda: restore_backup(library.store, last_full))
+    print(f"restore chain:       {restore_chain * 1000:8.1f} ms")
+    print(f"restore full:        {restore_full * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
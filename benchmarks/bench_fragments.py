@@ -0,0 +1,155 @@
+"""버튼 한 번의 왕복 지연 벤치마크 (실제 Streamlit 서버).
+
+앱을 headless 서버로 띄우고 브라우저 대신 웹소켓으로 위젯 조작을 보내서
+조작을 보낸 순간부터 서버가 실행 완료(script_finished)를 알릴 때까지를 잰다.
+위젯이 st.fragment 안에 있으면 브라우저처럼 그 조각 ID를 실어 보내므로 조각만 다시 실행되고,
+예전 앱처럼 st.rerun()을 부르면 이어지는 두 번째 실행까지 포함된다.
+
+    python benchmarks/bench_fragments.py --rows 100000
+    git show HEAD~1:card_magic_app.py > /tmp/old_app.py
+    python benchmarks/bench_fragments.py --rows 100000 --app /tmp/old_app.py   # 이전 버전과 비교
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, APP_DIR)
+from card_magic_core import open_store  # noqa: E402
+from datagen import make_data  # noqa: E402
+
+# st.rerun()으로 끊긴 실행은 이어지는 다음 실행까지 기다린다
+RERUN_STATUS = ForwardMsg.FINISHED_EARLY_FOR_RERUN
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(app, port, workdir, storage):
+    env = dict(os.environ, CARD_MAGIC_STORAGE=storage, PYTHONPATH=APP_DIR)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", app, "--server.headless", "true",
+         "--server.port", str(port), "--server.fileWatcherType", "none",
+         "--browser.gatherUsageStats", "false"],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1)
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("서버가 시작되지 않았습니다")
+
+
+class Session:
+    """브라우저 탭 하나처럼 위젯 상태를 들고 있다가 조작마다 rerun 요청을 보낸다"""
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.states = {}
+        self.widgets = {}
+
+    async def run(self, fragment_id=""):
+        msg = BackMsg()
+        msg.rerun_script.widget_states.widgets.extend(self.states.values())
+        msg.rerun_script.fragment_id = fragment_id
+        start = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+        while True:
+            fwd = ForwardMsg()
+            fwd.ParseFromString(await self.ws.recv())
+            kind = fwd.WhichOneof('type')
+            if kind == 'delta' and fwd.delta.WhichOneof('type') == 'new_element':
+                element = fwd.delta.new_element
+                proto = getattr(element, element.WhichOneof('type'))
+                if element.WhichOneof('type') == 'exception':
+                    raise RuntimeError(f"앱 오류: {proto.message}")
+                if getattr(proto, 'id', "") and getattr(proto, 'label', ""):
+                    self.widgets[proto.label] = (proto.id, fwd.delta.fragment_id)
+            elif kind == 'script_finished' and fwd.script_finished != RERUN_STATUS:
+                break
+        elapsed = time.perf_counter() - start
+        # 버튼 클릭은 한 번만 전달된다
+        self.states = {k: v for k, v in self.states.items() if not v.HasField('trigger_value')}
+        return elapsed
+
+    def set(self, label, **value):
+        widget_id, fragment_id = self.widgets[label]
+        state = WidgetState(id=widget_id, **value)
+        self.states[widget_id] = state
+        return fragment_id
+
+    async def click(self, label):
+        return await self.run(self.set(label, trigger_value=True))
+
+    async def select(self, label, value):
+        return await self.run(self.set(label, string_value=value))
+
+
+async def measure(port, repeat):
+    results = {}
+    async with websockets.connect(f"ws://127.0.0.1:{port}/_stcore/stream", max_size=None) as ws:
+        session = Session(ws)
+        await session.run()
+        await session.select("페이지 선택", "🃏 Card Collection")
+        results['full rerun (page select)'] = [await session.select("페이지 선택", "🃏 Card Collection")
+                                               for _ in range(repeat)]
+        results['▶️ 다음'] = [await session.click("▶️ 다음") for _ in range(repeat)]
+        results['◀️ 이전'] = [await session.click("◀️ 이전") for _ in range(repeat)]
+        sorts = ["현재가격($)", "카드명"]
+        results['정렬 기준 변경'] = [await session.select("정렬 기준", sorts[i % 2]) for i in range(repeat)]
+        adds = []
+        for i in range(repeat):
+            # 폼 안의 입력은 제출 버튼과 함께 전달된다 (예전 앱은 입력할 때마다 rerun)
+            session.set("카드명", string_value=f"Bench Deck {i}")
+            adds.append(await session.click("카드 추가"))
+        results['카드 추가'] = adds
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--storage", default="journal", choices=["journal", "pickle", "sqlite"])
+    parser.add_argument("--app", default=os.path.join(APP_DIR, "card_magic_app.py"))
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    os.chdir(workdir)
+    open_store("", args.storage).put(make_data(args.rows, args.rows // 10, args.rows // 20))
+    port = free_port()
+    server = start_server(os.path.abspath(args.app), port, workdir, args.storage)
+    try:
+        results = asyncio.run(measure(port, args.repeat))
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"app:  {args.app}")
+    print(f"rows: {args.rows} ({args.storage})")
+    for name, times in results.items():
+        print(f"{name:<28} median {statistics.median(times) * 1000:8.1f} ms   max {max(times) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""카드 사진 저장소 벤치마크.
+
+사진을 여러 카드에 붙이면서 중복 제거로 실제로 저장된 원본 수를 세고,
+썸네일을 작업자 풀로 만들 때와 하나씩 만들 때의 시간,
+캐시 적중/디스크 읽기 지연, 목록 한 페이지의 썸네일을 불러오는 시간을 잰다.
+
+    python benchmarks/bench_images.py --photos 40 --rows 2000
+"""
+import argparse
+import io
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+logging.disable(logging.WARNING)
+from card_magic_core import IMAGE_WORKERS, ImageStore  # noqa: E402
+
+
+def make_photo(i, size):
+    """카메라 사진 크기의 JPEG (사진마다 내용이 달라야 중복으로 걸러지지 않는다)"""
+    image = Image.linear_gradient('L').resize(size).convert('RGB')
+    image.paste((i * 37 % 256, i * 91 % 256, i * 13 % 256), (0, 0, size[0] // 4, size[1] // 4))
+    buffer = io.BytesIO()
+    image.save(buffer, 'JPEG', quality=90)
+    return buffer.getvalue()
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def build_all(photos, workers):
+    """사진을 모두 저장하고 썸네일이 다 만들어질 때까지의 시간"""
+    store = ImageStore(tempfile.mkdtemp(), workers=workers)
+    start = time.perf_counter()
+    digests = [store.put(photo) for photo in photos]
+    for digest in digests:
+        store.build_thumbnails(digest).result()
+    return store, digests, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--photos", type=int, default=40)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument("--width", type=int, default=3000)
+    parser.add_argument("--height", type=int, default=2000)
+    args = parser.parse_args()
+
+    photos = [make_photo(i, (args.width, args.height)) for i in range(args.photos)]
+    print(f"photos: {args.photos} × {args.width}x{args.height} "
+          f"({sum(map(len, photos)) / 1e6:.1f} MB), rows: {args.rows}")
+    _, _, serial = build_all(photos, 1)
+    store, digests, pooled = build_all(photos, IMAGE_WORKERS)
+    print(f"thumbnails serial:  {serial * 1000:8.1f} ms")
+    print(f"thumbnails pool:    {pooled * 1000:8.1f} ms ({store.workers} workers)")
+
+    # 행마다 같은 사진을 돌려 붙인다 (원본은 사진 수만큼만 저장된다)
+    _, attach = timed(lambda: [store.attach('card_collection', [row_id], photos[row_id % args.photos])
+                               for row_id in range(args.rows)])
+    objects = sum(len(files) for _, _, files in os.walk(os.path.join(store.path, "objects")))
+    print(f"attach {args.rows} rows: {attach * 1000:8.1f} ms, stored originals: {objects}")
+
+    store.cache.clear()
+    store.cached_bytes = 0
+    disk = [timed(lambda d=d: store.thumbnail(d))[1] for d in digests]
+    hits = [timed(lambda d=d: store.thumbnail(d))[1] for d in digests]
+    print(f"thumbnail disk read median {statistics.median(disk) * 1e6:8.1f} us")
+    print(f"thumbnail cache hit median {statistics.median(hits) * 1e6:8.1f} us")
+
+    def load_page(page):
+        row_ids = range(page * args.page_size, (page + 1) * args.page_size)
+        images = store.images('card_collection', row_ids)
+        return store.thumbnails([found[0] for found in images.values()])
+    pages = [timed(lambda p=p: load_page(p))[1] for p in range(args.rows // args.page_size)]
+    print(f"page thumbnails median {statistics.median(pages) * 1000:8.2f} ms (page size {args.page_size})")
+
+
+if __name__ == "__main__":
+    main()
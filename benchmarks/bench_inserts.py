@@ -0,0 +1,64 @@
+"""순차 행 추가 벤치마크.
+
+행마다 pd.concat 하는 기존 방식과 AppendBuffer를 비교한다.
+AppendBuffer는 행 수가 늘어도 행당 시간이 거의 일정해야 한다(선형).
+
+    python benchmarks/bench_inserts.py --rows 10000
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+logging.disable(logging.WARNING)
+from card_magic_core import TABLE_COLUMNS, AppendBuffer  # noqa: E402
+
+
+def make_row(i):
+    return {
+        '카드명': f"Deck {i}", '구매가격($)': 10.0 + i % 7, '현재가격($)': 12.0 + i % 11,
+        '제조사': "Bicycle", '단종여부': "현재판매", '개봉여부': "미개봉", '판매사이트': "",
+        '디자인별점': 3.5, '피니시': "Standard", '디자인스타일': "클래식",
+    }
+
+
+def bench_concat(rows):
+    df = pd.DataFrame(columns=TABLE_COLUMNS['card_collection'])
+    start = time.perf_counter()
+    for i in range(rows):
+        df = pd.concat([df, pd.DataFrame([make_row(i)])], ignore_index=True)
+    return time.perf_counter() - start
+
+
+def bench_buffer(rows):
+    buffer = AppendBuffer(pd.DataFrame(columns=TABLE_COLUMNS['card_collection']))
+    start = time.perf_counter()
+    for i in range(rows):
+        buffer.append(make_row(i))
+    frame = buffer.frame()
+    assert len(frame) == rows
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--skip-concat", action="store_true", help="느린 pd.concat 방식 생략")
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'buffer ms':>10} {'us/row':>8} {'concat ms':>10} {'us/row':>8}")
+    for rows in (args.rows // 8, args.rows // 4, args.rows // 2, args.rows):
+        buffer_time = bench_buffer(rows)
+        line = f"{rows:>8} {buffer_time * 1000:>10.1f} {buffer_time / rows * 1e6:>8.2f}"
+        if not args.skip_concat:
+            concat_time = bench_concat(rows)
+            line += f" {concat_time * 1000:>10.1f} {concat_time / rows * 1e6:>8.2f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""가격 이력 벤치마크.
+
+덱 여러 개의 현재가격이 매일 일부만 바뀌는 상황을 며칠치 스냅샷으로 기록한 뒤
+디스크 사용량(매일 전체를 저장할 때와 비교)과 카드/제조사/포트폴리오 조회 시간을 잰다.
+
+    python benchmarks/bench_prices.py --decks 10000 --days 730
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+logging.disable(logging.WARNING)
+from card_magic_core import PRICE_COLUMNS, ROW_ID, PriceHistory, today_day  # noqa: E402
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--decks", type=int, default=10000)
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--change", type=float, default=0.03, help="하루에 가격이 바뀌는 덱 비율")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    cards = pd.DataFrame({
+        ROW_ID: np.arange(args.decks),
+        '카드명': [f"Deck {i}" for i in range(args.decks)],
+        '제조사': rng.choice(["Bicycle", "Theory11", "Ellusionist", "D&D", "Fontaine"], args.decks),
+        '현재가격($)': rng.uniform(5, 80, args.decks).round(2).astype(np.float32),
+    })
+    prices = PriceHistory(os.path.join(tempfile.mkdtemp(), "prices"))
+    first_day = today_day() - args.days + 1
+
+    start = time.perf_counter()
+    for day in range(first_day, first_day + args.days):
+        changed = rng.random(args.decks) < args.change
+        walk = rng.normal(1.0, 0.05, changed.sum()).astype(np.float32)
+        cards.loc[changed, '현재가격($)'] = (cards.loc[changed, '현재가격($)'] * walk).round(2)
+        prices.observe(cards, day=day)
+    snapshot_time = (time.perf_counter() - start) / args.days
+
+    stored = sum(os.path.getsize(prices._file(column)) for column in PRICE_COLUMNS)
+    full = args.decks * args.days * sum(np.dtype(dtype).itemsize for dtype in PRICE_COLUMNS.values())
+
+    reader = PriceHistory(prices.path)
+    card_time, history = timed(lambda: reader.history(["Deck 42"]))
+    maker_time, maker = timed(lambda: reader.history(manufacturer="Bicycle", start=today_day() - 30))
+    portfolio_time, series = timed(lambda: reader.portfolio())
+    year_time, _ = timed(lambda: reader.portfolio("Bicycle", start=today_day() - 365))
+
+    print(f"decks x days:             {args.decks} x {args.days} (change {args.change:.0%}/day)")
+    print(f"daily snapshot:           {snapshot_time * 1000:8.2f} ms")
+    print(f"stored rows:              {len(reader):,} ({stored / 1024 ** 2:.1f}MB, "
+          f"full daily snapshots {full / 1024 ** 2:.1f}MB)")
+    print(f"one card history:         {card_time * 1000:8.2f} ms ({len(history)} points)")
+    print(f"manufacturer, 30 days:    {maker_time * 1000:8.2f} ms ({len(maker)} rows)")
+    print(f"portfolio, all days:      {portfolio_time * 1000:8.2f} ms ({len(series)} chart points)")
+    print(f"portfolio, maker, 1 year: {year_time * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""목록 조회 캐시 벤치마크.
+
+필터/정렬 조건이 같은 상태에서 페이지만 넘길 때(캐시 적중)와
+조건이 바뀌어 다시 필터링/정렬할 때(캐시 미스)의 TableQuery 시간을 비교한다.
+
+    python benchmarks/bench_query.py --rows 200000
+"""
+import argparse
+import logging
+import os
+import pickle
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+logging.disable(logging.WARNING)
+
+
+def run_listing(app, manufacturer, page):
+    """카드 목록 화면 한 번의 rerun에서 하는 조회"""
+    query = app.TableQuery('card_collection', [('제조사', '==', manufacturer)], '현재가격($)', ascending=True)
+    query.count()
+    query.aggregate('sum', '구매가격($)')
+    query.aggregate('sum', '현재가격($)')
+    return query.page(page * 10, 10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--pages", type=int, default=20)
+    args = parser.parse_args()
+
+    from bench_rerun import make_data
+    os.chdir(tempfile.mkdtemp())
+    os.environ["CARD_MAGIC_STORAGE"] = "journal"
+    with open("card_magic_data.pkl", "wb") as f:
+        pickle.dump(make_data(args.rows), f)
+    import card_magic_app as app
+    app.get_data_store().refresh()
+
+    start = time.perf_counter()
+    run_listing(app, "Bicycle", 0)
+    miss = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for page in range(1, args.pages + 1):
+        run_listing(app, "Bicycle", page)
+    hit = (time.perf_counter() - start) / args.pages
+
+    # 다른 표가 바뀌어도 카드 조회 결과는 그대로 재사용
+    app.get_data_store().append([('insert', 'wishlist', {'이름': "bench", '가격($)': 1.0})])
+    start = time.perf_counter()
+    run_listing(app, "Bicycle", 1)
+    other_table = time.perf_counter() - start
+
+    print(f"rows:                     {args.rows}")
+    print(f"new filter (cache miss):  {miss * 1000:8.2f} ms")
+    print(f"page click (cache hit):   {hit * 1000:8.2f} ms")
+    print(f"after wishlist insert:    {other_table * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""콜드 vs 웜 rerun 벤치마크.
+
+대용량 데이터 파일을 만든 뒤 AppTest로 앱을 헤드리스 실행하여
+첫 실행(파일 로드)과 이후 rerun(공유 저장소 재사용)의 시간을 비교한다.
+
+    python benchmarks/bench_rerun.py --rows 50000
+"""
+import argparse
+import logging
+import os
+import pickle
+import sys
+import tempfile
+import time
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from datagen import make_data
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "card_magic_app.py")
+
+
+def timed_run(at):
+    start = time.perf_counter()
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--reruns", type=int, default=5)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    workdir = tempfile.mkdtemp()
+    os.chdir(workdir)
+    with open("card_magic_data.pkl", "wb") as f:
+        pickle.dump(make_data(args.rows), f)
+
+    start = time.perf_counter()
+    with open("card_magic_data.pkl", "rb") as f:
+        pickle.load(f)
+    unpickle = time.perf_counter() - start
+
+    st.cache_resource.clear()
+    at = AppTest.from_file(APP_PATH, default_timeout=120)
+    cold = timed_run(at)
+    warm = [timed_run(at) for _ in range(args.reruns)]
+
+    print(f"rows:            {args.rows}")
+    print(f"pickle.load:     {unpickle * 1000:8.1f} ms")
+    print(f"cold run:        {cold * 1000:8.1f} ms")
+    print(f"warm rerun (avg):{sum(warm) / len(warm) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
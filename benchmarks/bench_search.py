@@ -0,0 +1,73 @@
+"""검색 색인 벤치마크.
+
+SearchIndex 생성 시간과 검색어별 지연을 str.contains 전체 스캔과 비교한다.
+
+    python benchmarks/bench_search.py --rows 100000
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+logging.disable(logging.WARNING)
+from card_magic_core import SEARCH_FIELDS, SearchIndex  # noqa: E402
+
+WORDS = ["바이시클", "레드", "블루", "골드", "빈티지", "Bicycle", "Theory", "Monarch", "Ghost", "Royal"]
+QUERIES = ["바이시클", "ㅂㅇㅅㅋ", "ghost", "Deck 4242", "빈티지 골드", "없는검색어"]
+
+
+def make_cards(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    first = rng.choice(WORDS, rows)
+    second = rng.choice(WORDS, rows)
+    return pd.DataFrame({
+        '카드명': [f"{a} {b} Deck {i}" for i, (a, b) in enumerate(zip(first, second))],
+        '제조사': rng.choice(["Bicycle", "Theory11", "Ellusionist", "D&D"], rows),
+        '디자인스타일': rng.choice(["클래식", "모던", "빈티지"], rows),
+        '피니시': rng.choice(["Standard", "Air Cushion", "Linen"], rows),
+    })
+
+
+def scan(df, query):
+    mask = np.zeros(len(df), dtype=bool)
+    for field in SEARCH_FIELDS['card_collection']:
+        mask |= df[field].str.contains(query, case=False, na=False, regex=False).to_numpy()
+    return np.flatnonzero(mask)
+
+
+def timed(func, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    args = parser.parse_args()
+
+    df = make_cards(args.rows)
+    index = SearchIndex(SEARCH_FIELDS['card_collection'])
+    start = time.perf_counter()
+    index.extend(df)
+    print(f"index build: {time.perf_counter() - start:.2f}s for {args.rows} rows")
+
+    print(f"{'query':<14} {'hits':>7} {'index ms':>9} {'cached ms':>10} {'scan ms':>9}")
+    for query in QUERIES:
+        # 결과 캐시를 비워 매번 색인 조회부터 측정
+        index_time, positions = timed(lambda: (index.cache.clear(), index.search(query))[1])
+        cached_time, _ = timed(lambda: index.search(query))
+        scan_time, _ = timed(lambda: scan(df, query))
+        print(f"{query:<14} {len(positions):>7} {index_time * 1000:>9.2f} {cached_time * 1000:>10.3f} {scan_time * 1000:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""콜드 스타트 벤치마크.
+
+새 파이썬 프로세스에서 앱 모듈을 import하는 시간과 첫 화면을 그리는 시간을 잰다.
+`python -X importtime` 출력을 모아 최상위 모듈별 누적 import 시간(여러 번 실행한 중앙값)도 보여준다.
+
+    python benchmarks/bench_startup.py --repeat 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(APP_DIR, "card_magic_app.py")
+
+IMPORT_APP = f"import sys; sys.path.insert(0, {APP_DIR!r}); import card_magic_app"
+FIRST_RUN = (
+    "import logging; logging.disable(logging.WARNING)\n"
+    "from streamlit.testing.v1 import AppTest\n"
+    f"at = AppTest.from_file({APP_PATH!r}, default_timeout=120).run()\n"
+    "assert not at.exception, at.exception\n"
+)
+
+
+def run_python(args, workdir):
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable] + args, cwd=workdir, capture_output=True, text=True, check=True)
+    return time.perf_counter() - start, result.stderr
+
+
+def parse_importtime(stderr, depth=1):
+    """앱 모듈이 직접 불러온 모듈(들여쓰기 depth단계)별 누적 import 시간(마이크로초)"""
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        indent = len(name) - len(name.lstrip(" ")) - 1
+        if indent != 2 * depth or not cumulative.strip().isdigit():
+            continue
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=12)
+    args = parser.parse_args()
+    workdir = tempfile.mkdtemp()
+
+    import_runs, first_runs, modules = [], [], {}
+    for _ in range(args.repeat):
+        seconds, stderr = run_python(["-X", "importtime", "-c", IMPORT_APP], workdir)
+        import_runs.append(seconds)
+        for name, micros in parse_importtime(stderr).items():
+            modules.setdefault(name, []).append(micros)
+        first_runs.append(run_python(["-c", FIRST_RUN], workdir)[0])
+
+    print(f"{'module':<28} {'cumulative ms':>14}")
+    ranked = sorted(modules.items(), key=lambda item: -statistics.median(item[1]))
+    for name, micros in ranked[:args.top]:
+        print(f"{name:<28} {statistics.median(micros) / 1000:>14.1f}")
+    print()
+    print(f"process + import (median): {statistics.median(import_runs) * 1000:8.1f} ms")
+    print(f"process + first run:       {statistics.median(first_runs) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""규모별 벤치마크 모음.
+
+datagen으로 만든 데이터(카드 N행, 위시리스트 N/10, 마술 N/20)를 저장 방식별로 기록한 뒤
+load_data / save_data / create_backup / restore_from_backup / 추가 함수 / 각 화면의
+필터·정렬·페이지 조회 시간을 재고, AppTest로 화면별 rerun 시간도 잰다.
+결과는 "저장방식/행수/항목" → 초 형태의 JSON 보고서로 저장해서 실행끼리 비교할 수 있다.
+
+    python benchmarks/bench_suite.py --sizes 1000,100000 --out report.json
+    python benchmarks/bench_suite.py --sizes 1000 --compare report.json
+"""
+import argparse
+import io
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.dirname(BENCH_DIR)
+APP_PATH = os.path.join(APP_DIR, "card_magic_app.py")
+sys.path.insert(0, APP_DIR)
+logging.disable(logging.WARNING)
+import card_magic_app as app  # noqa: E402
+from datagen import make_data  # noqa: E402
+
+PAGES = ["🏠 Dashboard", "🃏 Card Collection", "💫 Wishlist", "🎩 Magic Tricks"]
+
+# 화면별 대표 조회 (show_* 가 만드는 TableQuery와 같은 조건)
+QUERIES = {
+    'cards': ('card_collection', [], None, True, None),
+    'cards_filter': ('card_collection', [('제조사', '==', "Bicycle"), ('개봉여부', '==', "미개봉")], None, True, None),
+    'cards_sort': ('card_collection', [], '현재가격($)', True, None),
+    'cards_search': ('card_collection', [], None, True, "골드"),
+    'wishlist_sort': ('wishlist', [], '우선순위', False, None),
+    'wishlist_filter': ('wishlist', [('타입', '==', "카드"), ('가격($)', '<=', 30.0)], '가격($)', True, None),
+    'magic_sort': ('magic_list', [], '신기함정도', False, None),
+    'magic_filter': ('magic_list', [('장르', '==', "동전"), ('난이도', '<=', 3.0)], None, True, None),
+}
+
+
+def timed(func, repeat=3, setup=None):
+    """repeat번 실행한 중앙값(초)"""
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def fresh_store():
+    st.cache_resource.clear()
+    return app.get_data_store()
+
+
+def seed_form_state():
+    """추가 함수가 읽는 입력 위젯 값"""
+    st.session_state.update({
+        'new_card_name': "Bench Deck", 'new_card_purchase_price': 12.5, 'new_card_current_price': 15.0,
+        'manufacturer_option': "기존 선택", 'selected_manufacturer': "Bicycle", 'new_manufacturer_input': "",
+        'new_card_discontinued': "현재판매", 'new_card_status': "미개봉", 'new_card_site': "",
+        'new_card_rating': 3.5, 'new_card_finish': "Air Cushion", 'new_card_style': "클래식",
+        'new_wish_name': "Bench Wish", 'new_wish_type': "카드", 'new_wish_price': 20.0, 'new_wish_site': "",
+        'new_wish_priority': 4.0, 'new_wish_note': "",
+        'new_magic_name': "Bench Trick", 'genre_option': "기존 선택", 'selected_genre': "동전",
+        'new_genre_input': "", 'new_magic_rating': 4.0, 'new_magic_difficulty': 2.5,
+        'new_magic_video': "", 'new_magic_note': "",
+    })
+
+
+def bench_functions(results, adds):
+    store = fresh_store()
+    results['load_data_cold'] = timed(app.load_data, repeat=1)
+    results['load_data_warm'] = timed(app.load_data)
+    # 다른 프로세스가 파일을 바꾼 것처럼 다시 읽게 한다
+    results['load_data_reload'] = timed(app.load_data, setup=lambda: setattr(store, 'signature', None))
+    results['save_data'] = timed(app.save_data)
+    results['create_backup'] = timed(app.create_backup, setup=store.derived.clear)
+    results['create_backup_archive'] = timed(app.create_backup_archive, setup=store.derived.clear)
+    archive = app.create_backup_archive()
+
+    def restore():
+        ok, message = app.restore_from_backup(io.BytesIO(archive))
+        assert ok, message
+    results['restore_from_backup'] = timed(restore, repeat=1)
+
+    seed_form_state()
+    for name, add in [('add_card', app.add_card_to_collection), ('add_wish', app.add_card_to_wishlist),
+                      ('add_magic', app.add_magic)]:
+        results[name] = timed(lambda: [add() for _ in range(adds)], repeat=1) / adds
+
+    for name, (table, filters, sort_by, ascending, search) in QUERIES.items():
+        def listing():
+            query = app.TableQuery(table, filters, sort_by, ascending, search=search)
+            total = query.count()
+            if table == 'card_collection':
+                query.aggregate('sum', '구매가격($)')
+                query.aggregate('sum', '현재가격($)')
+            query.page(max(total - 10, 0) // 2, 10)
+
+        def clear():
+            store.query_cache.clear()
+            for index in store.indexes.values():
+                index.cache.clear()
+        results[f'query_{name}_cold'] = timed(listing, setup=clear)
+        results[f'query_{name}_warm'] = timed(listing)
+
+
+def bench_apptest(results, reruns):
+    st.cache_resource.clear()
+    at = AppTest.from_file(APP_PATH, default_timeout=600)
+    start = time.perf_counter()
+    at.run()
+    results['app_first_run'] = time.perf_counter() - start
+    for page in PAGES:
+        at.sidebar.selectbox[0].select(page)
+        times = []
+        for _ in range(reruns):
+            start = time.perf_counter()
+            at.run()
+            times.append(time.perf_counter() - start)
+            if at.exception:
+                raise RuntimeError(at.exception[0].message)
+        results[f'app_rerun_{page.split()[-1].lower()}'] = statistics.median(times)
+
+
+def run_size(storage, rows, args):
+    os.chdir(tempfile.mkdtemp())
+    app.STORAGE_MODE = storage
+    data = make_data(rows, rows // 10, rows // 20)
+    fresh_store().put(data)
+    results = {}
+    bench_functions(results, args.adds)
+    if not args.no_apptest:
+        os.environ["CARD_MAGIC_STORAGE"] = storage
+        bench_apptest(results, args.reruns)
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=APP_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report, old_path):
+    with open(old_path, encoding='utf-8') as f:
+        old = json.load(f)['results']
+    print(f"\n{'key':<52} {'old ms':>10} {'new ms':>10} {'ratio':>7}")
+    for key, seconds in report['results'].items():
+        if key in old and old[key]:
+            print(f"{key:<52} {old[key] * 1000:>10.2f} {seconds * 1000:>10.2f} {seconds / old[key]:>7.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,100000", help="카드 행 수 (쉼표로 구분, 예: 1000,100000,1000000)")
+    parser.add_argument("--storage", default=app.STORAGE_MODE, help="journal,pickle,sqlite 중 쉼표로 구분")
+    parser.add_argument("--adds", type=int, default=20, help="추가 함수별 반복 횟수")
+    parser.add_argument("--reruns", type=int, default=3, help="AppTest 화면별 rerun 횟수")
+    parser.add_argument("--no-apptest", action="store_true", help="AppTest 화면 측정 생략")
+    parser.add_argument("--out", default=os.path.join(os.getcwd(), "bench_report.json"))
+    parser.add_argument("--compare", help="이전 보고서(JSON)와 비교")
+    args = parser.parse_args()
+    out = os.path.abspath(args.out)
+    old = os.path.abspath(args.compare) if args.compare else None
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'streamlit': st.__version__,
+        },
+        'results': {},
+    }
+    for storage in args.storage.split(","):
+        for rows in (int(size) for size in args.sizes.split(",")):
+            start = time.perf_counter()
+            for key, seconds in run_size(storage, rows, args).items():
+                report['results'][f"{storage}/{rows}/{key}"] = seconds
+            print(f"{storage:<8} {rows:>9} rows  {time.perf_counter() - start:6.1f}s", file=sys.stderr)
+
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    width = max(len(key) for key in report['results'])
+    for key, seconds in report['results'].items():
+        print(f"{key:<{width}} {seconds * 1000:>10.2f} ms")
+    print(f"\nreport: {out}")
+    if old:
+        compare(report, old)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""합성 데이터 생성기.
+
+앱과 똑같은 한글 컬럼 구성으로 카드 컬렉션/위시리스트/마술 목록 DataFrame을 만든다.
+가격은 로그정규 분포, 범주형 값은 실제 화면의 선택지를 치우친 비율로 뽑는다.
+
+    python benchmarks/datagen.py --cards 100000 --out card_magic_data.pkl
+"""
+import argparse
+import os
+import pickle
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import logging  # noqa: E402
+logging.disable(logging.WARNING)
+from card_magic_core import IMPORT_CHOICES, TABLE_COLUMNS  # noqa: E402
+
+MANUFACTURERS = ["Bicycle", "Theory11", "Ellusionist", "D&D", "Fontaine",
+                 "Art of Play", "Kings Wild Project", "USPCC", "Cartamundi"]
+MANUFACTURER_WEIGHTS = [0.3, 0.15, 0.12, 0.08, 0.08, 0.07, 0.06, 0.08, 0.06]
+MAGIC_GENRES = ["카드-세팅", "카드-즉석", "동전", "멘탈리즘", "클로즈업-세팅",
+                "클로즈업-즉석", "일상 즉석", "스테이지", "레스토레이션"]
+NAME_WORDS = ["Red", "Blue", "Gold", "Black", "Ghost", "Royal", "Vintage", "Monarch", "Artisan", "Jerry's",
+              "레드", "블루", "골드", "빈티지", "로열", "고스트", "한정판", "클래식", "네온", "벨벳"]
+NAME_KINDS = ["Deck", "Edition", "Playing Cards", "덱", "에디션"]
+MAGIC_WORDS = ["앰비셔스", "트라이엄프", "오일 앤 워터", "사인드 카드", "코인 매트릭스", "북 테스트",
+               "Ambitious", "Triumph", "Chicago Opener", "Matrix", "Cups and Balls", "Invisible Deck"]
+WISH_TYPE_WEIGHTS = [0.5, 0.2, 0.1, 0.1, 0.1]
+SITES = ["", "", "https://www.theory11.com/", "https://www.artofplay.com/", "https://www.ellusionist.com/"]
+
+
+def rating(rng, rows, center=3.5):
+    """0.5점 단위 1~5점"""
+    return np.clip(np.round(rng.normal(center, 0.9, rows) * 2) / 2, 1.0, 5.0)
+
+
+def names(rng, rows, words, kinds):
+    first = rng.choice(words, rows)
+    second = rng.choice(words, rows)
+    kind = rng.choice(kinds, rows)
+    return [" ".join(part for part in (a, b, k) if part) + f" #{i}"
+            for i, (a, b, k) in enumerate(zip(first, second, kind))]
+
+
+def make_card_collection(rows, rng):
+    purchase = np.round(rng.lognormal(np.log(12), 0.5, rows), 2)
+    discontinued = rng.choice(IMPORT_CHOICES['단종여부'], rows, p=[0.2, 0.8])
+    # 단종된 덱은 가격이 더 오른다
+    drift = rng.lognormal(np.where(discontinued == "단종", 0.4, 0.0), 0.3)
+    return pd.DataFrame({
+        '카드명': names(rng, rows, NAME_WORDS, NAME_KINDS),
+        '구매가격($)': purchase,
+        '현재가격($)': np.round(purchase * drift, 2),
+        '제조사': rng.choice(MANUFACTURERS, rows, p=MANUFACTURER_WEIGHTS),
+        '단종여부': discontinued,
+        '개봉여부': rng.choice(IMPORT_CHOICES['개봉여부'], rows, p=[0.5, 0.35, 0.15]),
+        '판매사이트': rng.choice(SITES, rows),
+        '디자인별점': rating(rng, rows),
+        '피니시': rng.choice(IMPORT_CHOICES['피니시'], rows, p=[0.3, 0.4, 0.1, 0.1, 0.1]),
+        '디자인스타일': rng.choice(IMPORT_CHOICES['디자인스타일'], rows),
+    }, columns=TABLE_COLUMNS['card_collection'])
+
+
+def make_wishlist(rows, rng):
+    return pd.DataFrame({
+        '이름': names(rng, rows, NAME_WORDS + MAGIC_WORDS, NAME_KINDS),
+        '타입': rng.choice(IMPORT_CHOICES['타입'], rows, p=WISH_TYPE_WEIGHTS),
+        '가격($)': np.round(rng.lognormal(np.log(25), 0.7, rows), 2),
+        '판매사이트': rng.choice(SITES, rows),
+        '우선순위': rating(rng, rows, 3.0),
+        '비고': rng.choice(["", "", "재입고 대기", "선물용", "한정판"], rows),
+    }, columns=TABLE_COLUMNS['wishlist'])
+
+
+def make_magic_list(rows, rng):
+    return pd.DataFrame({
+        '마술명': names(rng, rows, MAGIC_WORDS, ["", "변형", "루틴"]),
+        '장르': rng.choice(MAGIC_GENRES, rows),
+        '신기함정도': rating(rng, rows),
+        '난이도': rating(rng, rows, 3.0),
+        '관련영상': rng.choice(["", "https://www.youtube.com/watch?v=example"], rows, p=[0.7, 0.3]),
+        '비고': rng.choice(["", "", "공연용", "연습 중"], rows),
+    }, columns=TABLE_COLUMNS['magic_list'])
+
+
+def make_data(cards, wishes=0, magic=0, seed=0):
+    """저장 파일과 같은 형식의 데이터 딕셔너리"""
+    rng = np.random.default_rng(seed)
+    return {
+        'card_collection': make_card_collection(cards, rng),
+        'wishlist': make_wishlist(wishes, rng),
+        'magic_list': make_magic_list(magic, rng),
+        'manufacturers': list(MANUFACTURERS),
+        'magic_genres': list(MAGIC_GENRES),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, default=1000)
+    parser.add_argument("--wishes", type=int, default=None, help="기본값: 카드 수의 1/10")
+    parser.add_argument("--magic", type=int, default=None, help="기본값: 카드 수의 1/20")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="card_magic_data.pkl")
+    args = parser.parse_args()
+
+    wishes = args.cards // 10 if args.wishes is None else args.wishes
+    magic = args.cards // 20 if args.magic is None else args.magic
+    with open(args.out, "wb") as f:
+        pickle.dump(make_data(args.cards, wishes, magic, args.seed), f, protocol=pickle.HIGHEST_PROTOCOL)
+    print(f"{args.out}: {args.cards} cards, {wishes} wishes, {magic} tricks")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,100 +1,292 @@
 import streamlit as st
 import pandas as pd
-import requests
-import json
+import numpy as np
 from datetime import datetime
-import plotly.express as px
-import plotly.graph_objects as go
-import pickle
 import os
 import io
+import json
+import functools
+import time
+import tempfile
+from contextlib import contextmanager, nullcontext
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 
-# 데이터 파일 경로
-DATA_FILE = "card_magic_data.pkl"
+from card_magic_core import (
+    AUTOSAVE_WINDOW, DATA_DIR, DEFAULT_LISTS, DISPLAY_CURRENCIES, IMAGE_TABLES, IMPORT_CHOICES, IMPORT_CHUNK_SIZE,
+    NUMERIC_COLUMNS, PRICE_PERIODS, RATING_COLUMNS, ROW_ID, STORAGE_MODE, TABLE_COLUMNS, THUMBNAIL_SIZES,
+    CurrencyConverter, ExchangeRateProvider, WriteConflict,
+    backup_archive, backup_json, fetch_exchange_rate, import_file, normalize_user_name, open_image_store,
+    open_store, restore_backup, restore_backup_chain, today_day,
+)
+import card_magic_core
 
 # 데이터 백업 함수
-def create_backup():
-    backup_data = {
-        'timestamp': datetime.now().isoformat(),
-        'card_collection': st.session_state.card_collection.to_dict('records') if not st.session_state.card_collection.empty else [],
-        'wishlist': st.session_state.wishlist.to_dict('records') if not st.session_state.wishlist.empty else [],
-        'magic_list': st.session_state.magic_list.to_dict('records') if not st.session_state.magic_list.empty else [],
-        'manufacturers': st.session_state.manufacturers,
-        'magic_genres': st.session_state.magic_genres
-    }
-    return json.dumps(backup_data, ensure_ascii=False, indent=2)
+def create_backup(store=None, manufacturers=None, magic_genres=None):
+    """백업 JSON 생성 (데이터가 바뀌지 않았으면 이전 결과를 재사용)"""
+    lists = session_lists()
+    return backup_json(store or get_data_store(),
+                       lists['manufacturers'] if manufacturers is None else manufacturers,
+                       lists['magic_genres'] if magic_genres is None else magic_genres)
+
+# 압축 백업 생성 함수
+def create_backup_archive(store=None, manufacturers=None, magic_genres=None):
+    """압축 백업 바이트 생성 (데이터가 바뀌지 않았으면 이전 결과를 재사용)"""
+    lists = session_lists()
+    return backup_archive(store or get_data_store(),
+                          lists['manufacturers'] if manufacturers is None else manufacturers,
+                          lists['magic_genres'] if magic_genres is None else magic_genres)
+
+# 다운로드 버튼용 지연 백업 함수
+def backup_builder():
+    """버튼을 눌렀을 때만 압축 백업을 만드는 인자 없는 함수 반환"""
+    store = get_data_store()
+    lists = session_lists()
+    return lambda: backup_archive(store, lists['manufacturers'], lists['magic_genres'])
 
 # 백업 파일 복원 함수
-def restore_from_backup(uploaded_file):
+def restore_from_backup(uploaded_files):
+    """압축 백업(.jsonl.gz)과 기존 JSON 백업을 모두 복원.
+    여러 파일을 주면 전체 백업 + 변경분 백업 체인으로 보고 차례로 적용한다"""
+    if not isinstance(uploaded_files, list):
+        uploaded_files = [uploaded_files]
     try:
-        backup_data = json.load(uploaded_file)
-        
-        # 데이터 복원
-        if 'card_collection' in backup_data:
-            st.session_state.card_collection = pd.DataFrame(backup_data['card_collection'])
-        
-        if 'wishlist' in backup_data:
-            st.session_state.wishlist = pd.DataFrame(backup_data['wishlist'])
-        
-        if 'magic_list' in backup_data:
-            st.session_state.magic_list = pd.DataFrame(backup_data['magic_list'])
-        
-        if 'manufacturers' in backup_data:
-            st.session_state.manufacturers = backup_data['manufacturers']
-        
-        if 'magic_genres' in backup_data:
-            st.session_state.magic_genres = backup_data['magic_genres']
-        
-        # 데이터 저장
-        save_data()
-        return True, backup_data.get('timestamp', '알 수 없음')
+        if len(uploaded_files) == 1:
+            return True, restore_backup(get_data_store(), uploaded_files[0], session_lists())
+        return True, restore_backup_chain(get_data_store(), uploaded_files, session_lists())
     except Exception as e:
         return False, str(e)
-        
+
+# 현재 세션의 사용자
+def current_user():
+    if 'user_name' not in st.session_state:
+        st.session_state.user_name = st.query_params.get('user', "")
+    return normalize_user_name(st.session_state.user_name)
+
+@st.cache_resource
+def open_data_store(user=""):
+    """사용자별 공유 저장소 (같은 사용자의 세션끼리는 하나를 함께 쓴다).
+    변경은 메모리에 바로 반영되고 파일 기록은 자동 저장 스레드가 모아서 한다"""
+    return open_store(user, STORAGE_MODE, autosave=AUTOSAVE_WINDOW)
+
+def get_data_store():
+    return open_data_store(current_user())
+
+@st.cache_resource
+def open_photo_store(user=""):
+    """사용자별 사진 저장소 (썸네일 캐시와 작업자 풀을 모든 세션이 함께 쓴다)"""
+    return open_image_store(user)
+
+def get_image_store():
+    return open_photo_store(current_user())
+
+# 표 조회 함수
+def get_table(name):
+    return get_data_store().table(name)
+
+# 세션의 제조사/장르 목록
+def session_lists():
+    return {'manufacturers': list(st.session_state.manufacturers),
+            'magic_genres': list(st.session_state.magic_genres)}
+
+# 현재 데이터를 저장용 딕셔너리로 묶기
+def session_data():
+    data = get_data_store().snapshot()
+    data.update(session_lists())
+    return data
+
 # 데이터 저장 함수
-def save_data():
-    """모든 세션 데이터를 파일에 저장"""
-    data = {
-        'card_collection': st.session_state.card_collection,
-        'wishlist': st.session_state.wishlist,
-        'magic_list': st.session_state.magic_list,
-        'manufacturers': st.session_state.manufacturers,
-        'magic_genres': st.session_state.magic_genres
-    }
-    with open(DATA_FILE, 'wb') as f:
-        pickle.dump(data, f)
+def save_data(data=None):
+    """모든 데이터를 파일에 저장"""
+    with perf_span("save_data"):
+        get_data_store().put(session_data() if data is None else data)
+
+# 변경분 기록 함수
+def record_changes(*records, expected=None):
+    """단일 추가/삭제를 기록하고 반영한 레코드를 반환 (저장 비용이 전체 데이터 크기와 무관).
+    expected에는 삭제/수정 레코드마다 화면에 보였던 행을 넘긴다 (DataStore.append 참고)"""
+    with perf_span("record_changes"):
+        return get_data_store().append(records, expected)
 
 # 데이터 로드 함수
 def load_data():
-    """파일에서 데이터를 불러와서 세션 상태에 설정"""
-    if os.path.exists(DATA_FILE):
-        try:
-            with open(DATA_FILE, 'rb') as f:
-                data = pickle.load(f)
-            
-            st.session_state.card_collection = data.get('card_collection', pd.DataFrame(columns=[
-                '카드명', '구매가격($)', '현재가격($)', '제조사', '단종여부', '개봉여부',
-                '판매사이트', '디자인별점', '피니시', '디자인스타일'
-            ]))
-            st.session_state.wishlist = data.get('wishlist', pd.DataFrame(columns=[
-                '이름', '타입', '가격($)', '판매사이트', '우선순위', '비고'
-            ]))
-            st.session_state.magic_list = data.get('magic_list', pd.DataFrame(columns=[
-                '마술명', '장르', '신기함정도', '난이도', '관련영상', '비고'
-            ]))
-            st.session_state.manufacturers = data.get('manufacturers', [
-                "Bicycle", "Theory11", "Ellusionist", "D&D", "Fontaine", 
-                "Art of Play", "Kings Wild Project", "USPCC", "Cartamundi"
-            ])
-            st.session_state.magic_genres = data.get('magic_genres', [
-                "카드-세팅", "카드-즉석", "동전", "멘탈리즘", "클로즈업-세팅", 
-                "클로즈업-즉석", "일상 즉석", "스테이지", "레스토레이션"
-            ])
-            return True
-        except Exception as e:
-            st.error(f"데이터 로드 중 오류 발생: {str(e)}")
+    """공유 저장소에서 데이터를 불러와서 세션 상태에 설정"""
+    store = get_data_store()
+    try:
+        if not store.refresh():
             return False
-    return False
+    except Exception as e:
+        st.error(f"데이터 로드 중 오류 발생: {str(e)}")
+        return False
+
+    # 목록은 세션에서 직접 수정되므로 공유 사본과 분리
+    st.session_state.update(card_magic_core.store_lists(store))
+    return True
+
+# 목록 화면 조회
+class TableQuery(card_magic_core.TableQuery):
+    """현재 세션 사용자의 저장소에 대한 TableQuery (card_magic_core.TableQuery 참고)"""
+
+    def __init__(self, table, filters, sort_by, ascending=True, search=None):
+        super().__init__(get_data_store(), table, filters, sort_by, ascending, search)
+
+
+# 성능 계측 (CARD_MAGIC_DEBUG=1 또는 주소에 ?debug=1을 붙이면 켜진다)
+PERF_LOG_FILE = os.environ.get("CARD_MAGIC_PERF_LOG", os.path.join(DATA_DIR, "card_magic_perf.jsonl"))
+PERF_HISTORY = 50
+PROFILE_TOP = 25
+
+def perf_enabled():
+    return os.environ.get("CARD_MAGIC_DEBUG") == "1" or st.query_params.get("debug") == "1"
+
+# rerun 구간 측정기
+class RerunTimer:
+    """한 번의 rerun 동안 구간(span)별 소요 시간을 모은다.
+
+    버튼 콜백은 스크립트보다 먼저 실행되므로 측정기는 첫 구간에서 만들어지고
+    main()이 끝날 때 finish()로 한 줄짜리 기록이 된다.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans = []
+        self.depth = 0
+
+    @contextmanager
+    def span(self, name):
+        start = time.perf_counter()
+        self.depth += 1
+        try:
+            yield
+        finally:
+            self.depth -= 1
+            self.spans.append({
+                'name': name,
+                'depth': self.depth,
+                'start_ms': round((start - self.started) * 1000, 3),
+                'ms': round((time.perf_counter() - start) * 1000, 3),
+            })
+
+    def finish(self, **fields):
+        spans = sorted(self.spans, key=lambda span: (span['start_ms'], span['depth']))
+        return {
+            'ts': datetime.now().isoformat(timespec='milliseconds'),
+            **fields,
+            'total_ms': round((time.perf_counter() - self.started) * 1000, 3),
+            'spans': spans,
+        }
+
+# 계측 구간
+def perf_span(name):
+    """계측이 켜져 있으면 현재 rerun의 측정기에 구간을 기록 (꺼져 있으면 아무 일도 하지 않음)"""
+    if get_script_run_ctx() is None:
+        return nullcontext()
+    timer = st.session_state.get('rerun_timer')
+    if timer is None:
+        if not perf_enabled():
+            return nullcontext()
+        timer = st.session_state.rerun_timer = RerunTimer()
+    return timer.span(name)
+
+# rerun 기록을 JSON 한 줄로 덧붙이기
+def write_perf_record(record, path=PERF_LOG_FILE):
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+# cProfile 결과 요약
+def profile_report(profiler, top=PROFILE_TOP):
+    """(누적 시간 상위 함수 텍스트, .prof 파일 바이트)"""
+    import pstats
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(top)
+    with tempfile.NamedTemporaryFile(suffix=".prof", delete=False) as f:
+        path = f.name
+    try:
+        profiler.dump_stats(path)
+        with open(path, 'rb') as f:
+            dump = f.read()
+    finally:
+        os.remove(path)
+    return stream.getvalue(), dump
+
+# 이번 rerun 계측 마무리 (JSONL 기록과 세션 기록에 추가)
+def finish_perf_record(page, scope="app"):
+    """scope는 전체 rerun이면 "app", 조각만 다시 실행됐으면 조각 함수 이름"""
+    timer = st.session_state.pop('rerun_timer', None)
+    if timer is None:
+        return None
+    record = timer.finish(session=get_script_run_ctx().session_id, user=current_user(), page=page, scope=scope)
+    try:
+        write_perf_record(record)
+    except OSError:
+        pass
+    history = st.session_state.setdefault('perf_history', [])
+    history.append(record)
+    del history[:-PERF_HISTORY]
+    return record
+
+# 사이드바 성능 패널
+def show_perf_panel(page, profiler=None):
+    """이번 rerun의 구간별 시간을 기록하고 사이드바에 표시"""
+    record = finish_perf_record(page)
+    if record is None:
+        return
+    history = st.session_state.perf_history
+    if profiler is not None:
+        st.session_state.perf_profile = profile_report(profiler)
+
+    st.sidebar.markdown("---")
+    with st.sidebar.expander(f"🔧 성능 (이번 rerun {record['total_ms']:.0f}ms)", expanded=True):
+        st.dataframe(
+            pd.DataFrame([
+                {'구간': "　" * span['depth'] + span['name'], '시작(ms)': span['start_ms'], '소요(ms)': span['ms']}
+                for span in record['spans']
+            ]),
+            hide_index=True, use_container_width=True
+        )
+        totals = [r['total_ms'] for r in history]
+        st.caption(f"최근 {len(totals)}회 중앙값 {np.median(totals):.0f}ms · 최대 {max(totals):.0f}ms")
+        partial = [r['total_ms'] for r in history if r.get('scope', "app") != "app"]
+        if partial:
+            st.caption(f"부분 rerun(조각) {len(partial)}회 중앙값 {np.median(partial):.0f}ms")
+        st.download_button(
+            "📥 기록 다운로드 (.jsonl)",
+            data="".join(json.dumps(r, ensure_ascii=False) + "\n" for r in history),
+            file_name="card_magic_perf.jsonl",
+            mime="application/x-ndjson",
+            key="perf_download"
+        )
+        st.button("🧪 다음 rerun 프로파일", key="perf_profile_next",
+                  on_click=lambda: st.session_state.update(perf_profile_next=True),
+                  help="다음 한 번의 rerun을 cProfile로 기록합니다")
+        if 'perf_profile' in st.session_state:
+            report, dump = st.session_state.perf_profile
+            st.download_button("📥 프로파일 다운로드 (.prof)", data=dump,
+                               file_name="card_magic_rerun.prof", key="perf_profile_download")
+            st.code(report, language=None)
+
+# 부분 rerun 조각
+def perf_fragment(func):
+    """func를 st.fragment로 감싼다. 조각 안의 위젯을 조작하면 이 조각만 다시 실행되고
+    main()은 돌지 않으므로, 그때는 데이터 새로고침·충돌 알림·계측 기록을 여기서 대신한다"""
+    @st.fragment
+    @functools.wraps(func)
+    def fragment():
+        ctx = get_script_run_ctx()
+        if not ctx.fragment_ids_this_run or st.session_state.get('fragment_running'):
+            with perf_span(func.__name__):
+                return func()
+        # 바깥 조각만 새로고침/기록 (안쪽 조각은 바깥 조각 안에서 함께 실행된다)
+        st.session_state.fragment_running = True
+        try:
+            with perf_span(f"fragment {func.__name__}"):
+                with perf_span("load_data"):
+                    load_data()
+                show_write_conflict()
+                func()
+        finally:
+            del st.session_state.fragment_running
+        finish_perf_record(st.session_state.get('nav_page'), scope=func.__name__)
+    return fragment
 
 # 페이지 설정
 st.set_page_config(
@@ -104,8 +296,8 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# 사용자 정의 CSS 스타일
-st.markdown("""
+# 사용자 정의 CSS 스타일 (데이터를 불러온 뒤 main()에서 적용)
+APP_STYLE = """
 <style>
     .main-header {
         font-size: 2.5rem;
@@ -280,24 +472,29 @@ st.markdown("""
         padding-right: 2rem;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
 
+# 환율 제공자 (프로세스에 하나)
+@st.cache_resource
+def get_rate_provider():
+    return ExchangeRateProvider(fetch_exchange_rate).start()
 
 # 환율 정보 가져오기 함수
-@st.cache_data(ttl=3600)
 def get_exchange_rate():
-    try:
-        response = requests.get("https://api.exchangerate-api.com/v4/latest/USD")
-        data = response.json()
-        return data['rates'].get('KRW', 1300)
-    except:
-        return 1300
+    with perf_span("get_exchange_rate"):
+        return get_rate_provider().get()
 
 # 달러를 원화로 변환하는 함수
 def usd_to_krw(usd_amount):
     exchange_rate = get_exchange_rate()
     return usd_amount * exchange_rate
 
+# 현재 화면용 통화 변환기
+def get_currency_converter():
+    rates = get_rate_provider().get_rates()
+    return CurrencyConverter(st.session_state.get('display_currency', 'KRW'), rates)
+
 # 별점을 표시하는 함수
 def display_stars(rating):
     if pd.isna(rating):
@@ -346,34 +543,10 @@ def initialize_session_state():
     if load_data():
         return
     
-    # 파일이 없거나 로드 실패 시 기본값으로 초기화
-    if 'card_collection' not in st.session_state:
-        st.session_state.card_collection = pd.DataFrame(columns=[
-            '카드명', '구매가격($)', '현재가격($)', '제조사', '단종여부', '개봉여부',
-            '판매사이트', '디자인별점', '피니시', '디자인스타일'
-        ])
-    
-    if 'wishlist' not in st.session_state:
-        st.session_state.wishlist = pd.DataFrame(columns=[
-            '이름', '타입', '가격($)', '판매사이트', '우선순위', '비고'
-        ])
-    
-    if 'magic_list' not in st.session_state:
-        st.session_state.magic_list = pd.DataFrame(columns=[
-            '마술명', '장르', '신기함정도', '난이도', '관련영상', '비고'
-        ])
-    
-    if 'manufacturers' not in st.session_state:
-        st.session_state.manufacturers = [
-            "Bicycle", "Theory11", "Ellusionist", "D&D", "Fontaine", 
-            "Art of Play", "Kings Wild Project", "USPCC", "Cartamundi"
-        ]
-    
-    if 'magic_genres' not in st.session_state:
-        st.session_state.magic_genres = [
-            "카드-세팅", "카드-즉석", "동전", "멘탈리즘", "클로즈업-세팅", 
-            "클로즈업-즉석", "일상 즉석", "스테이지", "레스토레이션"
-        ]
+    # 파일이 없거나 로드 실패 시 기본값으로 초기화 (표는 저장소가 빈 표로 제공)
+    for name, values in DEFAULT_LISTS.items():
+        if name not in st.session_state:
+            st.session_state[name] = list(values)
 
 # 제조사 추가 함수
 def add_manufacturer(new_manufacturer):
@@ -387,6 +560,75 @@ def add_genre(new_genre):
         st.session_state.magic_genres.append(new_genre)
         st.session_state.magic_genres.sort()
 
+# 화면에 보였던 행 기준으로 삭제/수정 (버튼 콜백)
+def record_row_changes(records, expected):
+    """버튼을 그릴 때 보였던 행(expected)에 변경을 적용. 콜백은 다음 화면을 그리기 전에 실행되므로
+    그 사이 다른 세션이 표를 바꿨어도 사용자가 본 행이 바뀐다"""
+    if not records:
+        return
+    try:
+        record_changes(*records, expected=expected)
+    except WriteConflict as e:
+        st.session_state.write_conflict = str(e)
+
+# 사진으로 받는 파일 형식
+PHOTO_TYPES = ["jpg", "jpeg", "png", "webp", "gif"]
+
+# 사진 업로더 키 (사진을 붙인 뒤 키를 바꿔서 업로더를 비운다)
+def photo_uploader_key(form):
+    return f"{form}_photos_{st.session_state.get(f'{form}_photo_round', 0)}"
+
+# 사진 업로더
+def photo_uploader(form):
+    st.file_uploader("📷 사진", type=PHOTO_TYPES, accept_multiple_files=True, key=photo_uploader_key(form))
+
+# 추가한 행의 ID
+def inserted_ids(applied):
+    return [int(value[ROW_ID]) for op, _, value in applied or [] if op == 'insert']
+
+# 업로더에 올린 사진을 행들에 붙이기 (실패하면 오류 메시지를 반환)
+def attach_photos(table, row_ids, form):
+    files = st.session_state.get(photo_uploader_key(form)) or []
+    if not files or not row_ids:
+        return None
+    try:
+        with perf_span("attach_photos"):
+            for uploaded in files:
+                get_image_store().attach(table, row_ids, uploaded.getvalue())
+    except (ValueError, RuntimeError) as e:
+        return str(e)
+    st.session_state[f"{form}_photo_round"] = st.session_state.get(f"{form}_photo_round", 0) + 1
+    return None
+
+# 선택한 행에 사진 붙이기 (버튼 콜백)
+def attach_batch_photos(table, row_ids, form):
+    error = attach_photos(table, row_ids, form)
+    if error:
+        st.session_state.photo_error = error
+
+# 선택한 행의 사진 떼기 (버튼 콜백)
+def detach_batch_photos(table, row_ids):
+    get_image_store().detach(table, row_ids)
+
+# 보이는 페이지 행의 첫 사진 썸네일
+def page_thumbnails(table, page_df):
+    """{행 ID: (썸네일 바이트, 사진 수)}. 지금 페이지에 보이는 행의 사진만 조회하고 그 썸네일만 읽는다"""
+    with perf_span("thumbnails"):
+        images = get_image_store().images(table, page_df[ROW_ID].astype(int).tolist())
+        if not images:
+            return {}
+        thumbnails = get_image_store().thumbnails([digests[0] for digests in images.values()])
+        return {row_id: (thumbnails[digests[0]], len(digests)) for row_id, digests in images.items()}
+
+# 목록 행의 사진 썸네일
+def show_thumbnail(thumbnails, row):
+    thumbnail = thumbnails.get(int(row[ROW_ID]))
+    if thumbnail is None:
+        return
+    st.image(thumbnail[0], width=THUMBNAIL_SIZES['small'])
+    if thumbnail[1] > 1:
+        st.caption(f"📷 {thumbnail[1]}장")
+
 # 데이터 추가 함수들
 def add_card_to_collection():
     new_card = {
@@ -407,11 +649,10 @@ def add_card_to_collection():
         add_manufacturer(st.session_state.new_manufacturer_input)
         new_card['제조사'] = st.session_state.new_manufacturer_input
     
-    st.session_state.card_collection = pd.concat([
-        st.session_state.card_collection, 
-        pd.DataFrame([new_card])
-    ], ignore_index=True)
-    save_data()
+    records = [('insert', 'card_collection', new_card)]
+    if st.session_state.manufacturer_option == "새로 추가":
+        records.insert(0, ('list', 'manufacturers', st.session_state.manufacturers))
+    return attach_photos('card_collection', inserted_ids(record_changes(*records)), "new_card")
 
 def add_card_to_wishlist():
     new_wish = {
@@ -422,11 +663,7 @@ def add_card_to_wishlist():
         '우선순위': st.session_state.new_wish_priority,
         '비고': st.session_state.new_wish_note
     }
-    st.session_state.wishlist = pd.concat([
-        st.session_state.wishlist, 
-        pd.DataFrame([new_wish])
-    ], ignore_index=True)
-    save_data()
+    return attach_photos('wishlist', inserted_ids(record_changes(('insert', 'wishlist', new_wish))), "new_wish")
 
 def add_magic():
     new_magic = {
@@ -443,11 +680,23 @@ def add_magic():
         add_genre(st.session_state.new_genre_input)
         new_magic['장르'] = st.session_state.new_genre_input
     
-    st.session_state.magic_list = pd.concat([
-        st.session_state.magic_list, 
-        pd.DataFrame([new_magic])
-    ], ignore_index=True)
-    save_data()
+    records = [('insert', 'magic_list', new_magic)]
+    if st.session_state.genre_option == "새로 추가":
+        records.insert(0, ('list', 'magic_genres', st.session_state.magic_genres))
+    record_changes(*records)
+
+# 대량 가져오기 대상 (화면 이름 → 표)
+IMPORT_TARGETS = {"🃏 카드 컬렉션": 'card_collection', "💫 위시리스트": 'wishlist', "🎩 마술": 'magic_list'}
+
+# 대량 가져오기 함수
+def bulk_import(table, uploaded_file, file_name, chunksize=IMPORT_CHUNK_SIZE):
+    """CSV/XLSX 파일의 행을 청크마다 검증해서 모은 뒤, 새 제조사/장르와 함께 한 번에 기록"""
+    with perf_span("bulk_import"):
+        report = import_file(get_data_store(), table, uploaded_file, file_name, session_lists(), chunksize)
+        add = add_manufacturer if table == 'card_collection' else add_genre
+        for name in report['new_names']:
+            add(name)
+    return report
 
 # 클릭 가능한 링크 생성
 def make_clickable_link(name, url):
@@ -455,69 +704,297 @@ def make_clickable_link(name, url):
         return name
     return f'<a href="{url}" target="_blank" style="color: #3498db; text-decoration: none; font-weight: bold;">{name}</a>'
 
+# 고밀도 표 보기 설정
+VIEW_MODES = ["카드형", "표(고밀도)"]
+GRID_PAGE_SIZES = [100, 500, 1000, 5000]
+
+# 페이지 이동 (버튼 콜백: 콜백 뒤에는 목록 조각만 다시 실행된다)
+def set_page(page_key, page):
+    st.session_state[page_key] = page
+
+# 페이지 선택 상자와 현재 페이지 맞추기
+def sync_page_selector(page_key, selector_key):
+    st.session_state[page_key] = st.session_state[selector_key]
+
+# 페이지네이션 컨트롤
+def render_pagination(page_key, selector_key, key, total_items, per_page, unit):
+    """page_key의 현재 페이지를 바꾸는 버튼과 선택 상자. st.rerun() 없이 콜백만 쓰므로
+    목록 조각 안에서 그리면 페이지를 넘길 때 그 조각만 다시 실행된다"""
+    total_pages = (total_items - 1) // per_page + 1
+    current = st.session_state[page_key]
+    if st.session_state.get(selector_key) != current:
+        st.session_state[selector_key] = current
+    
+    st.markdown("---")
+    col1, col2, col3, col4, col5 = st.columns([1, 1, 2, 1, 1])
+    with col1:
+        st.button("⏮️ 첫 페이지", disabled=(current == 1), key=f"{key}_first",
+                  on_click=set_page, args=(page_key, 1))
+    with col2:
+        st.button("◀️ 이전", disabled=(current == 1), key=f"{key}_prev",
+                  on_click=set_page, args=(page_key, current - 1))
+    with col3:
+        st.selectbox(f"페이지 {current} / {total_pages}", list(range(1, total_pages + 1)),
+                     key=selector_key, on_change=sync_page_selector, args=(page_key, selector_key))
+    with col4:
+        st.button("▶️ 다음", disabled=(current == total_pages), key=f"{key}_next",
+                  on_click=set_page, args=(page_key, current + 1))
+    with col5:
+        st.button("⏭️ 마지막 페이지", disabled=(current == total_pages), key=f"{key}_last",
+                  on_click=set_page, args=(page_key, total_pages))
+    
+    # 현재 페이지 정보 표시
+    start_idx = (current - 1) * per_page + 1
+    end_idx = min(current * per_page, total_items)
+    st.info(f"📄 {start_idx}-{end_idx} / {total_items} {unit} 표시 중")
+
+# 고밀도 표 보기
+def render_table_grid(table, query, total_rows, key):
+    """한 페이지(수천 행까지)를 가상화된 데이터 그리드 하나로 표시하고 선택한 행을 삭제/수정"""
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        page_size = st.selectbox("페이지당 행 수", GRID_PAGE_SIZES, key=f"{key}_grid_page_size")
+    total_pages = (total_rows - 1) // page_size + 1
+    page_key = f"{key}_grid_page"
+    if st.session_state.get(page_key, 1) > total_pages:
+        st.session_state[page_key] = total_pages
+    with col2:
+        page = st.number_input(f"페이지 (총 {total_pages})", min_value=1, max_value=total_pages,
+                               step=1, key=page_key)
+    
+    start_idx = (page - 1) * page_size
+    with perf_span("query_page"):
+        page_df = query.page(start_idx, page_size)
+    st.caption(f"📄 {start_idx + 1}-{start_idx + len(page_df)} / {total_rows} 표시 중 · 행을 선택하면 삭제/수정할 수 있습니다")
+    event = st.dataframe(
+        page_df,
+        hide_index=True,
+        column_config={ROW_ID: None},
+        use_container_width=True,
+        height=min(38 + 35 * len(page_df), 600),
+        on_select="rerun",
+        selection_mode="multi-row",
+        key=f"{key}_grid"
+    )
+    selected = page_df.iloc[[i for i in event.selection.rows if i < len(page_df)]]
+    if selected.empty:
+        return
+    render_batch_actions(table, selected, key)
+    
+    with st.expander(f"✏️ 선택 항목 수정 ({len(selected)}개)"):
+        original = selected.set_index(ROW_ID)
+        edited = st.data_editor(original, hide_index=True, key=f"{key}_grid_editor")
+        edits, expected = [], []
+        for row_id in original.index:
+            changes = {
+                column: edited.at[row_id, column]
+                for column in original.columns
+                if not (pd.isna(edited.at[row_id, column]) and pd.isna(original.at[row_id, column]))
+                and edited.at[row_id, column] != original.at[row_id, column]
+            }
+            if changes:
+                edits.append((int(row_id), changes))
+                expected.append(original.loc[row_id].to_dict())
+        if st.button("💾 변경 저장", key=f"{key}_grid_save", on_click=record_row_changes,
+                     args=([('edit', table, edits)] if edits else [], [expected])) and not edits:
+            st.info("변경된 내용이 없습니다")
+
+# 일괄 변경 값 입력 위젯
+def batch_value_input(column, key):
+    if column in RATING_COLUMNS:
+        return st.slider("새 값", 1.0, 5.0, 3.0, 0.5, key=key)
+    if column in NUMERIC_COLUMNS:
+        return st.number_input("새 값", min_value=0.0, step=0.01, format="%.2f", key=key)
+    choices = IMPORT_CHOICES.get(column) or {
+        '제조사': st.session_state.manufacturers, '장르': st.session_state.magic_genres
+    }.get(column)
+    if choices:
+        return st.selectbox("새 값", choices, key=key)
+    return st.text_input("새 값", key=key)
+
+# 일괄 변경 적용 (버튼 콜백: 누른 시점의 입력값을 읽는다)
+def apply_batch_edit(table, row_ids, rows, column_key, value_prefix):
+    column = st.session_state[column_key]
+    value = st.session_state.get(f"{value_prefix}_{column}")
+    if value is None:
+        return
+    record_row_changes([('edit', table, [(row_id, {column: value}) for row_id in row_ids])], [rows])
+
+# 선택한 행 일괄 삭제/수정
+def render_batch_actions(table, selected, key):
+    """selected(화면에서 선택한 행)를 레코드 하나로 지우거나 한 항목을 같은 값으로 바꾼다 (저장은 한 번)"""
+    if selected.empty:
+        return
+    row_ids = selected[ROW_ID].astype(int).tolist()
+    rows = selected.to_dict('records')
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        st.button(f"🗑️ 선택 삭제 ({len(row_ids)}개)", key=f"{key}_batch_delete", on_click=record_row_changes,
+                  args=([('remove', table, row_ids)], [rows]))
+    with col2.expander(f"🧩 선택 항목 일괄 변경 ({len(row_ids)}개)"):
+        column_key, value_prefix = f"{key}_batch_column", f"{key}_batch_value"
+        column = st.selectbox("변경할 항목", TABLE_COLUMNS[table][1:], key=column_key)
+        batch_value_input(column, f"{value_prefix}_{column}")
+        st.button("일괄 적용", key=f"{key}_batch_apply", on_click=apply_batch_edit,
+                  args=(table, row_ids, rows, column_key, value_prefix))
+    if table in IMAGE_TABLES:
+        with st.expander(f"📷 선택 항목 사진 ({len(row_ids)}개)"):
+            # 같은 사진은 여러 행에 붙여도 한 번만 저장된다
+            photo_uploader(f"{key}_batch")
+            if 'photo_error' in st.session_state:
+                st.error(f"❌ {st.session_state.pop('photo_error')}")
+            st.button("사진 붙이기", key=f"{key}_batch_attach", on_click=attach_batch_photos,
+                      args=(table, row_ids, f"{key}_batch"))
+            st.button("사진 모두 떼기", key=f"{key}_batch_detach", on_click=detach_batch_photos,
+                      args=(table, row_ids))
+
+# 카드형 목록에서 체크한 행
+def checked_rows(page_df, key):
+    return page_df[[bool(st.session_state.get(f"{key}_select_{row_id}")) for row_id in page_df[ROW_ID].astype(int)]]
+
+# 사용자 변경 시 이전 사용자의 목록/페이지 상태 정리
+def switch_user():
+    for name in ['manufacturers', 'magic_genres', 'current_page', 'current_wish_page', 'current_magic_page']:
+        st.session_state.pop(name, None)
+    user = normalize_user_name(st.session_state.user_name)
+    if user:
+        st.query_params['user'] = user
+    else:
+        st.query_params.pop('user', None)
+
+# 다른 세션과 충돌한 변경 알림
+def show_write_conflict():
+    if 'write_conflict' in st.session_state:
+        st.warning(f"⚠️ {st.session_state.pop('write_conflict')}")
+
 # 메인 앱
 def main():
-    initialize_session_state()
+    with perf_span("load_data"):
+        initialize_session_state()
+    st.markdown(APP_STYLE, unsafe_allow_html=True)
     
     # 메인 헤더
     st.markdown('<h1 class="main-header">🎭 Card Collection & Magic Manager</h1>', unsafe_allow_html=True)
+    show_write_conflict()
     
     # 사이드바 네비게이션
     st.sidebar.title("📋 Navigation")
+    st.sidebar.text_input("👤 사용자", key="user_name", on_change=switch_user,
+                          help="이름별로 데이터가 따로 저장됩니다 (비워 두면 공용 데이터)")
     page = st.sidebar.selectbox(
         "페이지 선택",
-        ["🏠 Dashboard", "🃏 Card Collection", "💫 Wishlist", "🎩 Magic Tricks"]
+        ["🏠 Dashboard", "🃏 Card Collection", "💫 Wishlist", "🎩 Magic Tricks"],
+        key="nav_page"
     )
     
-    if page == "🏠 Dashboard":
-        show_enhanced_dashboard()
-    elif page == "🃏 Card Collection":
-        show_card_collection()
-    elif page == "💫 Wishlist":
-        show_wishlist()
-    elif page == "🎩 Magic Tricks":
-        show_magic_tricks()
+    # 표시 통화 선택
+    with perf_span("exchange_rate"):
+        available_currencies = [c for c in DISPLAY_CURRENCIES if c in get_rate_provider().get_rates()]
+    st.sidebar.selectbox("💱 표시 통화", available_currencies, key="display_currency")
+    
+    with perf_span(f"page {page}"):
+        if page == "🏠 Dashboard":
+            show_enhanced_dashboard()
+        elif page == "🃏 Card Collection":
+            show_card_collection()
+        elif page == "💫 Wishlist":
+            show_wishlist()
+        elif page == "🎩 Magic Tricks":
+            show_magic_tricks()
 
     # 사이드바 네비게이션 부분 아래에 추가
     st.sidebar.markdown("---")
     st.sidebar.markdown('<h3 class="sub-section-header">💾 데이터 백업</h3>', unsafe_allow_html=True)
     
-    # 백업 다운로드
-    backup_json = create_backup()
-    backup_filename = f"card_magic_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    # 자동 저장 상태 (기록 실패는 다음 기록 때까지 계속 알린다)
+    autosave = get_data_store().autosave
+    if autosave is not None and autosave.error is not None:
+        st.sidebar.warning(f"⚠️ 자동 저장 실패 (다시 시도 중): {autosave.error}")
+    elif get_data_store().dirty:
+        st.sidebar.caption(f"💾 저장 대기 중: {sum(get_data_store().dirty.values())}건")
+    
+    # 백업 다운로드 (버튼을 눌렀을 때만 생성)
+    backup_filename = f"card_magic_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl.gz"
     
+    with perf_span("backup_builder"):
+        backup_data = backup_builder()
     st.sidebar.download_button(
         label="📥 백업 다운로드",
-        data=backup_json,
+        data=backup_data,
         file_name=backup_filename,
-        mime="application/json",
-        help="모든 데이터를 JSON 파일로 백업합니다"
+        mime="application/gzip",
+        help="모든 데이터를 압축된 백업 파일(.jsonl.gz)로 저장합니다"
     )
     
     # 백업 복원
     uploaded_backup = st.sidebar.file_uploader(
         "📤 백업 복원",
-        type=['json'],
-        help="백업 파일을 업로드하여 데이터를 복원합니다"
+        type=['gz', 'json'],
+        accept_multiple_files=True,
+        help="백업 파일(.jsonl.gz 또는 기존 .json)을 업로드하여 데이터를 복원합니다. "
+             "변경분 백업은 기준이 되는 전체 백업과 그 뒤 변경분 파일을 모두 함께 올리세요"
     )
     
-    if uploaded_backup is not None:
+    if uploaded_backup:
         if st.sidebar.button("🔄 복원 실행", type="primary"):
-            success, message = restore_from_backup(uploaded_backup)
+            with perf_span("restore_from_backup"):
+                success, message = restore_from_backup(uploaded_backup)
             if success:
                 st.sidebar.success(f"✅ 백업 복원 완료!\n백업 시간: {message}")
                 st.rerun()
             else:
                 st.sidebar.error(f"❌ 복원 실패: {message}")
 
+    # 대량 가져오기
+    st.sidebar.markdown("---")
+    st.sidebar.markdown('<h3 class="sub-section-header">📂 대량 가져오기</h3>', unsafe_allow_html=True)
+    import_target = st.sidebar.selectbox("가져올 대상", list(IMPORT_TARGETS), key="import_target")
+    uploaded_import = st.sidebar.file_uploader(
+        "📄 CSV / Excel 파일",
+        type=['csv', 'xlsx'],
+        key="import_file",
+        help="첫 행은 컬럼명이어야 합니다 (한글 컬럼명 또는 name, price 등 영문 별칭)"
+    )
+    
+    if uploaded_import is not None:
+        if st.sidebar.button("📥 가져오기 실행", type="primary"):
+            try:
+                report = bulk_import(IMPORT_TARGETS[import_target], uploaded_import, uploaded_import.name)
+            except Exception as e:
+                st.sidebar.error(f"❌ 가져오기 실패: {str(e)}")
+            else:
+                st.sidebar.success(
+                    f"✅ {report['rows']:,}행 가져오기 완료 "
+                    f"({report['seconds']:.2f}초, {report['rows_per_second']:,.0f}행/초)"
+                )
+                if report['skipped']:
+                    st.sidebar.warning(f"⚠️ 이름이 없는 {report['skipped']:,}행은 건너뛰었습니다")
+                if report['new_names']:
+                    st.sidebar.info(f"🆕 새로 등록: {', '.join(report['new_names'])}")
+
+# 페이지 이동 (버튼 콜백: 내비게이션 선택 상자가 그려지기 전에 값을 바꾼다)
+def go_to_page(page):
+    st.session_state.nav_page = page
+
 def show_enhanced_dashboard():
     st.markdown('<h2 class="section-header">📊 Enhanced Dashboard</h2>', unsafe_allow_html=True)
+    dashboard_tiles()
+    price_trend_chart()
+    dashboard_info()
+
+# 통계 타일 조각 (새로고침 버튼은 이 조각만 다시 실행)
+@perf_fragment
+def dashboard_tiles():
+    # 표 전체 대신 누적 집계만 읽는다
+    with perf_span("dashboard_stats"):
+        stats = get_data_store().dashboard_stats()
+    converter = get_currency_converter()
     
     # 메트릭 카드들 - 4개 열
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        total_cards = len(st.session_state.card_collection)
+        total_cards = stats.rows['card_collection']
         st.markdown(f"""
         <div class="metric-card">
             <h3>🃏 보유 카드</h3>
@@ -527,7 +1004,7 @@ def show_enhanced_dashboard():
         """, unsafe_allow_html=True)
     
     with col2:
-        wishlist_count = len(st.session_state.wishlist)
+        wishlist_count = stats.rows['wishlist']
         st.markdown(f"""
         <div class="metric-card">
             <h3>💫 위시리스트</h3>
@@ -537,7 +1014,7 @@ def show_enhanced_dashboard():
         """, unsafe_allow_html=True)
     
     with col3:
-        magic_count = len(st.session_state.magic_list)
+        magic_count = stats.rows['magic_list']
         st.markdown(f"""
         <div class="metric-card">
             <h3>🎩 마술 개수</h3>
@@ -547,14 +1024,13 @@ def show_enhanced_dashboard():
         """, unsafe_allow_html=True)
     
     with col4:
-        if not st.session_state.card_collection.empty:
-            total_value = st.session_state.card_collection['현재가격($)'].sum()
-            total_value_krw = usd_to_krw(total_value)
+        if total_cards:
+            total_value = stats.total('card_collection', '현재가격($)')
             st.markdown(f"""
             <div class="metric-card">
                 <h3>💰 총 가치</h3>
                 <h1>${total_value:.2f}</h1>
-                <p>₩{total_value_krw:,.0f}</p>
+                <p>{converter.format(converter.convert(total_value))}</p>
             </div>
             """, unsafe_allow_html=True)
         else:
@@ -562,7 +1038,7 @@ def show_enhanced_dashboard():
             <div class="metric-card">
                 <h3>💰 총 가치</h3>
                 <h1>$0.00</h1>
-                <p>₩0</p>
+                <p>{converter.format(0)}</p>
             </div>
             """, unsafe_allow_html=True)
     
@@ -570,24 +1046,25 @@ def show_enhanced_dashboard():
     st.markdown('<h3 class="section-header">⚡ Quick Actions</h3>', unsafe_allow_html=True)
     col1, col2, col3, col4 = st.columns(4)
     
+    # 페이지 이동은 사이드바까지 바뀌므로 앱 전체를 다시 실행한다
     with col1:
-        if st.button("🃏 카드 추가", key="quick_add_card", use_container_width=True):
-            st.session_state.current_page = "🃏 Card Collection"
+        if st.button("🃏 카드 추가", key="quick_add_card", use_container_width=True,
+                     on_click=go_to_page, args=("🃏 Card Collection",)):
             st.rerun()
     
     with col2:
-        if st.button("💫 위시리스트 추가", key="quick_add_wish", use_container_width=True):
-            st.session_state.current_page = "💫 Wishlist"
+        if st.button("💫 위시리스트 추가", key="quick_add_wish", use_container_width=True,
+                     on_click=go_to_page, args=("💫 Wishlist",)):
             st.rerun()
     
     with col3:
-        if st.button("🎩 마술 추가", key="quick_add_magic", use_container_width=True):
-            st.session_state.current_page = "🎩 Magic Tricks"
+        if st.button("🎩 마술 추가", key="quick_add_magic", use_container_width=True,
+                     on_click=go_to_page, args=("🎩 Magic Tricks",)):
             st.rerun()
     
     with col4:
-        if st.button("📊 통계 새로고침", key="refresh_stats", use_container_width=True):
-            st.rerun()
+        # 조각 안의 버튼이므로 누르면 통계 타일만 다시 그린다
+        st.button("📊 통계 새로고침", key="refresh_stats", use_container_width=True)
     
     # 통계 및 인사이트
     col1, col2 = st.columns(2)
@@ -595,31 +1072,28 @@ def show_enhanced_dashboard():
     with col1:
         st.markdown('<h3 class="sub-section-header">📈 컬렉션 통계</h3>', unsafe_allow_html=True)
         
-        if not st.session_state.card_collection.empty:
-            df = st.session_state.card_collection.copy()
-            
+        if total_cards:
             # 개봉 상태별 분포
-            if '개봉여부' in df.columns:
-                status_dist = df['개봉여부'].value_counts()
+            status_dist = stats.distribution('card_collection', '개봉여부')
+            if status_dist:
                 st.write("**📦 개봉 상태별 분포:**")
-                for status, count in status_dist.items():
+                for status, count in status_dist:
                     icon = get_status_icon(status)
                     st.write(f"{icon} {status}: {count}개")
             
             # 제조사별 분포
-            manufacturer_dist = df['제조사'].value_counts().head(5)
+            manufacturer_dist = stats.distribution('card_collection', '제조사', limit=5)
             st.write("**🏭 주요 제조사 TOP 5:**")
-            for manufacturer, count in manufacturer_dist.items():
+            for manufacturer, count in manufacturer_dist:
                 st.write(f"🏷️ {manufacturer}: {count}개")
             
             # 투자 성과
-            if '구매가격($)' in df.columns and '현재가격($)' in df.columns:
-                total_invested = df['구매가격($)'].sum()
-                total_current = df['현재가격($)'].sum()
-                if total_invested > 0:
-                    roi = ((total_current - total_invested) / total_invested) * 100
-                    roi_color = "🟢" if roi >= 0 else "🔴"
-                    st.write(f"**💹 총 수익률:** {roi_color} {roi:.2f}%")
+            total_invested = stats.total('card_collection', '구매가격($)')
+            total_current = stats.total('card_collection', '현재가격($)')
+            if total_invested > 0:
+                roi = ((total_current - total_invested) / total_invested) * 100
+                roi_color = "🟢" if roi >= 0 else "🔴"
+                st.write(f"**💹 총 수익률:** {roi_color} {roi:.2f}%")
         else:
             st.info("📝 아직 카드가 없습니다. 첫 카드를 추가해보세요!")
     
@@ -627,47 +1101,102 @@ def show_enhanced_dashboard():
         st.markdown('<h3 class="sub-section-header">🎯 중요한 정보</h3>', unsafe_allow_html=True)
         
         # 높은 우선순위 위시리스트
-        if not st.session_state.wishlist.empty:
-            high_priority = st.session_state.wishlist[st.session_state.wishlist['우선순위'] >= 4.0]
-            if not high_priority.empty:
-                st.write("**🔥 높은 우선순위 위시리스트:**")
-                for _, item in high_priority.head(5).iterrows():
-                    priority_icon = get_priority_color(item['우선순위'])
-                    type_icon = "🃏" if item['타입'] == "카드" else "🎩"
-                    st.write(f"{priority_icon} {type_icon} {item['이름']} (${item['가격($)']})")
+        if stats.high_priority:
+            st.write("**🔥 높은 우선순위 위시리스트:**")
+            for item in stats.top['wishlist']:
+                priority_icon = get_priority_color(item['우선순위'])
+                type_icon = "🃏" if item['타입'] == "카드" else "🎩"
+                st.write(f"{priority_icon} {type_icon} {item['이름']} (${item['가격($)']})")
         
         # 최고 평점 마술
-        if not st.session_state.magic_list.empty:
-            top_magic = st.session_state.magic_list.nlargest(3, '신기함정도')
+        if magic_count:
             st.write("**⭐ 최고 평점 마술 TOP 3:**")
-            for _, magic in top_magic.iterrows():
+            for magic in stats.top['magic_list']:
                 stars = display_stars(magic['신기함정도'])
                 st.write(f"🎩 {magic['마술명']} {stars}")
         
         # 총 위시리스트 가치
-        if not st.session_state.wishlist.empty:
-            total_wishlist_value = st.session_state.wishlist['가격($)'].sum()
-            total_wishlist_krw = usd_to_krw(total_wishlist_value)
-            st.write(f"**💫 위시리스트 총 가치:** ${total_wishlist_value:.2f} (₩{total_wishlist_krw:,.0f})")
+        if wishlist_count:
+            total_wishlist_value = stats.total('wishlist', '가격($)')
+            total_wishlist_converted = converter.format(converter.convert(total_wishlist_value))
+            st.write(f"**💫 위시리스트 총 가치:** ${total_wishlist_value:.2f} ({total_wishlist_converted})")
+    
+# 가격 추이 조각 (기간·제조사·카드명을 바꾸면 차트만 다시 그린다)
+@perf_fragment
+def price_trend_chart():
+    # 가격 추이 (현재가격 변화 기록)
+    store = get_data_store()
+    with perf_span("price_history"):
+        prices = store.price_history()
+    if store.dashboard_stats().rows['card_collection'] and prices is not None:
+        st.markdown('<h3 class="sub-section-header">📉 가격 추이</h3>', unsafe_allow_html=True)
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            period = st.selectbox("기간", list(PRICE_PERIODS), key="price_period")
+        with col2:
+            price_manufacturer = st.selectbox("제조사", ["전체"] + st.session_state.manufacturers,
+                                              key="price_manufacturer")
+        with col3:
+            price_card = st.text_input("카드명", key="price_card", help="입력하면 해당 카드의 가격 변화를 표시합니다")
+        days = PRICE_PERIODS[period]
+        start = None if days is None else today_day() - days
+        manufacturer = None if price_manufacturer == "전체" else price_manufacturer
+        
+        # plotly.express보다 가벼운 graph_objects로 직접 그린다 (차트가 있는 화면에서만 불러옴)
+        import plotly.graph_objects as go
+        if price_card:
+            with perf_span("price_query"):
+                history = prices.history([price_card], manufacturer, start=start)
+            if history.empty:
+                st.info("📝 해당 카드의 가격 기록이 없습니다")
+            else:
+                # 이름이 같은 덱이 여럿이면 덱(행 ID)마다 선을 따로 그린다
+                fig = go.Figure()
+                for row_id, points in history.groupby(ROW_ID, sort=False):
+                    fig.add_trace(go.Scatter(x=points['일자'], y=points['가격($)'], mode='lines+markers',
+                                             line_shape='hv', name=f"{price_card} #{row_id}"))
+                fig.update_layout(xaxis_title='일자', yaxis_title='가격($)', showlegend=history[ROW_ID].nunique() > 1)
+                st.plotly_chart(fig, use_container_width=True)
+        else:
+            with perf_span("price_query"):
+                series = prices.portfolio(manufacturer, start=start)
+            if len(series):
+                st.metric("💰 보유 카드 가치", f"${series.iloc[-1]:,.2f}",
+                          f"{series.iloc[-1] - series.iloc[0]:+,.2f} ({period})")
+                fig = go.Figure(go.Scatter(x=series.index, y=series.values, mode='lines', line_shape='hv'))
+                fig.update_layout(xaxis_title='일자', yaxis_title='총 가치($)')
+                st.plotly_chart(fig, use_container_width=True)
+    
+# 환율·평균·보안 정보
+def dashboard_info():
+    stats = get_data_store().dashboard_stats()
+    converter = get_currency_converter()
+    total_cards = stats.rows['card_collection']
+    wishlist_count = stats.rows['wishlist']
+    magic_count = stats.rows['magic_list']
     
     # 환율 정보 및 유용한 팁
     st.markdown('<h3 class="sub-section-header">💡 유용한 정보</h3>', unsafe_allow_html=True)
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        current_rate = get_exchange_rate()
-        st.info(f"💱 **현재 환율**\n$1 = ₩{current_rate:,.0f}")
+        rate_updated_at = get_rate_provider().updated_at
+        if rate_updated_at is None:
+            rate_note = "기본값 (환율 조회 전)"
+        else:
+            rate_note = f"{datetime.fromtimestamp(rate_updated_at).strftime('%Y-%m-%d %H:%M')} 기준"
+        st.info(f"💱 **현재 환율**\n$1 = {converter.format(converter.rate)}\n\n{rate_note}")
     
     with col2:
-        if not st.session_state.card_collection.empty:
-            avg_rating = st.session_state.card_collection['디자인별점'].mean()
+        if total_cards:
+            avg_rating = stats.mean('card_collection', '디자인별점')
             st.info(f"⭐ **평균 카드 별점**\n{avg_rating:.1f}/5.0")
         else:
             st.info("⭐ **평균 카드 별점**\n데이터 없음")
     
     with col3:
-        if not st.session_state.magic_list.empty:
-            avg_difficulty = st.session_state.magic_list['난이도'].mean()
+        if magic_count:
+            avg_difficulty = stats.mean('magic_list', '난이도')
             st.info(f"🎯 **평균 마술 난이도**\n{avg_difficulty:.1f}/5.0")
         else:
             st.info("🎯 **평균 마술 난이도**\n데이터 없음")
@@ -677,12 +1206,20 @@ def show_enhanced_dashboard():
     col1, col2 = st.columns(2)
     
     with col1:
-        total_records = len(st.session_state.card_collection) + len(st.session_state.wishlist) + len(st.session_state.magic_list)
-        st.info(f"📊 **총 저장된 레코드**\n{total_records}개")
+        total_records = total_cards + wishlist_count + magic_count
+        memory = get_data_store().memory
+        untyped = sum(before for before, _ in memory.values())
+        typed = sum(after for _, after in memory.values())
+        memory_note = ""
+        if untyped:
+            memory_note = (f"\n\n메모리(로드 시점) {typed / 1024 ** 2:.1f}MB "
+                           f"(타입 적용 전 {untyped / 1024 ** 2:.1f}MB, -{(1 - typed / untyped) * 100:.0f}%)")
+        st.info(f"📊 **총 저장된 레코드**\n{total_records}개{memory_note}")
     
     with col2:
         if st.button("💾 즉시 백업", help="현재 데이터를 즉시 백업합니다"):
-            backup_json = create_backup()
+            with perf_span("create_backup"):
+                backup_json = create_backup()
             backup_filename = f"emergency_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
             st.download_button(
                 label="📥 백업 파일 다운로드",
@@ -693,101 +1230,119 @@ def show_enhanced_dashboard():
 
 def show_card_collection():
     st.markdown('<h2 class="section-header">🃏 Card Collection Management</h2>', unsafe_allow_html=True)
-    
-    # 사이드바 필터링 및 검색 섹션
-    with st.sidebar:
-        st.markdown('<h3 class="sub-section-header">🔍 Filter & Search</h3>', unsafe_allow_html=True)
-        
-        search_term = st.text_input("🔎 카드명 검색")
-        manufacturer_filter = st.selectbox("제조사 필터", 
-                                         ["전체"] + st.session_state.manufacturers)
-        status_filter = st.selectbox("개봉상태 필터", ["전체", "미개봉", "개봉", "새 덱"])
-        sort_by = st.selectbox("정렬 기준", ["카드명", "구매가격($)", "현재가격($)", "디자인별점"])
-        
-        # 페이지네이션 설정
-        st.markdown("---")
-        st.markdown("**📄 페이지 설정**")
-        cards_per_page = st.selectbox("페이지당 카드 수", [5, 10, 15, 20], index=1)
-    
+    card_collection_section()
+
+# 카드 추가 폼과 목록 조각 (폼을 제출하면 이 조각만 다시 실행되어 새 카드가 목록에 바로 보인다)
+@perf_fragment
+def card_collection_section():
     # 카드 추가 섹션
     st.markdown('<h3 class="sub-section-header">➕ 새 카드 추가</h3>', unsafe_allow_html=True)
     with st.expander("카드 정보 입력", expanded=False):
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            st.text_input("카드명", key="new_card_name")
-            st.number_input("구매가격($)", min_value=0.0, step=0.01, key="new_card_purchase_price")
-            st.number_input("현재가격($)", min_value=0.0, step=0.01, key="new_card_current_price")
+        # 입력 방식에 따라 입력칸이 바뀌므로 이 선택만 폼 밖에 둔다
+        st.radio("제조사 선택", ["기존 선택", "새로 추가"], key="manufacturer_option", horizontal=True)
         
-        with col2:
-            st.radio("제조사 선택", ["기존 선택", "새로 추가"], key="manufacturer_option")
+        # 폼 안의 입력은 제출할 때 한 번에 전달된다 (입력할 때마다 rerun하지 않음)
+        with st.form("add_card_form", border=False):
+            col1, col2, col3 = st.columns(3)
             
-            if st.session_state.manufacturer_option == "기존 선택":
-                st.selectbox("제조사", st.session_state.manufacturers, key="selected_manufacturer")
-            else:
-                st.text_input("새 제조사명", key="new_manufacturer_input")
+            with col1:
+                st.text_input("카드명", key="new_card_name")
+                st.number_input("구매가격($)", min_value=0.0, step=0.01, key="new_card_purchase_price")
+                st.number_input("현재가격($)", min_value=0.0, step=0.01, key="new_card_current_price")
             
-            st.selectbox("단종여부", ["단종", "현재판매"], key="new_card_discontinued")
-            st.selectbox("개봉여부", ["미개봉", "개봉", "새 덱"], key="new_card_status")
-        
-        with col3:
-            st.text_input("판매사이트 URL", key="new_card_site")
-            st.slider("디자인별점", 1.0, 5.0, 3.0, 0.5, key="new_card_rating")
-            st.selectbox("피니시", ["Standard", "Air Cushion", "Linen", "Smooth", "Embossed"], key="new_card_finish")
-            st.selectbox("디자인스타일", ["클래식", "모던", "빈티지", "미니멀", "화려함", "테마"], key="new_card_style")
+            with col2:
+                if st.session_state.manufacturer_option == "기존 선택":
+                    st.selectbox("제조사", st.session_state.manufacturers, key="selected_manufacturer")
+                else:
+                    st.text_input("새 제조사명", key="new_manufacturer_input")
+                
+                st.selectbox("단종여부", ["단종", "현재판매"], key="new_card_discontinued")
+                st.selectbox("개봉여부", ["미개봉", "개봉", "새 덱"], key="new_card_status")
+            
+            with col3:
+                st.text_input("판매사이트 URL", key="new_card_site")
+                st.slider("디자인별점", 1.0, 5.0, 3.0, 0.5, key="new_card_rating")
+                st.selectbox("피니시", ["Standard", "Air Cushion", "Linen", "Smooth", "Embossed"], key="new_card_finish")
+                st.selectbox("디자인스타일", ["클래식", "모던", "빈티지", "미니멀", "화려함", "테마"], key="new_card_style")
+            
+            photo_uploader("new_card")
+            submitted = st.form_submit_button("카드 추가", type="primary")
         
-        if st.button("카드 추가", type="primary"):
+        if submitted:
             if st.session_state.new_card_name:
-                add_card_to_collection()
+                photo_error = add_card_to_collection()
                 st.success("✅ 카드가 성공적으로 추가되었습니다!")
+                if photo_error:
+                    st.warning(f"📷 사진은 붙이지 못했습니다: {photo_error}")
                 # 페이지 초기화 (새 카드가 첫 페이지에 표시되도록)
                 if 'current_page' in st.session_state:
                     st.session_state.current_page = 1
-                st.rerun()
             else:
                 st.error("❌ 카드명을 입력해주세요!")
     
-    # 데이터 필터링 및 정렬
-    df = st.session_state.card_collection.copy()
-    
-    if not df.empty:
-        # 검색 필터
-        if search_term:
-            df = df[df['카드명'].str.contains(search_term, case=False, na=False)]
-        
-        # 제조사 필터
-        if manufacturer_filter != "전체":
-            df = df[df['제조사'] == manufacturer_filter]
+    card_collection_list()
+
+# 카드 목록 조각 (필터 변경·페이지 이동·삭제는 이 조각만 다시 실행)
+@perf_fragment
+def card_collection_list():
+    # 사이드바 필터링 및 검색 섹션
+    with st.sidebar:
+        st.markdown('<h3 class="sub-section-header">🔍 Filter & Search</h3>', unsafe_allow_html=True)
         
-        # 개봉상태 필터
-        if status_filter != "전체":
-            df = df[df['개봉여부'] == status_filter]
+        search_term = st.text_input("🔎 카드 검색", help="이름뿐 아니라 제조사·디자인스타일·피니시에서도 찾습니다. 초성(예: ㅂㅇㅅㅋ)으로도 검색할 수 있습니다.")
+        manufacturer_filter = st.selectbox("제조사 필터", 
+                                         ["전체"] + st.session_state.manufacturers)
+        status_filter = st.selectbox("개봉상태 필터", ["전체", "미개봉", "개봉", "새 덱"])
+        sort_by = st.selectbox("정렬 기준", ["카드명", "구매가격($)", "현재가격($)", "디자인별점", "관련도"])
         
-        # 정렬
-        if not df.empty:
-            df = df.sort_values(sort_by, ascending=True)
+        # 페이지네이션 설정
+        st.markdown("---")
+        st.markdown("**📄 페이지 설정**")
+        cards_per_page = st.selectbox("페이지당 카드 수", [5, 10, 15, 20], index=1)
+        view_mode = st.radio("보기 방식", VIEW_MODES, horizontal=True, key="card_view_mode")
+    
+    # 데이터 필터링 및 정렬
+    filters = []
+    
+    # 제조사 필터
+    if manufacturer_filter != "전체":
+        filters.append(('제조사', '==', manufacturer_filter))
+    
+    # 개봉상태 필터
+    if status_filter != "전체":
+        filters.append(('개봉여부', '==', status_filter))
+    
+    # 검색은 색인으로 처리 ('관련도' 정렬은 검색 일치도 순)
+    query = TableQuery('card_collection', filters, None if sort_by == "관련도" else sort_by,
+                       ascending=True, search=search_term)
+    with perf_span("filter"):
+        total_cards = query.count()
     
     # 카드 컬렉션 표시
     st.markdown('<h3 class="sub-section-header">📚 Card Collection</h3>', unsafe_allow_html=True)
     
-    if not df.empty:
+    if total_cards > 0:
         # 통계 요약
         col1, col2, col3, col4 = st.columns(4)
         with col1:
-            st.metric("총 카드 수", len(df))
+            st.metric("총 카드 수", total_cards)
         with col2:
-            total_purchase = df['구매가격($)'].sum()
+            total_purchase = query.aggregate('sum', '구매가격($)')
             st.metric("총 구매금액", f"${total_purchase:.2f}")
         with col3:
-            total_current = df['현재가격($)'].sum()
+            total_current = query.aggregate('sum', '현재가격($)')
             st.metric("현재 총 가치", f"${total_current:.2f}")
         with col4:
             if total_purchase > 0:
                 roi = ((total_current - total_purchase) / total_purchase) * 100
                 st.metric("수익률", f"{roi:.1f}%", delta=f"{roi:.1f}%")
         
+        # 고밀도 표 보기
+        if view_mode == "표(고밀도)":
+            render_table_grid('card_collection', query, total_cards, key="card")
+            return
+        
         # 페이지네이션 계산
-        total_cards = len(df)
         total_pages = (total_cards - 1) // cards_per_page + 1 if total_cards > 0 else 1
         
         # 현재 페이지 상태 관리
@@ -800,59 +1355,25 @@ def show_card_collection():
         
         # 페이지네이션 컨트롤 (카드가 페이지당 표시 개수보다 많을 때만 표시)
         if total_cards > cards_per_page:
-            st.markdown("---")
-            col1, col2, col3, col4, col5 = st.columns([1, 1, 2, 1, 1])
-            
-            with col1:
-                if st.button("⏮️ 첫 페이지", disabled=(st.session_state.current_page == 1)):
-                    st.session_state.current_page = 1
-                    st.rerun()
-            
-            with col2:
-                if st.button("◀️ 이전", disabled=(st.session_state.current_page == 1)):
-                    st.session_state.current_page -= 1
-                    st.rerun()
-            
-            with col3:
-                # 페이지 선택 드롭다운
-                page_options = list(range(1, total_pages + 1))
-                selected_page = st.selectbox(
-                    f"페이지 {st.session_state.current_page} / {total_pages}",
-                    page_options,
-                    index=st.session_state.current_page - 1,
-                    key="page_selector"
-                )
-                if selected_page != st.session_state.current_page:
-                    st.session_state.current_page = selected_page
-                    st.rerun()
-            
-            with col4:
-                if st.button("▶️ 다음", disabled=(st.session_state.current_page == total_pages)):
-                    st.session_state.current_page += 1
-                    st.rerun()
-            
-            with col5:
-                if st.button("⏭️ 마지막 페이지", disabled=(st.session_state.current_page == total_pages)):
-                    st.session_state.current_page = total_pages
-                    st.rerun()
-            
-            # 현재 페이지 정보 표시
-            start_idx = (st.session_state.current_page - 1) * cards_per_page + 1
-            end_idx = min(st.session_state.current_page * cards_per_page, total_cards)
-            st.info(f"📄 {start_idx}-{end_idx} / {total_cards} 카드 표시 중")
+            render_pagination('current_page', 'page_selector', "card", total_cards, cards_per_page, "카드")
         
         st.markdown("---")
         
         # 현재 페이지에 해당하는 카드만 추출
         start_idx = (st.session_state.current_page - 1) * cards_per_page
-        end_idx = start_idx + cards_per_page
-        page_df = df.iloc[start_idx:end_idx]
+        with perf_span("query_page"):
+            page_df = query.page(start_idx, cards_per_page)
+        converter = get_currency_converter()
+        page_df = converter.add_columns(page_df, ['구매가격($)', '현재가격($)'])
+        # 사진은 이 페이지의 카드 것만 읽는다
+        thumbnails = page_thumbnails('card_collection', page_df)
         
         # 카드 목록 표시 (페이지별)
-        for idx, row in page_df.iterrows():
+        for _, row in page_df.iterrows():
             # 컬럼 생성
             col1, col2, col3, col4, col5 = st.columns([2, 3, 3, 3, 1])
             with col1:
+                show_thumbnail(thumbnails, row)
                 status_icon = get_status_icon(row['개봉여부'])
                 st.markdown(f"**{status_icon} {row['카드명']}**")
                 st.caption(f"🏭 {row['제조사']} | {row['피니시']} | {row['디자인스타일']}")
@@ -860,6 +1381,8 @@ def show_card_collection():
             with col2:
                 st.write(f"**구매:** ${row['구매가격($)']:.2f}")
                 st.write(f"**현재:** ${row['현재가격($)']:.2f}")
+                st.caption(f"{converter.format(row[converter.column_name('현재가격($)')])} "
+                           f"(구매 {converter.format(row[converter.column_name('구매가격($)')])})")
                 profit = row['현재가격($)'] - row['구매가격($)']
             
             with col3:
@@ -875,19 +1398,14 @@ def show_card_collection():
                     st.write("링크 없음")
             
             with col5:
-                if st.button("🗑️ 삭제", key=f"delete_card_{idx}", help="카드 삭제"):
-                    st.session_state.card_collection = st.session_state.card_collection.drop(idx).reset_index(drop=True)
-                    save_data()
-                    
-                    # 삭제 후 페이지 조정
-                    remaining_cards = len(st.session_state.card_collection)
-                    new_total_pages = (remaining_cards - 1) // cards_per_page + 1 if remaining_cards > 0 else 1
-                    if st.session_state.current_page > new_total_pages:
-                        st.session_state.current_page = new_total_pages
-                    
-                    st.rerun()
+                st.checkbox("선택", key=f"card_select_{int(row[ROW_ID])}")
+                st.button("🗑️ 삭제", key=f"delete_card_{int(row[ROW_ID])}", help="카드 삭제",
+                          on_click=record_row_changes, args=([('remove', 'card_collection', [int(row[ROW_ID])])], [[row.to_dict()]]))
             st.markdown("---")  # 카드 간 구분선
         
+        # 체크한 카드 일괄 삭제/변경
+        render_batch_actions('card_collection', checked_rows(page_df, "card"), "card")
+        
         # 페이지 하단에도 페이지네이션 표시 (카드가 많을 때)
         if total_cards > cards_per_page:
             col1, col2, col3 = st.columns([1, 2, 1])
@@ -900,96 +1418,110 @@ def show_card_collection():
 
 def show_wishlist():
     st.markdown('<h2 class="section-header">💫 Wishlist Management</h2>', unsafe_allow_html=True)
-    
-    # 사이드바 필터링 및 검색 섹션
-    with st.sidebar:
-        st.markdown('<h3 class="sub-section-header">🔍 Filter & Search</h3>', unsafe_allow_html=True)
-        
-        wish_search = st.text_input("🔎 아이템명 검색", key="wish_search")
-        type_filter = st.selectbox("타입 필터", ["전체", "카드", "마술용품", "책", "DVD", "기타"])
-        priority_filter = st.selectbox("우선순위 필터", ["전체", "높음(4+)", "중간(2-4)", "낮음(~2)"])
-        sort_by = st.selectbox("정렬 기준", ["우선순위", "아이템명", "예상가격($)", "타입"])
-        
-        # 페이지네이션 설정
-        st.markdown("---")
-        st.markdown("**📄 페이지 설정**")
-        wish_items_per_page = st.selectbox("페이지당 아이템 수", [5, 10, 15, 20], index=1, key="wish_items_per_page")
-    
+    wishlist_section()
+
+# 위시리스트 추가 폼과 목록 조각
+@perf_fragment
+def wishlist_section():
     # 위시리스트 아이템 추가 섹션
     st.markdown('<h3 class="sub-section-header">➕ 새 아이템 추가</h3>', unsafe_allow_html=True)
     with st.expander("위시리스트 아이템 입력", expanded=False):
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            st.text_input("아이템명", key="new_wish_name")
-            st.selectbox("타입", ["카드", "마술용품", "책", "DVD", "기타"], key="new_wish_type")
-            st.number_input("예상가격($)", min_value=0.0, step=0.01, key="new_wish_price")
-        
-        with col2:
-            st.text_input("판매사이트 URL", key="new_wish_site")
-            st.slider("우선순위", 1.0, 5.0, 3.0, 0.5, key="new_wish_priority")
-        
-        with col3:
-            st.text_area("비고", key="new_wish_note", height=100)
+        with st.form("add_wish_form", border=False):
+            col1, col2, col3 = st.columns(3)
+            
+            with col1:
+                st.text_input("아이템명", key="new_wish_name")
+                st.selectbox("타입", ["카드", "마술용품", "책", "DVD", "기타"], key="new_wish_type")
+                st.number_input("예상가격($)", min_value=0.0, step=0.01, key="new_wish_price")
+            
+            with col2:
+                st.text_input("판매사이트 URL", key="new_wish_site")
+                st.slider("우선순위", 1.0, 5.0, 3.0, 0.5, key="new_wish_priority")
+            
+            with col3:
+                st.text_area("비고", key="new_wish_note", height=100)
+            
+            photo_uploader("new_wish")
+            submitted = st.form_submit_button("위시리스트에 추가", type="primary")
         
-        if st.button("위시리스트에 추가", type="primary"):
+        if submitted:
             if st.session_state.new_wish_name:
-                add_card_to_wishlist()
+                photo_error = add_card_to_wishlist()
                 st.success("✅ 위시리스트에 성공적으로 추가되었습니다!")
+                if photo_error:
+                    st.warning(f"📷 사진은 붙이지 못했습니다: {photo_error}")
                 # 페이지 초기화
                 if 'current_wish_page' in st.session_state:
                     st.session_state.current_wish_page = 1
-                st.rerun()
             else:
                 st.error("❌ 아이템명을 입력해주세요!")
     
-    # 위시리스트 데이터 필터링 및 정렬
-    wish_df = st.session_state.wishlist.copy()
-    
-    if not wish_df.empty:
-        # 검색 필터
-        if wish_search:
-            wish_df = wish_df[wish_df['이름'].str.contains(wish_search, case=False, na=False)]
-        
-        # 타입 필터
-        if type_filter != "전체":
-            wish_df = wish_df[wish_df['타입'] == type_filter]
+    wishlist_list()
+
+# 위시리스트 목록 조각 (필터 변경·페이지 이동·삭제는 이 조각만 다시 실행)
+@perf_fragment
+def wishlist_list():
+    # 사이드바 필터링 및 검색 섹션
+    with st.sidebar:
+        st.markdown('<h3 class="sub-section-header">🔍 Filter & Search</h3>', unsafe_allow_html=True)
         
-        # 우선순위 필터
-        if priority_filter == "높음(4+)":
-            wish_df = wish_df[wish_df['우선순위'] >= 4.0]
-        elif priority_filter == "중간(2-4)":
-            wish_df = wish_df[(wish_df['우선순위'] >= 2.0) & (wish_df['우선순위'] < 4.0)]
-        elif priority_filter == "낮음(~2)":
-            wish_df = wish_df[wish_df['우선순위'] < 2.0]
+        wish_search = st.text_input("🔎 아이템 검색", key="wish_search", help="이름뿐 아니라 타입·비고에서도 찾습니다. 초성(예: ㅂㅇㅅㅋ)으로도 검색할 수 있습니다.")
+        type_filter = st.selectbox("타입 필터", ["전체", "카드", "마술용품", "책", "DVD", "기타"])
+        priority_filter = st.selectbox("우선순위 필터", ["전체", "높음(4+)", "중간(2-4)", "낮음(~2)"])
+        sort_by = st.selectbox("정렬 기준", ["우선순위", "아이템명", "예상가격($)", "타입", "관련도"])
         
-        # 정렬
-        if not wish_df.empty:
-            if sort_by == "우선순위":
-                wish_df = wish_df.sort_values('우선순위', ascending=False)
-            else:
-                wish_df = wish_df.sort_values(sort_by, ascending=True)
+        # 페이지네이션 설정
+        st.markdown("---")
+        st.markdown("**📄 페이지 설정**")
+        wish_items_per_page = st.selectbox("페이지당 아이템 수", [5, 10, 15, 20], index=1, key="wish_items_per_page")
+        view_mode = st.radio("보기 방식", VIEW_MODES, horizontal=True, key="wish_view_mode")
+    
+    # 위시리스트 데이터 필터링 및 정렬
+    filters = []
+    
+    # 타입 필터
+    if type_filter != "전체":
+        filters.append(('타입', '==', type_filter))
+    
+    # 우선순위 필터
+    if priority_filter == "높음(4+)":
+        filters.append(('우선순위', '>=', 4.0))
+    elif priority_filter == "중간(2-4)":
+        filters.extend([('우선순위', '>=', 2.0), ('우선순위', '<', 4.0)])
+    elif priority_filter == "낮음(~2)":
+        filters.append(('우선순위', '<', 2.0))
+    
+    # 정렬 (화면 표시명을 실제 컬럼명으로 변환)
+    sort_column = {"아이템명": "이름", "예상가격($)": "가격($)", "관련도": None}.get(sort_by, sort_by)
+    query = TableQuery('wishlist', filters, sort_column, ascending=(sort_by != "우선순위"),
+                       search=wish_search)
+    with perf_span("filter"):
+        total_items = query.count()
     
     # 위시리스트 표시
     st.markdown('<h3 class="sub-section-header">🛍️ Wishlist Items</h3>', unsafe_allow_html=True)
     
-    if not wish_df.empty:
+    if total_items > 0:
         # 위시리스트 통계
         col1, col2, col3, col4 = st.columns(4)
         with col1:
-            st.metric("총 아이템 수", len(wish_df))
+            st.metric("총 아이템 수", total_items)
         with col2:
-            total_wishlist_value = wish_df['가격($)'].sum()
+            total_wishlist_value = query.aggregate('sum', '가격($)')
             st.metric("총 예상금액", f"${total_wishlist_value:.2f}")
         with col3:
-            avg_priority = wish_df['우선순위'].mean()
+            avg_priority = query.aggregate('mean', '우선순위')
             st.metric("평균 우선순위", f"{avg_priority:.1f}/5.0")
         with col4:
-            high_priority_count = len(wish_df[wish_df['우선순위'] >= 4.0])
+            high_priority_count = query.count(('우선순위', '>=', 4.0))
             st.metric("높은 우선순위", f"{high_priority_count}개")
         
+        # 고밀도 표 보기
+        if view_mode == "표(고밀도)":
+            render_table_grid('wishlist', query, total_items, key="wish")
+            return
+        
         # 페이지네이션 계산
-        total_items = len(wish_df)
         total_pages = (total_items - 1) // wish_items_per_page + 1 if total_items > 0 else 1
         
         # 현재 페이지 상태 관리
@@ -1002,58 +1534,24 @@ def show_wishlist():
         
         # 페이지네이션 컨트롤 (아이템이 페이지당 표시 개수보다 많을 때만 표시)
         if total_items > wish_items_per_page:
-            st.markdown("---")
-            col1, col2, col3, col4, col5 = st.columns([1, 1, 2, 1, 1])
-            
-            with col1:
-                if st.button("⏮️ 첫 페이지", disabled=(st.session_state.current_wish_page == 1), key="wish_first"):
-                    st.session_state.current_wish_page = 1
-                    st.rerun()
-            
-            with col2:
-                if st.button("◀️ 이전", disabled=(st.session_state.current_wish_page == 1), key="wish_prev"):
-                    st.session_state.current_wish_page -= 1
-                    st.rerun()
-            
-            with col3:
-                page_options = list(range(1, total_pages + 1))
-                selected_page = st.selectbox(
-                    f"페이지 {st.session_state.current_wish_page} / {total_pages}",
-                    page_options,
-                    index=st.session_state.current_wish_page - 1,
-                    key="wish_page_selector"
-                )
-                if selected_page != st.session_state.current_wish_page:
-                    st.session_state.current_wish_page = selected_page
-                    st.rerun()
-            
-            with col4:
-                if st.button("▶️ 다음", disabled=(st.session_state.current_wish_page == total_pages), key="wish_next"):
-                    st.session_state.current_wish_page += 1
-                    st.rerun()
-            
-            with col5:
-                if st.button("⏭️ 마지막 페이지", disabled=(st.session_state.current_wish_page == total_pages), key="wish_last"):
-                    st.session_state.current_wish_page = total_pages
-                    st.rerun()
-            
-            # 현재 페이지 정보 표시
-            start_idx = (st.session_state.current_wish_page - 1) * wish_items_per_page + 1
-            end_idx = min(st.session_state.current_wish_page * wish_items_per_page, total_items)
-            st.info(f"📄 {start_idx}-{end_idx} / {total_items} 아이템 표시 중")
+            render_pagination('current_wish_page', 'wish_page_selector', "wish", total_items, wish_items_per_page, "아이템")
         
         st.markdown("---")
         
         # 현재 페이지에 해당하는 아이템만 추출
         start_idx = (st.session_state.current_wish_page - 1) * wish_items_per_page
-        end_idx = start_idx + wish_items_per_page
-        page_wish_df = wish_df.iloc[start_idx:end_idx]
+        with perf_span("query_page"):
+            page_wish_df = query.page(start_idx, wish_items_per_page)
+        converter = get_currency_converter()
+        page_wish_df = converter.add_columns(page_wish_df, ['가격($)'])
+        thumbnails = page_thumbnails('wishlist', page_wish_df)
         
         # 위시리스트 아이템 목록 표시 (페이지별)
-        for idx, row in page_wish_df.iterrows():
+        for _, row in page_wish_df.iterrows():
             # 컬럼 생성
             col1, col2, col3, col4, col5 = st.columns([2, 3, 3, 3, 1])
             with col1:
+                show_thumbnail(thumbnails, row)
                 priority_icon = get_priority_color(row['우선순위'])
                 type_icon = "🃏" if row['타입'] == "카드" else "🎩" if row['타입'] == "마술용품" else "📚" if row['타입'] == "책" else "💿" if row['타입'] == "DVD" else "📦"
                 st.markdown(f"**{priority_icon} {type_icon} {row['이름']}**")
@@ -1061,8 +1559,7 @@ def show_wishlist():
             
             with col2:
                 st.write(f"**예상:** ${row['가격($)']:.2f}")
-                krw_price = usd_to_krw(row['가격($)'])
-                st.caption(f"₩{krw_price:,.0f}")
+                st.caption(converter.format(row[converter.column_name('가격($)')]))
             
             with col3:
                 priority_stars = display_stars(row['우선순위'])
@@ -1079,19 +1576,14 @@ def show_wishlist():
                     st.caption(f"💬 {row['비고']}")
             
             with col5:
-                if st.button("🗑️ 삭제", key=f"delete_wish_{idx}", help="아이템 삭제"):
-                    st.session_state.wishlist = st.session_state.wishlist.drop(idx).reset_index(drop=True)
-                    save_data()
-                    
-                    # 삭제 후 페이지 조정
-                    remaining_items = len(st.session_state.wishlist)
-                    new_total_pages = (remaining_items - 1) // wish_items_per_page + 1 if remaining_items > 0 else 1
-                    if st.session_state.current_wish_page > new_total_pages:
-                        st.session_state.current_wish_page = new_total_pages
-                    
-                    st.rerun()
+                st.checkbox("선택", key=f"wish_select_{int(row[ROW_ID])}")
+                st.button("🗑️ 삭제", key=f"delete_wish_{int(row[ROW_ID])}", help="아이템 삭제",
+                          on_click=record_row_changes, args=([('remove', 'wishlist', [int(row[ROW_ID])])], [[row.to_dict()]]))
             st.markdown("---")  # 아이템 간 구분선
         
+        # 체크한 아이템 일괄 삭제/변경
+        render_batch_actions('wishlist', checked_rows(page_wish_df, "wish"), "wish")
+        
         # 페이지 하단에도 페이지네이션 표시 (아이템이 많을 때)
         if total_items > wish_items_per_page:
             col1, col2, col3 = st.columns([1, 2, 1])
@@ -1105,113 +1597,122 @@ def show_wishlist():
 
 def show_magic_tricks():
     st.markdown('<h2 class="section-header">🎩 Magic Tricks Management</h2>', unsafe_allow_html=True)
-    
-    # 사이드바 필터링 및 검색 섹션
-    with st.sidebar:
-        st.markdown('<h3 class="sub-section-header">🔍 Filter & Search</h3>', unsafe_allow_html=True)
-        
-        magic_search = st.text_input("🔎 마술명 검색", key="magic_search")
-        genre_filter = st.selectbox("장르 필터", ["전체"] + st.session_state.magic_genres)
-        difficulty_filter = st.selectbox("난이도 필터", ["전체", "쉬움(~2)", "보통(2-4)", "어려움(4+)"])
-        rating_filter = st.selectbox("신기함 필터", ["전체", "낮음(~2)", "보통(2-4)", "높음(4+)"])
-        sort_by = st.selectbox("정렬 기준", ["마술명", "신기함정도", "난이도", "장르"])
-        
-        # 페이지네이션 설정
-        st.markdown("---")
-        st.markdown("**📄 페이지 설정**")
-        magic_items_per_page = st.selectbox("페이지당 마술 수", [5, 10, 15, 20], index=1, key="magic_items_per_page")
-    
+    magic_tricks_section()
+
+# 마술 추가 폼과 목록 조각
+@perf_fragment
+def magic_tricks_section():
     # 마술 추가 섹션
     st.markdown('<h3 class="sub-section-header">➕ 새 마술 추가</h3>', unsafe_allow_html=True)
     with st.expander("마술 정보 입력", expanded=False):
-        col1, col2, col3 = st.columns(3)
+        # 입력 방식에 따라 입력칸이 바뀌므로 이 선택만 폼 밖에 둔다
+        st.radio("장르 선택", ["기존 선택", "새로 추가"], key="genre_option", horizontal=True)
         
-        with col1:
-            st.text_input("마술명", key="new_magic_name")
+        with st.form("add_magic_form", border=False):
+            col1, col2, col3 = st.columns(3)
             
-            st.radio("장르 선택", ["기존 선택", "새로 추가"], key="genre_option")
+            with col1:
+                st.text_input("마술명", key="new_magic_name")
+                
+                if st.session_state.genre_option == "기존 선택":
+                    st.selectbox("장르", st.session_state.magic_genres, key="selected_genre")
+                else:
+                    st.text_input("새 장르명", key="new_genre_input")
             
-            if st.session_state.genre_option == "기존 선택":
-                st.selectbox("장르", st.session_state.magic_genres, key="selected_genre")
-            else:
-                st.text_input("새 장르명", key="new_genre_input")
-        
-        with col2:
-            st.slider("신기함 정도", 1.0, 5.0, 3.0, 0.5, key="new_magic_rating")
-            st.slider("난이도", 1.0, 5.0, 3.0, 0.5, key="new_magic_difficulty")
-        
-        with col3:
-            st.text_input("관련 영상 URL", key="new_magic_video")
-            st.text_area("비고", key="new_magic_note", height=100)
+            with col2:
+                st.slider("신기함 정도", 1.0, 5.0, 3.0, 0.5, key="new_magic_rating")
+                st.slider("난이도", 1.0, 5.0, 3.0, 0.5, key="new_magic_difficulty")
+            
+            with col3:
+                st.text_input("관련 영상 URL", key="new_magic_video")
+                st.text_area("비고", key="new_magic_note", height=100)
+            
+            submitted = st.form_submit_button("마술 추가", type="primary")
         
-        if st.button("마술 추가", type="primary"):
+        if submitted:
             if st.session_state.new_magic_name:
                 add_magic()
                 st.success("✅ 마술이 성공적으로 추가되었습니다!")
                 # 페이지 초기화
                 if 'current_magic_page' in st.session_state:
                     st.session_state.current_magic_page = 1
-                st.rerun()
             else:
                 st.error("❌ 마술명을 입력해주세요!")
     
-    # 마술 데이터 필터링 및 정렬
-    magic_df = st.session_state.magic_list.copy()
-    
-    if not magic_df.empty:
-        # 검색 필터
-        if magic_search:
-            magic_df = magic_df[magic_df['마술명'].str.contains(magic_search, case=False, na=False)]
-        
-        # 장르 필터
-        if genre_filter != "전체":
-            magic_df = magic_df[magic_df['장르'] == genre_filter]
-        
-        # 난이도 필터
-        if difficulty_filter == "쉬움(~2)":
-            magic_df = magic_df[magic_df['난이도'] <= 2.0]
-        elif difficulty_filter == "보통(2-4)":
-            magic_df = magic_df[(magic_df['난이도'] > 2.0) & (magic_df['난이도'] <= 4.0)]
-        elif difficulty_filter == "어려움(4+)":
-            magic_df = magic_df[magic_df['난이도'] > 4.0]
+    magic_tricks_list()
+
+# 마술 목록 조각 (필터 변경·페이지 이동·삭제는 이 조각만 다시 실행)
+@perf_fragment
+def magic_tricks_list():
+    # 사이드바 필터링 및 검색 섹션
+    with st.sidebar:
+        st.markdown('<h3 class="sub-section-header">🔍 Filter & Search</h3>', unsafe_allow_html=True)
         
-        # 신기함 필터
-        if rating_filter == "낮음(~2)":
-            magic_df = magic_df[magic_df['신기함정도'] <= 2.0]
-        elif rating_filter == "보통(2-4)":
-            magic_df = magic_df[(magic_df['신기함정도'] > 2.0) & (magic_df['신기함정도'] <= 4.0)]
-        elif rating_filter == "높음(4+)":
-            magic_df = magic_df[magic_df['신기함정도'] > 4.0]
+        magic_search = st.text_input("🔎 마술 검색", key="magic_search", help="이름뿐 아니라 장르·비고에서도 찾습니다. 초성(예: ㅂㅇㅅㅋ)으로도 검색할 수 있습니다.")
+        genre_filter = st.selectbox("장르 필터", ["전체"] + st.session_state.magic_genres)
+        difficulty_filter = st.selectbox("난이도 필터", ["전체", "쉬움(~2)", "보통(2-4)", "어려움(4+)"])
+        rating_filter = st.selectbox("신기함 필터", ["전체", "낮음(~2)", "보통(2-4)", "높음(4+)"])
+        sort_by = st.selectbox("정렬 기준", ["마술명", "신기함정도", "난이도", "장르", "관련도"])
         
-        # 정렬
-        if not magic_df.empty:
-            if sort_by == "신기함정도":
-                magic_df = magic_df.sort_values('신기함정도', ascending=False)
-            elif sort_by == "난이도":
-                magic_df = magic_df.sort_values('난이도', ascending=False)
-            else:
-                magic_df = magic_df.sort_values(sort_by, ascending=True)
+        # 페이지네이션 설정
+        st.markdown("---")
+        st.markdown("**📄 페이지 설정**")
+        magic_items_per_page = st.selectbox("페이지당 마술 수", [5, 10, 15, 20], index=1, key="magic_items_per_page")
+        view_mode = st.radio("보기 방식", VIEW_MODES, horizontal=True, key="magic_view_mode")
+    
+    # 마술 데이터 필터링 및 정렬
+    filters = []
+    
+    # 장르 필터
+    if genre_filter != "전체":
+        filters.append(('장르', '==', genre_filter))
+    
+    # 난이도 필터
+    if difficulty_filter == "쉬움(~2)":
+        filters.append(('난이도', '<=', 2.0))
+    elif difficulty_filter == "보통(2-4)":
+        filters.extend([('난이도', '>', 2.0), ('난이도', '<=', 4.0)])
+    elif difficulty_filter == "어려움(4+)":
+        filters.append(('난이도', '>', 4.0))
+    
+    # 신기함 필터
+    if rating_filter == "낮음(~2)":
+        filters.append(('신기함정도', '<=', 2.0))
+    elif rating_filter == "보통(2-4)":
+        filters.extend([('신기함정도', '>', 2.0), ('신기함정도', '<=', 4.0)])
+    elif rating_filter == "높음(4+)":
+        filters.append(('신기함정도', '>', 4.0))
+    
+    # 정렬
+    query = TableQuery('magic_list', filters, None if sort_by == "관련도" else sort_by,
+                       ascending=(sort_by not in ("신기함정도", "난이도")), search=magic_search)
+    with perf_span("filter"):
+        total_items = query.count()
     
     # 마술 목록 표시
     st.markdown('<h3 class="sub-section-header">🎭 Magic Tricks Collection</h3>', unsafe_allow_html=True)
     
-    if not magic_df.empty:
+    if total_items > 0:
         # 마술 통계
         col1, col2, col3, col4 = st.columns(4)
         with col1:
-            st.metric("총 마술 수", len(magic_df))
+            st.metric("총 마술 수", total_items)
         with col2:
-            avg_rating = magic_df['신기함정도'].mean()
+            avg_rating = query.aggregate('mean', '신기함정도')
             st.metric("평균 신기함", f"{avg_rating:.1f}/5.0")
         with col3:
-            avg_difficulty = magic_df['난이도'].mean()
+            avg_difficulty = query.aggregate('mean', '난이도')
             st.metric("평균 난이도", f"{avg_difficulty:.1f}/5.0")
         with col4:
-            high_rating_count = len(magic_df[magic_df['신기함정도'] >= 4.0])
+            high_rating_count = query.count(('신기함정도', '>=', 4.0))
             st.metric("고평점 마술", f"{high_rating_count}개")
         
+        # 고밀도 표 보기
+        if view_mode == "표(고밀도)":
+            render_table_grid('magic_list', query, total_items, key="magic")
+            return
+        
         # 페이지네이션 계산
-        total_items = len(magic_df)
         total_pages = (total_items - 1) // magic_items_per_page + 1 if total_items > 0 else 1
         
         # 현재 페이지 상태 관리
@@ -1224,55 +1725,17 @@ def show_magic_tricks():
         
         # 페이지네이션 컨트롤 (마술이 페이지당 표시 개수보다 많을 때만 표시)
         if total_items > magic_items_per_page:
-            st.markdown("---")
-            col1, col2, col3, col4, col5 = st.columns([1, 1, 2, 1, 1])
-            
-            with col1:
-                if st.button("⏮️ 첫 페이지", disabled=(st.session_state.current_magic_page == 1), key="magic_first"):
-                    st.session_state.current_magic_page = 1
-                    st.rerun()
-            
-            with col2:
-                if st.button("◀️ 이전", disabled=(st.session_state.current_magic_page == 1), key="magic_prev"):
-                    st.session_state.current_magic_page -= 1
-                    st.rerun()
-            
-            with col3:
-                page_options = list(range(1, total_pages + 1))
-                selected_page = st.selectbox(
-                    f"페이지 {st.session_state.current_magic_page} / {total_pages}",
-                    page_options,
-                    index=st.session_state.current_magic_page - 1,
-                    key="magic_page_selector"
-                )
-                if selected_page != st.session_state.current_magic_page:
-                    st.session_state.current_magic_page = selected_page
-                    st.rerun()
-            
-            with col4:
-                if st.button("▶️ 다음", disabled=(st.session_state.current_magic_page == total_pages), key="magic_next"):
-                    st.session_state.current_magic_page += 1
-                    st.rerun()
-            
-            with col5:
-                if st.button("⏭️ 마지막 페이지", disabled=(st.session_state.current_magic_page == total_pages), key="magic_last"):
-                    st.session_state.current_magic_page = total_pages
-                    st.rerun()
-            
-            # 현재 페이지 정보 표시
-            start_idx = (st.session_state.current_magic_page - 1) * magic_items_per_page + 1
-            end_idx = min(st.session_state.current_magic_page * magic_items_per_page, total_items)
-            st.info(f"📄 {start_idx}-{end_idx} / {total_items} 마술 표시 중")
+            render_pagination('current_magic_page', 'magic_page_selector', "magic", total_items, magic_items_per_page, "마술")
         
         st.markdown("---")
         
         # 현재 페이지에 해당하는 마술만 추출
         start_idx = (st.session_state.current_magic_page - 1) * magic_items_per_page
-        end_idx = start_idx + magic_items_per_page
-        page_magic_df = magic_df.iloc[start_idx:end_idx]
+        with perf_span("query_page"):
+            page_magic_df = query.page(start_idx, magic_items_per_page)
         
         # 마술 목록 표시 (페이지별)
-        for idx, row in page_magic_df.iterrows():
+        for _, row in page_magic_df.iterrows():
             # 컬럼 생성
             col1, col2, col3, col4, col5 = st.columns([2, 3, 3, 3, 1])
             with col1:
@@ -1300,19 +1763,14 @@ def show_magic_tricks():
                     st.caption(f"💬 {row['비고']}")
             
             with col5:
-                if st.button("🗑️ 삭제", key=f"delete_magic_{idx}", help="마술 삭제"):
-                    st.session_state.magic_list = st.session_state.magic_list.drop(idx).reset_index(drop=True)
-                    save_data()
-                    
-                    # 삭제 후 페이지 조정
-                    remaining_items = len(st.session_state.magic_list)
-                    new_total_pages = (remaining_items - 1) // magic_items_per_page + 1 if remaining_items > 0 else 1
-                    if st.session_state.current_magic_page > new_total_pages:
-                        st.session_state.current_magic_page = new_total_pages
-                    
-                    st.rerun()
+                st.checkbox("선택", key=f"magic_select_{int(row[ROW_ID])}")
+                st.button("🗑️ 삭제", key=f"delete_magic_{int(row[ROW_ID])}", help="마술 삭제",
+                          on_click=record_row_changes, args=([('remove', 'magic_list', [int(row[ROW_ID])])], [[row.to_dict()]]))
             st.markdown("---")  # 마술 간 구분선
         
+        # 체크한 마술 일괄 삭제/변경
+        render_batch_actions('magic_list', checked_rows(page_magic_df, "magic"), "magic")
+        
         # 페이지 하단에도 페이지네이션 표시 (마술이 많을 때)
         if total_items > magic_items_per_page:
             col1, col2, col3 = st.columns([1, 2, 1])
@@ -1323,6 +1781,20 @@ def show_magic_tricks():
     else:
         st.info("🎩 표시할 마술이 없습니다. 필터를 조정하거나 새 마술을 추가해보세요!")
 
-# 앱 실행
+# 앱 실행 (계측이 켜져 있으면 rerun 기록과 요청한 프로파일을 남긴다)
+def run_app():
+    profiler = None
+    if st.session_state.pop('perf_profile_next', False):
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        with perf_span("main"):
+            main()
+    finally:
+        if profiler is not None:
+            profiler.disable()
+    show_perf_panel(st.session_state.get('nav_page'), profiler)
+
 if __name__ == "__main__":
-    main()
+    run_app()
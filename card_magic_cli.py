@@ -0,0 +1,273 @@
+"""카드/마술 컬렉션 명령줄 도구 (Streamlit 없이 card_magic_core만 사용).
+
+    python card_magic_cli.py stats
+    python card_magic_cli.py export cards -o cards.csv
+    python card_magic_cli.py export all --format backup -o backup.jsonl.gz
+    python card_magic_cli.py revalue --percent 10 --manufacturer Bicycle
+    python card_magic_cli.py revalue --from-csv prices.csv
+    python card_magic_cli.py import cards new_cards.xlsx
+    python card_magic_cli.py backup backups/            # 처음엔 전체, 그 뒤로는 변경분만
+    python card_magic_cli.py verify backups/
+    python card_magic_cli.py restore backups/
+
+--user, --storage, --data-dir로 앱과 같은 사용자별 데이터 파일을 고른다.
+"""
+import argparse
+import json
+import os
+import pickle
+import sys
+import time
+from contextlib import nullcontext
+from datetime import datetime
+
+import pandas as pd
+
+import card_magic_core
+from card_magic_core import (
+    ROW_ID, STORAGE_MODE, TABLE_COLUMNS, Library, atomic_pickle_dump, export_frame, iter_import_chunks,
+    json_default, read_backup_header, resolve_import_column, scan_backup_chain,
+)
+
+# 명령줄 표 이름 → 표
+TABLE_ALIASES = {'cards': 'card_collection', 'wishlist': 'wishlist', 'magic': 'magic_list'}
+
+# 표 이름 해석 (짧은 이름과 원래 이름 모두 허용)
+def resolve_table(name):
+    table = TABLE_ALIASES.get(name, name)
+    if table not in TABLE_COLUMNS:
+        raise SystemExit(f"알 수 없는 표: {name} ({', '.join(TABLE_ALIASES)} 중 하나)")
+    return table
+
+# 출력 파일 열기 ('-'이면 표준 출력)
+def open_output(path, binary=False, encoding='utf-8'):
+    if path == "-":
+        return nullcontext(sys.stdout.buffer if binary else sys.stdout)
+    return open(path, 'wb') if binary else open(path, 'w', encoding=encoding, newline='')
+
+# 통계
+def command_stats(library, args):
+    stats = library.stats()
+    report = {
+        'rows': dict(stats.rows),
+        'card_purchase_total': stats.total('card_collection', '구매가격($)'),
+        'card_value_total': stats.total('card_collection', '현재가격($)'),
+        'card_rating_mean': stats.mean('card_collection', '디자인별점'),
+        'wishlist_total': stats.total('wishlist', '가격($)'),
+        'wishlist_high_priority': stats.high_priority,
+        'magic_difficulty_mean': stats.mean('magic_list', '난이도'),
+        'manufacturers': dict(stats.distribution('card_collection', '제조사', limit=args.top)),
+        'card_status': dict(stats.distribution('card_collection', '개봉여부')),
+    }
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2, default=json_default))
+        return
+    profit = report['card_value_total'] - report['card_purchase_total']
+    print(f"카드 {report['rows']['card_collection']}장 · 위시리스트 {report['rows']['wishlist']}개 "
+          f"· 마술 {report['rows']['magic_list']}개")
+    print(f"구매가 합계 ${report['card_purchase_total']:,.2f} · 현재가 합계 ${report['card_value_total']:,.2f} "
+          f"(손익 {profit:+,.2f})")
+    print(f"평균 디자인 별점 {report['card_rating_mean']:.2f} · 평균 마술 난이도 {report['magic_difficulty_mean']:.2f}")
+    print(f"위시리스트 합계 ${report['wishlist_total']:,.2f} (높은 우선순위 {report['wishlist_high_priority']}개)")
+    print("제조사별 카드 수:")
+    for name, count in report['manufacturers'].items():
+        print(f"  {name:<24} {count:>8}")
+
+# 내보내기
+def command_export(library, args):
+    if args.format == 'backup':
+        with open_output(args.output, binary=True) as f:
+            f.write(library.backup())
+        return
+    tables = list(TABLE_COLUMNS) if args.table == 'all' else [resolve_table(args.table)]
+    if args.format == 'csv' and len(tables) > 1:
+        raise SystemExit("CSV는 표 하나씩만 내보낼 수 있습니다 (--format jsonl 또는 backup 사용)")
+    # 엑셀에서 바로 열리도록 CSV 파일에는 BOM을 붙인다
+    with open_output(args.output, encoding='utf-8-sig' if args.format == 'csv' else 'utf-8') as f:
+        for table in tables:
+            # 내부 행 ID는 파일에 싣지 않는다
+            df = export_frame(library.store.table(table)).drop(columns=ROW_ID, errors='ignore')
+            if args.format == 'csv':
+                df.to_csv(f, index=False)
+                continue
+            columns = [str(c) for c in df.columns]
+            for values in df.itertuples(index=False, name=None):
+                record = dict(zip(columns, values), **({'table': table} if len(tables) > 1 else {}))
+                f.write(json.dumps(record, ensure_ascii=False, default=json_default) + "\n")
+
+# 가격 파일에서는 price/가격이 현재가격을 뜻한다
+PRICE_FILE_COLUMNS = {'price': '현재가격($)', '가격': '현재가격($)', '가격($)': '현재가격($)'}
+
+# CSV/XLSX에서 {카드명: 새 가격} 읽기
+def read_price_file(path):
+    prices = {}
+    for chunk in iter_import_chunks(path, path):
+        chunk = chunk.rename(columns=lambda c: PRICE_FILE_COLUMNS.get(str(c).strip().lower())
+                             or resolve_import_column('card_collection', c))
+        if '카드명' not in chunk.columns or '현재가격($)' not in chunk.columns:
+            raise SystemExit("가격 파일에는 카드명과 현재가격($) (또는 name, price) 컬럼이 있어야 합니다")
+        values = pd.to_numeric(chunk['현재가격($)'], errors='coerce')
+        valid = values.notna() & chunk['카드명'].notna()
+        prices.update(zip(chunk.loc[valid, '카드명'].astype(str).str.strip(), values[valid].astype(float)))
+    return prices
+
+# 가격 일괄 변경
+def command_revalue(library, args):
+    if args.from_csv is None and args.percent is None:
+        raise SystemExit("--from-csv 또는 --percent 중 하나는 필요합니다")
+    prices = read_price_file(args.from_csv) if args.from_csv else None
+    changed = library.revalue(prices, args.percent, args.manufacturer)
+    print(f"현재가격을 바꾼 카드: {changed}장")
+
+# 대량 가져오기
+def command_import(library, args):
+    table = resolve_table(args.table)
+    report = library.import_file(table, args.file, args.file)
+    print(f"{report['rows']}행 가져옴 · 건너뜀 {report['skipped']}행 · "
+          f"{report['seconds']:.2f}초 ({report['rows_per_second']:,.0f}행/초)")
+    if report['new_names']:
+        print("새로 등록한 이름: " + ", ".join(report['new_names']))
+
+# 백업 폴더에서 끝 상태(BackupIndex)를 캐시해 두는 파일
+BACKUP_INDEX_FILE = "backup_index.pkl"
+
+# 백업 폴더의 현재 체인 (마지막 전체 백업부터 그 뒤 변경분까지, 파일 이름 = 만든 순서)
+def chain_files(directory):
+    paths = sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                   if name.startswith("card_magic_backup_") and name.endswith(".jsonl.gz"))
+    kinds = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            kinds.append(read_backup_header(f).get('kind', 'full'))
+    starts = [i for i, kind in enumerate(kinds) if kind == 'full']
+    return paths[starts[-1]:] if starts else []
+
+# 명령줄 인자(파일 또는 백업 폴더)를 백업 파일 목록으로
+def backup_paths(paths):
+    files = []
+    for path in paths:
+        files.extend(chain_files(path) if os.path.isdir(path) else [path])
+    if not files:
+        raise SystemExit("백업 파일이 없습니다")
+    return files
+
+# 체인 끝 상태 (캐시가 마지막 파일과 맞으면 재사용하고, 아니면 체인을 다시 훑는다)
+def chain_index(directory, files):
+    cache_path = os.path.join(directory, BACKUP_INDEX_FILE)
+    if os.path.exists(cache_path):
+        with open(cache_path, 'rb') as f:
+            cached = pickle.load(f)
+        if cached['file'] == os.path.basename(files[-1]):
+            return cached['index']
+    fileobjs = [open(path, 'rb') for path in files]
+    try:
+        return scan_backup_chain(fileobjs, track_rows=True)[1]
+    finally:
+        for f in fileobjs:
+            f.close()
+
+# 백업 (폴더에 체인이 있으면 변경분, 없거나 --full이면 전체)
+def command_backup(library, args):
+    os.makedirs(args.directory, exist_ok=True)
+    files = [] if args.full else chain_files(args.directory)
+    base = chain_index(args.directory, files) if files else None
+    kind = 'full' if base is None else 'delta'
+    name = f"card_magic_backup_{datetime.now():%Y%m%d_%H%M%S_%f}_{kind}.jsonl.gz"
+    path = os.path.join(args.directory, name)
+    with open(f"{path}.tmp", 'wb') as f:
+        index = library.write_backup(f, base)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(f"{path}.tmp", path)
+    atomic_pickle_dump({'file': name, 'index': index}, os.path.join(args.directory, BACKUP_INDEX_FILE))
+    label = "전체 백업" if base is None else f"변경분 백업 #{index.sequence}"
+    print(f"{label}: {path} ({os.path.getsize(path):,} bytes)")
+    for table, change in index.changes.items():
+        print(f"  {table:<16} +{change['added']} 추가 · ~{change['changed']} 변경 · -{change['removed']} 삭제")
+
+# 백업 체인 검사 (library는 None)
+def command_verify(library, args):
+    fileobjs = [open(path, 'rb') for path in backup_paths(args.paths)]
+    try:
+        summaries, index = scan_backup_chain(fileobjs, track_rows=args.deep)
+    except ValueError as e:
+        raise SystemExit(f"검사 실패: {e}")
+    finally:
+        for f in fileobjs:
+            f.close()
+    for summary in summaries:
+        rows = sum(summary['count'].values())
+        removed = sum(summary['removed'].values())
+        print(f"#{summary['sequence']:<3} {summary['kind']:<5} {summary['timestamp']}  "
+              f"행 {rows:,} · 삭제 {removed:,}  {summary['id'][:12]}")
+    print(f"체인 정상 ({len(summaries)}개 파일{', 행 해시까지 확인' if args.deep else ''})")
+
+# 백업 체인 복원
+def command_restore(library, args):
+    fileobjs = [open(path, 'rb') for path in backup_paths(args.paths)]
+    try:
+        timestamp = library.restore_chain(fileobjs)
+    finally:
+        for f in fileobjs:
+            f.close()
+    print(f"{len(fileobjs)}개 백업 파일 복원 완료 (백업 시간: {timestamp})")
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--user", default="", help="사용자 이름 (앱의 👤 사용자와 같음)")
+    parser.add_argument("--storage", default=STORAGE_MODE, choices=["journal", "pickle", "sqlite"])
+    parser.add_argument("--data-dir", help="데이터 폴더 (기본: CARD_MAGIC_DATA_DIR 또는 현재 폴더)")
+    parser.add_argument("--timing", action="store_true", help="걸린 시간을 표준 오류로 출력")
+    parser.set_defaults(open_library=True)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    stats = commands.add_parser("stats", help="컬렉션 통계")
+    stats.add_argument("--json", action="store_true")
+    stats.add_argument("--top", type=int, default=10, help="표시할 제조사 수")
+    stats.set_defaults(func=command_stats)
+
+    export = commands.add_parser("export", help="표 내보내기")
+    export.add_argument("table", help="cards, wishlist, magic 또는 all")
+    export.add_argument("--format", choices=["csv", "jsonl", "backup"], default="csv")
+    export.add_argument("-o", "--output", default="-", help="출력 파일 (기본: 표준 출력)")
+    export.set_defaults(func=command_export)
+
+    revalue = commands.add_parser("revalue", help="카드 현재가격 일괄 변경")
+    revalue.add_argument("--from-csv", help="카드명과 새 현재가격이 담긴 CSV/XLSX 파일")
+    revalue.add_argument("--percent", type=float, help="현재가격 증감률(%%)")
+    revalue.add_argument("--manufacturer", help="이 제조사 카드만 변경")
+    revalue.set_defaults(func=command_revalue)
+
+    load = commands.add_parser("import", help="CSV/XLSX 대량 가져오기")
+    load.add_argument("table", help="cards, wishlist 또는 magic")
+    load.add_argument("file")
+    load.set_defaults(func=command_import)
+
+    backup = commands.add_parser("backup", help="백업 폴더에 전체 또는 변경분 백업 추가")
+    backup.add_argument("directory")
+    backup.add_argument("--full", action="store_true", help="변경분 대신 새 전체 백업으로 체인을 새로 시작")
+    backup.set_defaults(func=command_backup)
+
+    verify = commands.add_parser("verify", help="백업 체인 검사 (데이터를 불러오지 않음)")
+    verify.add_argument("paths", nargs="+", help="백업 폴더 또는 백업 파일들")
+    verify.add_argument("--deep", action="store_true", help="행 해시를 따라가며 각 백업의 상태 해시까지 확인")
+    # 백업 파일만 읽으므로 데이터 저장소를 열지 않는다 (잠겨 있거나 손상돼도 검사할 수 있다)
+    verify.set_defaults(func=command_verify, open_library=False)
+
+    restore = commands.add_parser("restore", help="전체 백업 + 변경분 백업 체인 복원")
+    restore.add_argument("paths", nargs="+", help="백업 폴더 또는 백업 파일들")
+    restore.set_defaults(func=command_restore)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.data_dir:
+        card_magic_core.DATA_DIR = args.data_dir
+    start = time.perf_counter()
+    library = Library.open(args.user, args.storage) if args.open_library else None
+    args.func(library, args)
+    if args.timing:
+        print(f"{args.command}: {(time.perf_counter() - start) * 1000:.0f}ms", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
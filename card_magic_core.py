@@ -0,0 +1,3065 @@
+"""카드/마술 컬렉션 핵심 기능 (Streamlit 없이 동작).
+
+저장소(DataStore)와 표별 저장소(Repository), 조회(TableQuery), 검색 색인,
+대시보드 집계, 가격 이력, 사진 저장소, 백업/복원(변경분 백업 체인 포함), 대량 가져오기를 담는다.
+card_magic_app.py는 이 모듈 위에 화면만 얹고, card_magic_cli.py는
+Streamlit을 불러오지 않고 같은 기능을 명령줄에서 쓴다.
+"""
+import pandas as pd
+import numpy as np
+import json
+from datetime import datetime
+import pickle
+import os
+import io
+import gzip
+import zlib
+import hashlib
+import threading
+import time
+import atexit
+import logging
+import sqlite3
+import operator
+import functools
+import bisect
+import itertools
+import sys
+import re
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing, contextmanager, nullcontext
+from array import array
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 간 파일 잠금 없이 동작
+    fcntl = None
+
+# 데이터 파일 경로
+DATA_FILE = "card_magic_data.pkl"
+
+# 압축 백업 형식 (버전 3부터 백업 ID, 표 상태 해시, 변경분 백업)
+BACKUP_FORMAT = "card_magic_backup"
+BACKUP_FORMAT_VERSION = 3
+
+# JSON으로 직렬화할 수 없는 값 변환 (numpy 스칼라, 날짜 등)
+def json_default(value):
+    if isinstance(value, np.float32):
+        return float(str(value))
+    if hasattr(value, 'item'):
+        return value.item()
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+BACKUP_ENCODER = json.JSONEncoder(ensure_ascii=False, default=json_default)
+
+# 백업 한 줄 (같은 내용이면 언제나 같은 바이트가 되므로 행 해시도 이 줄로 만든다)
+def backup_line(record):
+    return (BACKUP_ENCODER.encode(record) + "\n").encode('utf-8')
+
+# 행 내용 해시
+def row_digest(line):
+    return hashlib.blake2b(line, digest_size=16).digest()
+
+# 표 상태 해시 ({행 ID: 행 해시}를 ID 순으로 이어 붙여 해시)
+def state_digest(rows):
+    ids = np.fromiter(rows.keys(), dtype=np.int64, count=len(rows))
+    order = np.argsort(ids, kind='stable')
+    entries = np.empty(len(rows), dtype=[('id', '<i8'), ('digest', 'V16')])
+    entries['id'] = ids[order]
+    entries['digest'] = np.frombuffer(b"".join(rows.values()), dtype='V16')[order]
+    return hashlib.sha256(entries.tobytes()).hexdigest()
+
+# 행 지문 (pandas 벡터 해시). 지문이 같은 행은 다시 직렬화하지 않고 앞 백업의 행 해시를 쓴다
+def row_fingerprints(df):
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+class BackupIndex:
+    """백업 체인 끝(마지막 백업)의 상태. 다음 변경분 백업은 이것과 비교해서 바뀐 행만 담는다.
+
+    rows는 표별 {행 ID: 행 해시}, changes는 이 백업을 만들 때 표별 추가/변경/삭제 행 수다.
+    fingerprints는 표별 (행 ID 배열, 행 지문 배열)로, 백업을 만든 쪽에만 있다
+    (파일에서 다시 만든 인덱스는 모든 행을 직렬화해서 비교한다).
+    """
+
+    def __init__(self, backup_id, sequence, rows, states=None, changes=None, fingerprints=None):
+        self.backup_id = backup_id
+        self.sequence = sequence
+        self.rows = rows
+        self.states = states
+        self.changes = changes or {}
+        self.fingerprints = fingerprints or {}
+
+    def unchanged(self, table, ids, fingerprints):
+        """행 ID와 지문이 이 백업 때와 같은 행 (bool 배열)"""
+        if table not in self.fingerprints or not len(ids):
+            return np.zeros(len(ids), dtype=bool)
+        old_ids, old_fingerprints = self.fingerprints[table]
+        if not len(old_ids):
+            return np.zeros(len(ids), dtype=bool)
+        positions = np.minimum(np.searchsorted(old_ids, ids), len(old_ids) - 1)
+        return (old_ids[positions] == ids) & (old_fingerprints[positions] == fingerprints)
+
+    def state(self):
+        """표별 상태 해시"""
+        if self.states is None:
+            self.states = {table: state_digest(rows) for table, rows in self.rows.items()}
+        return self.states
+
+# 압축 백업 쓰기
+def write_backup_stream(fileobj, store, manufacturers, magic_genres, base=None):
+    """gzip으로 압축한 NDJSON 백업을 fileobj에 기록하고 새 BackupIndex를 반환.
+
+    헤더 줄, 목록 줄, 표마다 {'table', 'columns', 'count'} 줄과 행 값 배열 줄들,
+    마지막에 표별 행 수/sha256/상태 해시와 백업 ID를 담은 manifest 줄이 온다.
+    base(BackupIndex)를 주면 변경분 백업이 된다. base 이후 추가되거나 내용 해시가 바뀐 행만 싣고,
+    지워진 행 ID는 표 줄의 'removed'에 담는다. 헤더의 parent/parent_state가 base를 가리킨다.
+    백업 ID는 manifest 앞까지 모든 줄의 sha256이다.
+    """
+    sequence = 0 if base is None else base.sequence + 1
+    header = {'format': BACKUP_FORMAT, 'version': BACKUP_FORMAT_VERSION,
+              'timestamp': datetime.now().isoformat(),
+              'kind': 'full' if base is None else 'delta', 'sequence': sequence}
+    if base is not None:
+        header.update(parent=base.backup_id, parent_state=base.state())
+    content = hashlib.sha256()
+    manifest, rows, changes, fingerprints = {}, {}, {}, {}
+    with gzip.GzipFile(fileobj=fileobj, mode='wb', compresslevel=6) as gz:
+        def write(line):
+            gz.write(line)
+            content.update(line)
+            return line
+
+        write(backup_line(header))
+        write(backup_line({'list': 'manufacturers', 'values': list(manufacturers)}))
+        write(backup_line({'list': 'magic_genres', 'values': list(magic_genres)}))
+        store.load_tables()
+        for table in TABLE_COLUMNS:
+            frame = store.table(table)
+            columns = [str(c) for c in frame.columns]
+            id_position = columns.index(ROW_ID)
+            ids = frame[ROW_ID].to_numpy(dtype=np.int64)
+            fingerprints[table] = (ids, row_fingerprints(frame))
+            previous = None if base is None else base.rows.get(table, {})
+            digest = hashlib.sha256()
+            if previous is None:
+                current = rows[table] = {}
+                write(backup_line({'table': table, 'columns': columns, 'count': len(frame)}))
+            else:
+                # 지문이 그대로인 행은 앞 백업의 행 해시를 물려받고, 나머지만 직렬화해서 비교
+                same = base.unchanged(table, ids, fingerprints[table][1])
+                current = rows[table] = {row_id: previous[row_id] for row_id in ids[same].tolist()}
+                frame = frame.iloc[np.flatnonzero(~same)]
+            changed, added = [], 0
+            for values in export_frame(frame).itertuples(index=False, name=None):
+                line = backup_line(list(values))
+                row_id = int(values[id_position])
+                current[row_id] = row_hash = row_digest(line)
+                if previous is None:
+                    digest.update(write(line))
+                elif previous.get(row_id) != row_hash:
+                    changed.append(line)
+                    added += row_id not in previous
+            if previous is not None:
+                removed = sorted(set(previous).difference(current))
+                write(backup_line({'table': table, 'columns': columns, 'count': len(changed), 'removed': removed}))
+                for line in changed:
+                    digest.update(write(line))
+                changes[table] = {'added': added, 'changed': len(changed) - added, 'removed': len(removed)}
+            manifest[table] = {'count': len(current) if previous is None else len(changed),
+                               'sha256': digest.hexdigest(), 'state': state_digest(current)}
+        backup_id = content.hexdigest()
+        gz.write(backup_line({'manifest': manifest, 'id': backup_id}))
+    states = {table: entry['state'] for table, entry in manifest.items()}
+    return BackupIndex(backup_id, sequence, rows, states, changes, fingerprints)
+
+# 백업 파일의 한 줄(JSON 객체) 읽기
+def backup_record(line):
+    try:
+        record = json.loads(line)
+    except ValueError:
+        raise ValueError("백업 파일 형식이 올바르지 않습니다") from None
+    if not isinstance(record, dict):
+        raise ValueError("백업 파일 형식이 올바르지 않습니다")
+    return record
+
+# 백업 파일을 줄 단위로 읽기
+def iter_backup(fileobj):
+    """백업을 ('header' | 'list' | 'table' | 'row' | 'manifest', 내용) 순서로 내놓는다.
+
+    행은 디코딩하지 않은 줄 바이트 그대로여서 표를 만들지 않고도 해시할 수 있다.
+    끝까지 읽으면 표별 체크섬과 백업 ID를 확인하고 (manifest, 백업 ID)를 내놓는다.
+    깨졌거나 형식이 다른 파일은 ValueError를 낸다.
+    """
+    try:
+        with gzip.GzipFile(fileobj=fileobj, mode='rb') as gz:
+            lines = io.BufferedReader(gz)
+            first = next(lines, None)
+            if first is None:
+                raise ValueError("백업 파일에 헤더가 없습니다")
+            header = backup_record(first)
+            if header.get('format') != BACKUP_FORMAT:
+                raise ValueError("지원하지 않는 백업 파일 형식입니다")
+            content = hashlib.sha256(first)
+            checksums = {}
+            manifest = None
+            yield 'header', header
+            for line in lines:
+                record = backup_record(line)
+                if 'manifest' in record:
+                    manifest = record
+                    break
+                content.update(line)
+                if 'list' in record:
+                    yield 'list', record
+                elif 'table' in record:
+                    if not isinstance(record.get('count'), int) or not isinstance(record.get('columns'), list):
+                        raise ValueError("백업 파일 형식이 올바르지 않습니다")
+                    yield 'table', record
+                    digest = hashlib.sha256()
+                    for _ in range(record['count']):
+                        row_line = next(lines, None)
+                        if row_line is None:
+                            raise ValueError("백업 파일이 중간에 잘렸습니다")
+                        digest.update(row_line)
+                        content.update(row_line)
+                        yield 'row', row_line
+                    checksums[record['table']] = {'count': record['count'], 'sha256': digest.hexdigest()}
+    except (OSError, EOFError, zlib.error) as e:
+        # gzip이 아니거나 압축이 깨진 파일
+        raise ValueError(f"백업 파일을 읽을 수 없습니다: {e}") from e
+    if manifest is None or not isinstance(manifest['manifest'], dict):
+        raise ValueError("백업 파일이 중간에 잘렸습니다")
+    for table, expected in manifest['manifest'].items():
+        if checksums.get(table) != {'count': expected.get('count'), 'sha256': expected.get('sha256')}:
+            raise ValueError(f"백업 무결성 검사 실패: {table}")
+    # 버전 2 백업에는 ID가 없으므로 읽은 내용으로 만든다
+    backup_id = content.hexdigest()
+    if manifest.get('id', backup_id) != backup_id:
+        raise ValueError("백업 무결성 검사 실패: 백업 ID가 내용과 다릅니다")
+    yield 'manifest', (manifest['manifest'], backup_id)
+
+# 백업 파일 하나 읽기
+def read_backup_file(fileobj):
+    """백업을 읽어 {'header', 'id', 'state', 'data', 'removed'}를 반환.
+    변경분 백업이면 data의 표에는 추가/변경된 행만 있고 removed에 표별로 지운 행 ID가 있다"""
+    backup = {'data': {}, 'removed': {}}
+    table, columns, buffer = None, None, None
+    for kind, value in iter_backup(fileobj):
+        if kind == 'row':
+            row = json.loads(value)
+            if not isinstance(row, list) or len(row) != len(columns):
+                raise ValueError(f"백업 파일 형식이 올바르지 않습니다: {table}")
+            buffer.append(dict(zip(columns, row)))
+            continue
+        if buffer is not None:
+            backup['data'][table] = buffer.frame()
+            buffer = None
+        if kind == 'header':
+            backup['header'] = value
+        elif kind == 'list':
+            backup['data'][value['list']] = value['values']
+        elif kind == 'table':
+            table, columns = value['table'], value['columns']
+            buffer = AppendBuffer(pd.DataFrame(columns=columns))
+            backup['removed'][table] = value.get('removed', [])
+        elif kind == 'manifest':
+            manifest, backup['id'] = value
+            backup['state'] = {table: entry['state'] for table, entry in manifest.items() if 'state' in entry}
+    return backup
+
+# 압축 백업 읽기
+def read_backup_stream(fileobj):
+    """write_backup_stream()으로 만든 전체 백업을 한 줄씩 읽어 (데이터, 백업 시간)을 반환"""
+    backup = read_backup_file(fileobj)
+    if backup['header'].get('kind', 'full') != 'full':
+        raise ValueError("변경분 백업은 기준이 되는 전체 백업과 함께 복원해야 합니다")
+    return backup['data'], backup['header'].get('timestamp', '알 수 없음')
+
+# 백업 파일 헤더만 읽기
+def read_backup_header(fileobj):
+    try:
+        with gzip.GzipFile(fileobj=fileobj, mode='rb') as gz:
+            first = gz.readline()
+    except (OSError, EOFError, zlib.error) as e:
+        raise ValueError(f"백업 파일을 읽을 수 없습니다: {e}") from e
+    fileobj.seek(0)
+    if not first:
+        raise ValueError("백업 파일에 헤더가 없습니다")
+    header = backup_record(first)
+    if header.get('format') != BACKUP_FORMAT:
+        raise ValueError("지원하지 않는 백업 파일 형식입니다")
+    return header
+
+# 백업 체인 연결 확인
+def check_backup_link(previous, header):
+    """header의 백업이 previous({'id', 'sequence', 'state'}, 맨 앞이면 None) 바로 뒤에 올 수 있는지 확인"""
+    kind, sequence = header.get('kind', 'full'), header.get('sequence', 0)
+    if previous is None:
+        if kind != 'full':
+            raise ValueError("백업 체인은 전체 백업으로 시작해야 합니다")
+        return
+    if kind != 'delta':
+        raise ValueError("전체 백업은 체인 맨 앞에만 올 수 있습니다")
+    if header.get('parent') != previous['id'] or sequence != previous['sequence'] + 1:
+        raise ValueError(f"백업 체인이 끊겼습니다: {sequence}번 백업의 기준이 앞 백업과 다릅니다")
+    if previous['state'] and header.get('parent_state') != previous['state']:
+        raise ValueError(f"백업 체인 무결성 검사 실패: {sequence}번 백업")
+
+# 백업 체인 검사
+def scan_backup_chain(fileobjs, track_rows=False):
+    """전체 백업 하나와 그 뒤 변경분 백업들을 순번대로 확인하고 (파일별 요약 목록, BackupIndex)를 반환.
+
+    파일은 어떤 순서로 줘도 헤더의 순번(sequence)으로 정렬한다. 표를 만들지 않고 줄 바이트만
+    해시하므로 빠르다. 변경분마다 parent가 앞 백업의 ID와, parent_state가 앞 백업의 상태 해시와
+    같은지 본다. track_rows면 행 ID별 해시를 따라가며 변경분을 적용한 결과가 각 백업에 기록된
+    상태 해시와 같은지까지 확인하고 끝 상태(BackupIndex)를 만든다 (아니면 None).
+    """
+    ordered = sorted(fileobjs, key=lambda f: read_backup_header(f).get('sequence', 0))
+    summaries = []
+    rows = {}
+    previous = None
+    for fileobj in ordered:
+        summary = {'removed': {}, 'count': {}}
+        for kind, value in iter_backup(fileobj):
+            if kind == 'header':
+                check_backup_link(previous, value)
+                summary.update(kind=value.get('kind', 'full'), sequence=value.get('sequence', 0),
+                               timestamp=value.get('timestamp', '알 수 없음'))
+            elif kind == 'table':
+                table = value['table']
+                summary['count'][table] = value['count']
+                summary['removed'][table] = len(value.get('removed', []))
+                if track_rows:
+                    if ROW_ID not in value['columns']:
+                        raise ValueError("행 ID가 없는 예전 백업은 변경분 백업의 기준으로 쓸 수 없습니다")
+                    id_position = value['columns'].index(ROW_ID)
+                    last = id_position == len(value['columns']) - 1
+                    current = rows[table] = {} if summary['kind'] == 'full' else rows.setdefault(table, {})
+                    for row_id in value.get('removed', []):
+                        current.pop(row_id, None)
+            elif kind == 'row' and track_rows:
+                # 행 ID가 마지막 값이면 JSON을 풀지 않고 꺼낸다
+                row_id = int(value[value.rindex(b',') + 1:-2]) if last else json.loads(value)[id_position]
+                current[row_id] = row_digest(value)
+            elif kind == 'manifest':
+                manifest, summary['id'] = value
+                summary['state'] = {table: entry['state'] for table, entry in manifest.items() if 'state' in entry}
+                if track_rows:
+                    for table, state in summary['state'].items():
+                        if state_digest(rows.get(table, {})) != state:
+                            raise ValueError(f"백업 체인 무결성 검사 실패: {summary['sequence']}번 백업의 {table}")
+        fileobj.seek(0)
+        summaries.append(summary)
+        previous = summary
+    if previous is None:
+        raise ValueError("백업 파일이 없습니다")
+    index = BackupIndex(previous['id'], previous['sequence'], rows, previous['state'] or None) if track_rows else None
+    return summaries, index
+
+# 변경분 적용
+def apply_backup_delta(frame, rows, removed):
+    """표에서 지운 행과 바뀐 행을 빼고 바뀐/추가된 행(rows)을 넣어 행 ID 순으로 반환"""
+    replaced = list(removed) + rows[ROW_ID].tolist()
+    merged = concat_typed(frame[~frame[ROW_ID].isin(replaced)], rows)
+    merged[ROW_ID] = merged[ROW_ID].astype(np.int64)
+    return merged.sort_values(ROW_ID, kind='stable', ignore_index=True)
+
+# 백업 JSON 생성
+def backup_json(store, manufacturers=None, magic_genres=None):
+    """백업 JSON 문자열 (데이터가 바뀌지 않았으면 이전 결과를 재사용). 목록을 안 넘기면 저장소의 목록"""
+    lists = store_lists(store)
+    manufacturers = list(lists['manufacturers'] if manufacturers is None else manufacturers)
+    magic_genres = list(lists['magic_genres'] if magic_genres is None else magic_genres)
+
+    def build():
+        store.load_tables()
+        backup_data = {
+            'timestamp': datetime.now().isoformat(),
+            'card_collection': export_frame(store.table('card_collection')).to_dict('records'),
+            'wishlist': export_frame(store.table('wishlist')).to_dict('records'),
+            'magic_list': export_frame(store.table('magic_list')).to_dict('records'),
+            'manufacturers': manufacturers,
+            'magic_genres': magic_genres
+        }
+        return json.dumps(backup_data, ensure_ascii=False, indent=2)
+
+    return store.memo('backup', (tuple(manufacturers), tuple(magic_genres)), build)
+
+# 압축 백업 생성
+def backup_archive(store, manufacturers=None, magic_genres=None):
+    """압축 백업 바이트 (데이터가 바뀌지 않았으면 이전 결과를 재사용). 목록을 안 넘기면 저장소의 목록"""
+    lists = store_lists(store)
+    manufacturers = list(lists['manufacturers'] if manufacturers is None else manufacturers)
+    magic_genres = list(lists['magic_genres'] if magic_genres is None else magic_genres)
+
+    def build():
+        buffer = io.BytesIO()
+        write_backup_stream(buffer, store, manufacturers, magic_genres)
+        return buffer.getvalue()
+
+    return store.memo('backup_archive', (tuple(manufacturers), tuple(magic_genres)), build)
+
+# 백업 복원
+def restore_backup(store, fileobj, lists=None):
+    """압축 백업(.jsonl.gz)과 기존 JSON 백업을 저장소에 복원하고 백업 시간을 반환.
+    lists는 백업에 목록이 없을 때 남겨 둘 {목록 이름: 값} (기본: 저장소의 목록)"""
+    data = store.snapshot()
+    data.update(store_lists(store) if lists is None else lists)
+    if fileobj.read(2) == b'\x1f\x8b':
+        fileobj.seek(0)
+        backup_data, timestamp = read_backup_stream(fileobj)
+        data.update(backup_data)
+    else:
+        fileobj.seek(0)
+        backup_data = json.load(fileobj)
+        for name in TABLE_COLUMNS:
+            if name in backup_data:
+                data[name] = pd.DataFrame(backup_data[name])
+        for name in LIST_NAMES:
+            if name in backup_data:
+                data[name] = backup_data[name]
+        timestamp = backup_data.get('timestamp', '알 수 없음')
+    store.put(data)
+    return timestamp
+
+# 백업 체인 복원
+def restore_backup_chain(store, fileobjs, lists=None):
+    """전체 백업 + 변경분 백업들을 차례로 적용해서 복원하고 마지막 백업 시간을 반환.
+    모든 파일의 체크섬과 체인 연결을 확인한 뒤에 한 번에 기록하므로,
+    끊기거나 손상된 체인은 아무것도 바꾸지 않는다"""
+    data = store.snapshot()
+    data.update(store_lists(store) if lists is None else lists)
+    previous = None
+    for fileobj in sorted(fileobjs, key=lambda f: read_backup_header(f).get('sequence', 0)):
+        backup = read_backup_file(fileobj)
+        header = backup['header']
+        check_backup_link(previous, header)
+        for name, value in backup['data'].items():
+            if name in backup['removed'] and header['kind'] == 'delta':
+                value = apply_backup_delta(data[name], value, backup['removed'][name])
+            data[name] = value
+        previous = {'id': backup['id'], 'sequence': header.get('sequence', 0), 'state': backup['state']}
+    if previous is None:
+        raise ValueError("백업 파일이 없습니다")
+    store.put(data)
+    return header.get('timestamp', '알 수 없음')
+
+# 저장 방식: "journal"(변경분 추가 기록 + 주기적 스냅샷), "pickle"(매번 전체 저장),
+# "sqlite"(표별 테이블 + 인덱스, 목록 조회를 SQL로 처리)
+STORAGE_MODE = os.environ.get("CARD_MAGIC_STORAGE", "journal")
+SQLITE_FILE = "card_magic_data.db"
+
+# 저널 레코드가 이 개수를 넘으면 스냅샷으로 압축
+JOURNAL_COMPACT_THRESHOLD = 1000
+
+# 표별 컬럼 구성
+TABLE_COLUMNS = {
+    'card_collection': ['카드명', '구매가격($)', '현재가격($)', '제조사', '단종여부', '개봉여부',
+                        '판매사이트', '디자인별점', '피니시', '디자인스타일'],
+    'wishlist': ['이름', '타입', '가격($)', '판매사이트', '우선순위', '비고'],
+    'magic_list': ['마술명', '장르', '신기함정도', '난이도', '관련영상', '비고'],
+}
+NUMERIC_COLUMNS = {'구매가격($)', '현재가격($)', '디자인별점', '가격($)', '우선순위', '신기함정도', '난이도'}
+INDEXED_COLUMNS = {
+    'card_collection': ['제조사', '개봉여부'],
+    'wishlist': ['타입', '우선순위'],
+    'magic_list': ['장르', '난이도', '신기함정도'],
+}
+LIST_NAMES = ('manufacturers', 'magic_genres')
+
+# 행 ID 컬럼. 표마다 한 번 준 ID는 다시 쓰지 않고 증가하는 순서로만 주므로
+# 표는 항상 ID 오름차순이고, ID로 행 위치를 이진 탐색으로 찾는다
+ROW_ID = '_id'
+
+# 행 ID가 없거나 순서가 어긋난 표에 새 ID 부여
+def with_row_ids(frame, next_id=0):
+    """(ID가 있는 DataFrame, 다음에 줄 ID)를 반환. 기존 ID가 올바르면 그대로 둔다"""
+    if ROW_ID in frame.columns and len(frame):
+        ids = frame[ROW_ID].to_numpy()
+        if ids.dtype.kind in 'iu' and (len(ids) < 2 or (np.diff(ids) > 0).all()):
+            return frame, max(int(next_id), int(ids[-1]) + 1)
+    frame = frame.assign(**{ROW_ID: np.arange(next_id, next_id + len(frame), dtype=np.int64)})
+    return frame, int(next_id) + len(frame)
+
+# 행 ID → 현재 위치 (없는 ID는 -1)
+def row_positions(frame, row_ids):
+    ids = frame[ROW_ID].to_numpy() if ROW_ID in frame.columns else np.empty(0, dtype=np.int64)
+    row_ids = np.asarray(row_ids, dtype=np.int64)
+    positions = np.minimum(np.searchsorted(ids, row_ids), max(len(ids) - 1, 0))
+    found = (positions < len(ids)) & (ids[positions] == row_ids) if len(ids) else np.zeros(len(row_ids), bool)
+    return np.where(found, positions, -1)
+
+# 파일을 임시 파일에 쓴 뒤 원자적으로 교체
+def atomic_pickle_dump(data, path):
+    """쓰는 도중 죽어도 path에는 이전 파일이나 새 파일 중 하나만 남는다"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    fsync_directory(path)
+
+# 파일 교체(rename)가 전원이 나가도 남도록 폴더 항목까지 디스크에 기록
+def fsync_directory(path):
+    if not hasattr(os, 'O_DIRECTORY'):  # Windows
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+# 파일 변경 여부 판단용 (mtime, size, inode). 원자적 교체는 inode가 바뀐다
+def file_signature(*paths):
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            signature.append(None)
+        else:
+            signature.append((stat.st_mtime_ns, stat.st_size, stat.st_ino))
+    if all(part is None for part in signature):
+        return None
+    return tuple(signature)
+
+# 프로세스 간 읽기/쓰기 잠금
+@contextmanager
+def file_lock(path, shared=False):
+    """`<path>.lock`에 flock을 건다. 읽기(shared)는 동시에, 쓰기는 하나씩만 들어간다"""
+    if fcntl is None:
+        yield
+        return
+    with open(f"{path}.lock", 'a+b') as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+# 다른 세션이 먼저 바꾼 행을 수정/삭제하려 할 때
+class WriteConflict(Exception):
+    pass
+
+# 저널 레코드를 데이터에 순서대로 적용
+def replay_journal(data, records):
+    """('insert', 표, 행) / ('extend', 표, DataFrame) / ('remove', 표, [행 ID]) /
+    ('edit', 표, [(행 ID, 변경값)]) / ('list', 이름, 값) 레코드를 재생.
+    행 ID가 생기기 전에 기록된 ('delete', 표, 위치) / ('update', 표, (위치, 변경값))도 읽는다.
+    스냅샷에 대시보드 집계가 있으면 같은 레코드로 함께 갱신한다."""
+    pending = {}
+    stats = DashboardStats.from_dict(data['stats']) if data.get('stats') else None
+    # 삭제된 행의 ID도 다시 쓰지 않도록 표별로 다음 ID를 따로 기록한다
+    next_ids = data['next_ids'] = dict(data.get('next_ids', {}))
+
+    def concat(table, new_rows):
+        if table in data:
+            data[table] = pd.concat([data[table], new_rows], ignore_index=True)
+        elif table in TABLE_COLUMNS:
+            # 스냅샷이 없으면 첫 레코드가 표가 되므로 빠진 컬럼을 채운다
+            data[table] = conform_table(table, new_rows.reset_index(drop=True))
+        else:
+            data[table] = new_rows.reset_index(drop=True)
+
+    def flush(table):
+        rows = pending.pop(table, None)
+        if rows:
+            concat(table, pd.DataFrame(rows))
+
+    for op, name, value in records:
+        if op == 'insert':
+            pending.setdefault(name, []).append(value)
+            if ROW_ID in value:
+                next_ids[name] = max(next_ids.get(name, 0), int(value[ROW_ID]) + 1)
+            if stats is not None:
+                stats.insert(name, value)
+        elif op == 'extend':
+            flush(name)
+            concat(name, value)
+            if ROW_ID in value.columns and len(value):
+                next_ids[name] = max(next_ids.get(name, 0), int(value[ROW_ID].max()) + 1)
+            if stats is not None:
+                stats.extend(name, value)
+        elif op in ('delete', 'remove'):
+            flush(name)
+            frame = data[name]
+            positions = [value] if op == 'delete' else row_positions(frame, value)
+            positions = np.asarray(positions, dtype=np.int64)
+            positions = positions[positions >= 0]
+            if stats is not None:
+                stats.delete(name, frame.iloc[positions])
+            keep = np.ones(len(frame), dtype=bool)
+            keep[positions] = False
+            data[name] = frame[keep].reset_index(drop=True)
+        elif op in ('update', 'edit'):
+            flush(name)
+            edits = [value] if op == 'update' else value
+            positions = [position for position, _ in edits] if op == 'update' else \
+                row_positions(data[name], [row_id for row_id, _ in edits])
+            for position, (_, changes) in zip(positions, edits):
+                if position < 0:
+                    continue
+                old_row = data[name].iloc[position]
+                for column, new_value in changes.items():
+                    set_frame_value(data[name], position, column, new_value)
+                if stats is not None:
+                    stats.update(name, old_row, data[name].iloc[position])
+        elif op == 'list':
+            data[name] = list(value)
+    for table in list(pending):
+        flush(table)
+    if stats is not None:
+        data['stats'] = stats.to_dict()
+    return data
+
+# pickle 파일 저장소
+class PickleBackend:
+    """pickle 스냅샷 파일 저장소.
+
+    저널 모드에서는 변경분을 `<파일>.wal`에 추가 기록하고,
+    일정 개수마다 스냅샷으로 압축한다.
+    """
+
+    def __init__(self, path, journal=False):
+        self.path = path
+        self.journal_path = f"{path}.wal" if journal else None
+        self.journal_records = 0
+
+    def lock(self, shared=False):
+        return file_lock(self.path, shared)
+
+    def signature(self):
+        if self.journal_path is None:
+            return file_signature(self.path)
+        return file_signature(self.path, self.journal_path)
+
+    def _read_journal(self):
+        records = []
+        if self.journal_path is None or not os.path.exists(self.journal_path):
+            return records
+        with open(self.journal_path, 'rb') as f:
+            good_offset = 0
+            while True:
+                try:
+                    records.append(pickle.load(f))
+                except EOFError:
+                    break
+                except (pickle.UnpicklingError, ValueError, TypeError):
+                    # 기록 도중 중단된 마지막 레코드는 버린다
+                    break
+                good_offset = f.tell()
+        if good_offset < os.path.getsize(self.journal_path):
+            with open(self.journal_path, 'r+b') as f:
+                f.truncate(good_offset)
+        return records
+
+    def load(self):
+        data = None
+        if os.path.exists(self.path):
+            with open(self.path, 'rb') as f:
+                data = pickle.load(f)
+        records = self._read_journal()
+        self.journal_records = len(records)
+        if records:
+            data = replay_journal(dict(data or {}), records)
+        return data
+
+    def save(self, data):
+        atomic_pickle_dump(data, self.path)
+        if self.journal_path is not None and os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        self.journal_records = 0
+
+    def append(self, records, snapshot, stats=None):
+        # 저널 모드의 집계는 재생할 때 레코드로 다시 갱신되므로 stats는 쓰지 않음
+        if self.journal_path is None:
+            self.save(snapshot())
+            return
+        with open(self.journal_path, 'ab') as f:
+            for record in records:
+                pickle.dump(record, f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        self.journal_records += len(records)
+        if self.journal_records >= JOURNAL_COMPACT_THRESHOLD:
+            self.save(snapshot())
+
+# SQL 식별자 인용
+def quote_identifier(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+# pandas 값을 sqlite3에 넣을 수 있는 값으로 변환
+def to_sql_value(value):
+    if value is None:
+        return None
+    if isinstance(value, np.float32):
+        value = float(str(value))
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+# SQLite 저장소
+class SQLiteBackend:
+    """표마다 실제 테이블과 인덱스를 두는 SQLite 저장소.
+
+    목록 화면의 필터/정렬/페이지 조회를 SQL로 처리해서
+    화면에 표시할 행만 읽어온다. 행 ID는 rowid에 그대로 저장하므로
+    ID로 지우고 고치는 것은 기본 키 조회 한 번이다.
+    """
+
+    SQL_OPERATORS = {'==': '=', '>=': '>=', '>': '>', '<': '<', '<=': '<='}
+
+    def __init__(self, path):
+        self.path = path
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        for table, columns in TABLE_COLUMNS.items():
+            column_defs = ", ".join(
+                f"{quote_identifier(c)} {'REAL' if c in NUMERIC_COLUMNS else 'TEXT'}" for c in columns
+            )
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({column_defs})")
+            for column in INDEXED_COLUMNS[table]:
+                conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS {quote_identifier(f'idx_{table}_{column}')} "
+                    f"ON {table} ({quote_identifier(column)})"
+                )
+        conn.execute("CREATE TABLE IF NOT EXISTS lists (name TEXT, position INTEGER, value TEXT)")
+        conn.execute("CREATE TABLE IF NOT EXISTS stats (id INTEGER PRIMARY KEY CHECK (id = 1), value BLOB)")
+        conn.execute("CREATE TABLE IF NOT EXISTS next_ids (name TEXT PRIMARY KEY, value INTEGER)")
+        conn.commit()
+        return conn
+
+    def lock(self, shared=False):
+        return file_lock(self.path, shared)
+
+    def signature(self):
+        # WAL 없이 쓰는 SQLite는 커밋마다 헤더의 변경 카운터(오프셋 24)가 올라간다
+        signature = file_signature(self.path)
+        if signature is None:
+            return None
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(24)
+                return signature + (f.read(4),)
+        except FileNotFoundError:
+            return None
+
+    def load(self):
+        """목록/다음 ID/집계와 표별 행 수만 읽는다 (표 내용은 처음 쓸 때 load_table()로 읽는다).
+        목록 화면은 TableQuery가 SQL로 조회하므로 저장소를 열 때 표 전체를 DataFrame으로 만들지 않는다"""
+        if not os.path.exists(self.path):
+            return None
+        data = {}
+        with closing(self._connect()) as conn:
+            data['row_counts'] = {
+                table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in TABLE_COLUMNS
+            }
+            data['next_ids'] = dict(conn.execute("SELECT name, value FROM next_ids"))
+            for name, value in conn.execute("SELECT name, value FROM lists ORDER BY name, position"):
+                data.setdefault(name, []).append(value)
+            row = conn.execute("SELECT value FROM stats WHERE id = 1").fetchone()
+            if row is not None:
+                data['stats'] = pickle.loads(row[0])
+        return data
+
+    def load_table(self, table):
+        """표 하나를 행 ID 순서로 모두 읽기"""
+        column_sql = ", ".join(quote_identifier(c) for c in TABLE_COLUMNS[table])
+        with closing(self._connect()) as conn:
+            return pd.read_sql_query(
+                f"SELECT {column_sql}, rowid AS {quote_identifier(ROW_ID)} FROM {table} ORDER BY rowid", conn)
+
+    def _insert_rows(self, conn, table, rows):
+        columns = TABLE_COLUMNS[table] + [ROW_ID]
+        placeholders = ", ".join("?" for _ in columns)
+        column_sql = ", ".join(quote_identifier(c) for c in TABLE_COLUMNS[table])
+        conn.executemany(
+            f"INSERT INTO {table} ({column_sql}, rowid) VALUES ({placeholders})",
+            ([to_sql_value(row.get(c)) for c in columns] for row in rows)
+        )
+
+    def _write_next_id(self, conn, table, next_id):
+        conn.execute(
+            "INSERT INTO next_ids (name, value) VALUES (?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET value = max(value, excluded.value)",
+            (table, int(next_id))
+        )
+
+    def _write_stats(self, conn, stats):
+        if stats is None:
+            conn.execute("DELETE FROM stats")
+        else:
+            conn.execute("INSERT OR REPLACE INTO stats (id, value) VALUES (1, ?)",
+                         (pickle.dumps(stats, protocol=pickle.HIGHEST_PROTOCOL),))
+
+    def _write_list(self, conn, name, values):
+        conn.execute("DELETE FROM lists WHERE name = ?", (name,))
+        conn.executemany(
+            "INSERT INTO lists (name, position, value) VALUES (?, ?, ?)",
+            ((name, i, value) for i, value in enumerate(values))
+        )
+
+    def save(self, data):
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM next_ids")
+            for table in TABLE_COLUMNS:
+                conn.execute(f"DELETE FROM {table}")
+                df = data.get(table)
+                next_id = data.get('next_ids', {}).get(table, 0)
+                if df is not None and not df.empty:
+                    df, next_id = with_row_ids(df, next_id)
+                    self._insert_rows(conn, table, export_frame(df).to_dict('records'))
+                self._write_next_id(conn, table, next_id)
+            for name in LIST_NAMES:
+                if name in data:
+                    self._write_list(conn, name, data[name])
+            self._write_stats(conn, data.get('stats'))
+
+    def append(self, records, snapshot, stats=None):
+        with closing(self._connect()) as conn, conn:
+            if stats is not None:
+                self._write_stats(conn, stats())
+            for op, name, value in records:
+                if op == 'insert':
+                    self._insert_rows(conn, name, [value])
+                    self._write_next_id(conn, name, value[ROW_ID] + 1)
+                elif op == 'extend':
+                    self._insert_rows(conn, name, export_frame(value).to_dict('records'))
+                    if len(value):
+                        self._write_next_id(conn, name, value[ROW_ID].max() + 1)
+                elif op == 'remove':
+                    conn.executemany(f"DELETE FROM {name} WHERE rowid = ?", ((int(row_id),) for row_id in value))
+                elif op == 'edit':
+                    for row_id, changes in value:
+                        changes = {c: v for c, v in changes.items() if c in TABLE_COLUMNS[name]}
+                        if changes:
+                            assignments = ", ".join(f"{quote_identifier(c)} = ?" for c in changes)
+                            conn.execute(
+                                f"UPDATE {name} SET {assignments} WHERE rowid = ?",
+                                [to_sql_value(v) for v in changes.values()] + [int(row_id)]
+                            )
+                elif op == 'list':
+                    self._write_list(conn, name, value)
+
+    def _where(self, filters):
+        clauses, params = [], []
+        for column, op, value in filters:
+            if op == 'contains':
+                clauses.append(f"instr(lower({quote_identifier(column)}), lower(?)) > 0")
+            else:
+                clauses.append(f"{quote_identifier(column)} {self.SQL_OPERATORS[op]} ?")
+            params.append(to_sql_value(value))
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def count(self, table, filters):
+        where, params = self._where(filters)
+        with closing(self._connect()) as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM {table}{where}", params).fetchone()[0]
+
+    def aggregate(self, table, filters, func, column):
+        sql_func = {'sum': 'TOTAL', 'mean': 'AVG'}[func]
+        where, params = self._where(filters)
+        with closing(self._connect()) as conn:
+            value = conn.execute(
+                f"SELECT {sql_func}({quote_identifier(column)}) FROM {table}{where}", params
+            ).fetchone()[0]
+        return float('nan') if value is None else value
+
+    def page(self, table, filters, sort_by, ascending, offset, limit):
+        """조건에 맞는 한 페이지만 조회 (행 ID 컬럼 포함)"""
+        columns = TABLE_COLUMNS[table]
+        column_sql = ", ".join(quote_identifier(c) for c in columns)
+        where, params = self._where(filters)
+        if sort_by is None:
+            order = "rowid"
+        else:
+            sort_column = quote_identifier(sort_by)
+            order = f"{sort_column} IS NULL, {sort_column} {'ASC' if ascending else 'DESC'}, rowid"
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f"SELECT {column_sql}, rowid FROM {table}{where} "
+                f"ORDER BY {order} LIMIT ? OFFSET ?",
+                params + [int(limit), int(offset)]
+            ).fetchall()
+        return pd.DataFrame(rows, columns=columns + [ROW_ID])
+
+# 기존 pickle 데이터를 SQLite로 한 번에 옮기기
+def migrate_pickle_to_sqlite(pickle_path=DATA_FILE, sqlite_path=SQLITE_FILE):
+    """pickle(+저널) 데이터를 읽어 SQLite 파일을 만든다. 옮긴 경우 True"""
+    data = PickleBackend(pickle_path, journal=True).load()
+    if data is None:
+        return False
+    SQLiteBackend(sqlite_path).save(data)
+    return True
+
+# 값 종류가 적은 컬럼 (범주형으로 저장)
+CATEGORY_COLUMNS = {'제조사', '개봉여부', '단종여부', '피니시', '디자인스타일', '타입', '장르'}
+# 가격/평점 컬럼 저장 타입
+NUMERIC_DTYPE = np.float32
+
+# 표 스키마 적용
+def apply_schema(df):
+    """범주형 컬럼은 category, 가격/평점 컬럼은 float32로 맞춘 DataFrame 반환 (이미 맞으면 그대로)"""
+    converted = {}
+    for column in df.columns:
+        dtype = df[column].dtype
+        if column in CATEGORY_COLUMNS and not isinstance(dtype, pd.CategoricalDtype):
+            converted[column] = df[column].astype('category')
+        elif column in NUMERIC_COLUMNS and dtype != NUMERIC_DTYPE:
+            converted[column] = pd.to_numeric(df[column], errors='coerce').astype(NUMERIC_DTYPE)
+    if not converted:
+        return df
+    return df.assign(**converted)
+
+# 스키마를 유지한 채 DataFrame 이어 붙이기
+def concat_typed(base, new):
+    """범주형 컬럼은 범주를 합집합으로 맞춘 뒤 이어 붙여 category 타입을 유지"""
+    if base.empty:
+        columns = list(base.columns) + [c for c in new.columns if c not in base.columns]
+        return apply_schema(new.reset_index(drop=True).reindex(columns=columns))
+    new = apply_schema(new)
+    base = apply_schema(base)
+    for column in CATEGORY_COLUMNS & set(base.columns) & set(new.columns):
+        categories = base[column].cat.categories
+        if not new[column].cat.categories.isin(categories).all():
+            categories = categories.union(new[column].cat.categories)
+            base = base.assign(**{column: base[column].cat.set_categories(categories)})
+        new = new.assign(**{column: new[column].cat.set_categories(categories)})
+    return pd.concat([base, new], ignore_index=True)
+
+# 스키마를 맞춘 여러 DataFrame을 한 번에 이어 붙이기
+def concat_typed_frames(frames):
+    """범주형 컬럼의 범주를 모든 조각의 합집합으로 맞춘 뒤 한 번에 이어 붙인다"""
+    frames = [apply_schema(frame) for frame in frames]
+    for column in CATEGORY_COLUMNS & set(frames[0].columns):
+        categories = frames[0][column].cat.categories
+        for frame in frames[1:]:
+            categories = categories.union(frame[column].cat.categories)
+        frames = [frame.assign(**{column: frame[column].cat.set_categories(categories)}) for frame in frames]
+    return pd.concat(frames, ignore_index=True)
+
+# 표 컬럼 구성 맞추기
+def conform_table(name, frame):
+    """TABLE_COLUMNS[name] 순서의 컬럼(+ ROW_ID)을 모두 갖추고 스키마 타입을 적용한 DataFrame.
+    일부 컬럼만 준 행(add_many 등)으로 표가 시작돼도 나머지 컬럼은 빈 값으로 생긴다"""
+    columns = TABLE_COLUMNS[name] + [ROW_ID]
+    columns += [column for column in frame.columns if column not in columns]
+    missing = [column for column in columns if column not in frame.columns and column != ROW_ID]
+    if missing:
+        frame = frame.assign(**{
+            column: np.full(len(frame), np.nan, dtype=NUMERIC_DTYPE) if column in NUMERIC_COLUMNS
+            else np.full(len(frame), None, dtype=object)
+            for column in missing
+        })
+    columns = [column for column in columns if column in frame.columns]
+    if list(frame.columns) != columns:
+        frame = frame[columns]
+    return apply_schema(frame)
+
+# 한 칸 값 변경 (범주형에 없는 값이면 범주를 먼저 추가)
+def set_frame_value(df, position, column, value):
+    if column in df.columns and isinstance(df[column].dtype, pd.CategoricalDtype):
+        categories = df[column].cat.categories
+        if not pd.isna(value) and value not in categories:
+            df[column] = df[column].cat.set_categories(categories.union([value]))
+    df.loc[position, column] = value
+
+# 내보내기용 DataFrame (float32 값을 입력한 그대로의 소수로 되돌림)
+def export_frame(df):
+    converted = {
+        column: df[column].astype(str).astype('float64')
+        for column in df.columns if df[column].dtype == NUMERIC_DTYPE
+    }
+    converted.update({
+        column: df[column].astype(object)
+        for column in df.columns if isinstance(df[column].dtype, pd.CategoricalDtype)
+    })
+    return df.assign(**converted) if converted else df
+
+# 스키마 적용 전후 메모리 (바이트)
+def schema_memory(df):
+    """(object/float64로 저장했을 때의 추정 크기, 현재 크기)"""
+    typed = int(df.memory_usage(index=False, deep=True).sum())
+    untyped = typed
+    for column in df.columns:
+        series = df[column]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # object 배열이면 행마다 포인터 + 문자열 객체를 가진다
+            sizes = np.array([sys.getsizeof(value) for value in series.cat.categories] + [16], dtype=np.int64)
+            untyped += 8 * len(series) + int(sizes[series.cat.codes.to_numpy()].sum())
+            untyped -= int(series.memory_usage(index=False, deep=True))
+        elif series.dtype == NUMERIC_DTYPE:
+            untyped += 4 * len(series)
+    return untyped, typed
+
+# 행 추가용 컬럼형 버퍼
+class AppendBuffer:
+    """DataFrame 뒤에 추가되는 행을 컬럼별 배열에 모아 두는 버퍼.
+
+    배열 용량을 두 배씩 늘려서 행 추가는 분할 상환 O(1)이고,
+    DataFrame은 frame()이 호출될 때 한 번에 만든다. 표는 항상
+    apply_schema()를 거친 타입(category / float32)으로 유지된다.
+    행마다 ROW_ID를 붙이고, 삭제는 ID를 묘비(tombstone)로 표시만 해 두었다가
+    frame()에서 한 번에 걸러내므로 여러 행을 지워도 표 복사는 한 번이다.
+    """
+
+    def __init__(self, frame, next_id=0):
+        self.base, self.next_id = with_row_ids(apply_schema(frame), next_id)
+        self.arrays = {}
+        self.size = 0
+        self.capacity = 0
+        self.tombstones = set()
+
+    def __len__(self):
+        return len(self.base) + self.size - len(self.tombstones)
+
+    def _new_array(self, column, capacity):
+        if column == ROW_ID:
+            return np.zeros(capacity, dtype=np.int64)
+        if column in NUMERIC_COLUMNS:
+            return np.full(capacity, np.nan, dtype=NUMERIC_DTYPE)
+        return np.full(capacity, None, dtype=object)
+
+    def _grow(self):
+        capacity = max(16, self.capacity * 2)
+        for column, values in self.arrays.items():
+            grown = self._new_array(column, capacity)
+            grown[:self.size] = values[:self.size]
+            self.arrays[column] = grown
+        self.capacity = capacity
+
+    def append(self, row):
+        """행 추가. ID가 없으면 새로 붙인 행을 반환"""
+        if ROW_ID not in row:
+            row = dict(row, **{ROW_ID: self.next_id})
+        self.next_id = max(self.next_id, int(row[ROW_ID]) + 1)
+        if self.size == self.capacity:
+            self._grow()
+        for column, value in row.items():
+            values = self.arrays.get(column)
+            if values is None:
+                values = self.arrays[column] = self._new_array(column, self.capacity)
+            try:
+                values[self.size] = value
+            except (TypeError, ValueError):
+                # 숫자 컬럼에 숫자가 아닌 값이 들어오면 object 배열로 전환
+                values = self.arrays[column] = values.astype(object)
+                values[self.size] = value
+        self.size += 1
+        return row
+
+    def extend(self, frame):
+        """여러 행을 한 번에 추가. ID를 붙인 frame을 반환"""
+        frame, self.next_id = with_row_ids(frame.reset_index(drop=True), self.next_id)
+        self.base = concat_typed(self.frame(), frame)
+        return frame
+
+    def positions(self, row_ids):
+        """행 ID들의 현재 위치 (없는 ID는 -1)"""
+        return row_positions(self.frame(), row_ids)
+
+    def remove(self, row_ids):
+        """행 삭제 표시 (O(1)). 실제 제거는 다음 frame() 때 한 번에 한다"""
+        self.tombstones.update(int(row_id) for row_id in row_ids)
+
+    def update(self, position, changes):
+        frame = self.frame()
+        for column, value in changes.items():
+            set_frame_value(frame, position, column, value)
+
+    def frame(self):
+        """버퍼에 쌓인 행과 삭제 표시를 반영한 DataFrame"""
+        if self.size:
+            columns = list(self.base.columns) + [c for c in self.arrays if c not in self.base.columns]
+            new_rows = pd.DataFrame({c: a[:self.size] for c, a in self.arrays.items()})
+            self.base = apply_schema(concat_typed(self.base, new_rows).reindex(columns=columns))
+            self.arrays = {}
+            self.size = 0
+            self.capacity = 0
+        if self.tombstones:
+            dead = np.fromiter(self.tombstones, dtype=np.int64, count=len(self.tombstones))
+            self.base = self.base[~np.isin(self.base[ROW_ID].to_numpy(), dead)].reset_index(drop=True)
+            self.tombstones.clear()
+        return self.base
+
+# 검색 대상 컬럼 (첫 컬럼이 이름으로 가장 높은 가중치)
+SEARCH_FIELDS = {
+    'card_collection': ['카드명', '제조사', '디자인스타일', '피니시'],
+    'wishlist': ['이름', '타입', '비고'],
+    'magic_list': ['마술명', '장르', '비고'],
+}
+
+# 한글 초성 (유니코드 음절 순서)
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+CHOSEONG_SET = set(CHOSEONG)
+
+# 완성형 음절 → 초성 변환표 (모듈을 처음 불러올 때 한 번만 만든다)
+CHOSEONG_TABLE = {code: CHOSEONG[(code - 0xAC00) // 588] for code in range(0xAC00, 0xD7A4)}
+
+# 한글 음절을 초성으로 바꾼 문자열 ("바이시클" → "ㅂㅇㅅㅋ")
+def to_choseong(text):
+    return text.translate(CHOSEONG_TABLE)
+
+# 1글자·2글자 n-gram 집합
+def text_ngrams(text):
+    grams = set(text)
+    grams.update(map(operator.add, text, text[1:]))
+    return grams
+
+# 초성 n-gram 키 접두 (문자열 해시가 NUL에서 끊기지 않도록 \x01 사용)
+CHOSEONG_KEY = "\x01"
+
+# 색인 키 (n-gram + 초성 n-gram), 같은 값이 반복되는 컬럼이 많아 캐시
+@functools.lru_cache(maxsize=65536)
+def search_keys(text):
+    keys = text_ngrams(text)
+    choseong = to_choseong(text)
+    if choseong != text:
+        # 원문과 같은 n-gram(한글이 없는 부분)은 초성 키로 중복 색인하지 않음
+        keys |= set(map(CHOSEONG_KEY.__add__, text_ngrams(choseong) - keys))
+    return frozenset(keys)
+
+# 텍스트 검색 색인
+class SearchIndex:
+    """표의 텍스트 컬럼에 대한 n-gram(1·2글자) 역색인.
+
+    포스팅 키는 (컬럼 번호, n-gram)이고 값은 오름차순 문서 id 배열이다.
+    한글은 초성 n-gram(CHOSEONG_KEY 접두)으로도 색인해서 "ㅂㅇㅅㅋ"로 "바이시클"을 찾는다.
+    doc_ids는 표 순서대로의 문서 id(항상 오름차순)라서 행 위치는 이진 탐색으로 구하고,
+    삭제된 문서의 포스팅 항목은 검색할 때 doc_ids에 없는 것으로 걸러낸다.
+    """
+
+    # 이름 컬럼 일치 / 이름 시작 / 이름 완전 일치 / 그 외 컬럼 일치 가중치
+    NAME_WEIGHT, PREFIX_BONUS, EXACT_BONUS, FIELD_WEIGHT = 3.0, 2.0, 3.0, 1.0
+    # 후보가 이 개수 이하로 줄면 남은 포스팅 교집합 대신 본문을 바로 확인
+    VERIFY_LIMIT = 64
+    # 최근 검색 결과 보관 개수 (같은 검색어로 다시 실행될 때 재사용)
+    CACHE_SIZE = 32
+
+    def __init__(self, fields):
+        self.fields = fields
+        self.postings = {}
+        self.texts = [[] for _ in fields]
+        self.choseongs = [[] for _ in fields]
+        self.lengths = array('q')
+        self.doc_ids = array('q')
+        self.cache = {}
+
+    def _row_texts(self, row):
+        texts = []
+        for field in self.fields:
+            value = row.get(field)
+            texts.append("" if value is None or pd.isna(value) else str(value).strip().lower())
+        return texts
+
+    def add(self, row):
+        self.cache.clear()
+        doc_id = len(self.texts[0])
+        self.doc_ids.append(doc_id)
+        for i, text in enumerate(self._row_texts(row)):
+            self.texts[i].append(text)
+            self.choseongs[i].append(to_choseong(text))
+            if i == 0:
+                self.lengths.append(len(text))
+            for key in search_keys(text):
+                posting = self.postings.get((i, key))
+                if posting is None:
+                    posting = self.postings[(i, key)] = array('q')
+                posting.append(doc_id)
+
+    def extend(self, frame):
+        """여러 행을 한 번에 색인 (값별 n-gram을 펼친 뒤 키별로 정렬해서 포스팅 생성)"""
+        self.cache.clear()
+        start = len(self.texts[0])
+        new_ids = np.arange(start, start + len(frame), dtype=np.int64)
+        self.doc_ids.frombytes(new_ids.tobytes())
+        for i, field in enumerate(self.fields):
+            if field in frame.columns:
+                texts = frame[field].astype(object).fillna("").astype(str).str.strip().str.lower().tolist()
+            else:
+                texts = [""] * len(frame)
+            if not texts:
+                continue
+            codes, uniques = pd.factorize(pd.Series(texts, dtype=object))
+            self.texts[i].extend(texts)
+            self.choseongs[i].extend(np.array([to_choseong(value) for value in uniques], dtype=object)[codes].tolist())
+            if i == 0:
+                self.lengths.frombytes(np.array([len(value) for value in uniques], dtype=np.int64)[codes].tobytes())
+            value_keys = [list(search_keys(value)) for value in uniques]
+            counts = np.array([len(keys) for keys in value_keys], dtype=np.int64)
+            key_codes, vocabulary = pd.factorize(pd.Series([key for keys in value_keys for key in keys], dtype=object))
+            offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+            # 문서마다 자기 값의 키 코드 구간을 이어 붙인 (키, 문서) 쌍
+            doc_counts = counts[codes]
+            total = int(doc_counts.sum())
+            if not total:
+                # 모든 행이 빈 값인 컬럼 (비고 등)은 포스팅이 없다
+                continue
+            starts = np.repeat(offsets[codes] - np.concatenate(([0], np.cumsum(doc_counts)[:-1])), doc_counts)
+            pair_keys = key_codes[starts + np.arange(total)]
+            pair_docs = np.repeat(new_ids, doc_counts)
+            if len(vocabulary) < 2 ** 16:
+                # 작은 정수형은 안정 정렬이 기수 정렬로 처리되어 훨씬 빠름
+                pair_keys = pair_keys.astype(np.uint16)
+            order = np.argsort(pair_keys, kind='stable')
+            pair_keys, pair_docs = pair_keys[order], pair_docs[order]
+            bounds = np.flatnonzero(np.diff(pair_keys)) + 1
+            for key_code, docs in zip(pair_keys[np.concatenate(([0], bounds))], np.split(pair_docs, bounds)):
+                posting = self.postings.get((i, vocabulary[key_code]))
+                if posting is None:
+                    posting = self.postings[(i, vocabulary[key_code])] = array('q')
+                posting.frombytes(docs.tobytes())
+
+    def remove(self, positions):
+        """여러 행 삭제 (doc_ids 배열은 한 번만 다시 만든다)"""
+        self.cache.clear()
+        doc_ids = np.frombuffer(self.doc_ids, dtype=np.int64)
+        keep = np.ones(len(doc_ids), dtype=bool)
+        keep[np.asarray(positions, dtype=np.int64)] = False
+        for doc_id in doc_ids[~keep].tolist():
+            for i in range(len(self.fields)):
+                self.texts[i][doc_id] = self.choseongs[i][doc_id] = ""
+            self.lengths[doc_id] = 0
+        self.doc_ids = array('q', doc_ids[keep].tobytes())
+
+    def replace(self, position, row):
+        """행 수정: 바뀐 컬럼의 포스팅에서만 문서를 빼고 넣는다 (정렬 유지)"""
+        self.cache.clear()
+        doc_id = self.doc_ids[position]
+        for i, text in enumerate(self._row_texts(row)):
+            old = self.texts[i][doc_id]
+            if old == text:
+                continue
+            old_keys, new_keys = search_keys(old), search_keys(text)
+            for key in old_keys - new_keys:
+                posting = self.postings[(i, key)]
+                at = bisect.bisect_left(posting, doc_id)
+                if at < len(posting) and posting[at] == doc_id:
+                    del posting[at]
+            for key in new_keys - old_keys:
+                posting = self.postings.get((i, key))
+                if posting is None:
+                    posting = self.postings[(i, key)] = array('q')
+                posting.insert(bisect.bisect_left(posting, doc_id), doc_id)
+            self.texts[i][doc_id] = text
+            self.choseongs[i][doc_id] = to_choseong(text)
+            if i == 0:
+                self.lengths[doc_id] = len(text)
+
+    def search(self, query):
+        """query를 포함하는 행의 위치를 관련도 순으로 반환"""
+        query = query.strip().lower()
+        positions = self.cache.get(query)
+        if positions is None:
+            if len(self.cache) >= self.CACHE_SIZE:
+                self.cache.pop(next(iter(self.cache)))
+            positions = self.cache[query] = self._search(query)
+        return positions
+
+    def _search(self, query):
+        if not query:
+            return []
+        choseong_query = all(ch in CHOSEONG_SET or ch == " " for ch in query)
+        prefix = CHOSEONG_KEY if choseong_query else ""
+        grams = {query} if len(query) == 1 else {query[i:i + 2] for i in range(len(query) - 1)}
+        # 2글자 이하 검색어는 포스팅이 곧 정답이라 (이름 외 컬럼은) 본문 확인 생략
+        exact = len(query) <= 2
+        doc_ids = np.frombuffer(self.doc_ids, dtype=np.int64)
+        matches = []
+        for i in range(len(self.fields)):
+            postings = [self.postings.get((i, prefix + gram)) for gram in grams]
+            if not all(postings):
+                matches.append(None)
+                continue
+            postings.sort(key=len)
+            candidates = np.frombuffer(postings[0], dtype=np.int64)
+            for posting in postings[1:]:
+                # 후보가 충분히 적으면 남은 포스팅 대신 본문 확인으로 거른다
+                if not exact and len(candidates) <= self.VERIFY_LIMIT:
+                    break
+                posting = np.frombuffer(posting, dtype=np.int64)
+                at = np.minimum(np.searchsorted(posting, candidates), len(posting) - 1)
+                candidates = candidates[posting[at] == candidates]
+            # 삭제된 문서 제거 후 본문 확인 (이름 컬럼은 일치 위치도 필요)
+            positions = np.searchsorted(doc_ids, candidates)
+            alive = positions < len(doc_ids)
+            alive[alive] = doc_ids[positions[alive]] == candidates[alive]
+            candidates = candidates[alive]
+            texts = self.choseongs[i] if choseong_query else self.texts[i]
+            if i == 0 or not exact:
+                subset = [texts[doc] for doc in candidates.tolist()]
+                found = np.fromiter(map(str.find, subset, itertools.repeat(query, len(subset))),
+                                    dtype=np.int64, count=len(subset))
+                keep = found >= 0
+                candidates, found = candidates[keep], found[keep]
+            else:
+                found = None
+            matches.append((candidates, found))
+
+        lengths = np.frombuffer(self.lengths, dtype=np.int64)
+        hits = [match[0] for match in matches if match is not None]
+        if not hits:
+            return []
+        docs = hits[0] if len(hits) == 1 else np.unique(np.concatenate(hits))
+        score = np.zeros(len(docs))
+        for i, match in enumerate(matches):
+            if match is None:
+                continue
+            candidates, found = match
+            where = np.searchsorted(docs, candidates)
+            if i == 0:
+                score[where] += (self.NAME_WEIGHT + self.PREFIX_BONUS * (found == 0)
+                                 + self.EXACT_BONUS * (lengths[candidates] == len(query)))
+            else:
+                score[where] += self.FIELD_WEIGHT
+        order = np.lexsort((docs, lengths[docs], -score))
+        return np.searchsorted(doc_ids, docs[order]).tolist()
+
+# 대시보드 집계 대상 컬럼
+STATS_SUM_COLUMNS = {
+    'card_collection': ['구매가격($)', '현재가격($)', '디자인별점'],
+    'wishlist': ['가격($)'],
+    'magic_list': ['난이도'],
+}
+STATS_COUNT_COLUMNS = {'card_collection': ['개봉여부', '제조사']}
+# 상위 목록: (순위 컬럼, 개수, 표시용 컬럼)
+STATS_TOP = {
+    'magic_list': ('신기함정도', 3, ['마술명', '신기함정도']),
+    'wishlist': ('우선순위', 5, ['이름', '타입', '가격($)', '우선순위']),
+}
+HIGH_PRIORITY = 4.0
+
+# 집계용 숫자 변환 (표와 같은 float32 정밀도, 숫자가 아니거나 NaN이면 None)
+def stats_number(value):
+    try:
+        value = float(NUMERIC_DTYPE(value))
+    except (TypeError, ValueError):
+        return None
+    return None if value != value else value
+
+# 대시보드 집계
+class DashboardStats:
+    """대시보드 수치를 표 전체를 다시 읽지 않고 유지하는 누적 카운터/합계.
+
+    행 추가/삭제/수정 때 그 행의 값만큼 더하고 빼서 O(1)로 갱신한다.
+    상위 목록(신기함 TOP 3, 높은 우선순위 위시리스트 앞 5개)은 행 ID와
+    표시용 값을 들고 있다가, 목록에 든 행이 삭제되거나 순위 값이 바뀌면
+    stale로 표시해 두고 다음 조회 때만 표에서 다시 계산한다.
+    행 ID는 표 순서대로 커지므로 같은 순위 값끼리는 ID로 표 순서를 비교한다.
+    """
+
+    def __init__(self):
+        self.rows = {table: 0 for table in TABLE_COLUMNS}
+        self.sums = {table: {column: [0.0, 0] for column in columns}
+                     for table, columns in STATS_SUM_COLUMNS.items()}
+        self.counts = {table: {column: {} for column in columns}
+                       for table, columns in STATS_COUNT_COLUMNS.items()}
+        self.high_priority = 0
+        self.top = {table: [] for table in STATS_TOP}
+        self.stale = set()
+
+    @classmethod
+    def from_tables(cls, tables):
+        stats = cls()
+        for table in TABLE_COLUMNS:
+            if tables.get(table) is not None:
+                stats.extend(table, tables[table])
+        return stats
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        stats.rows.update(data['rows'])
+        for table, columns in data['sums'].items():
+            stats.sums[table].update({column: list(value) for column, value in columns.items()})
+        for table, columns in data['counts'].items():
+            stats.counts[table].update({column: dict(value) for column, value in columns.items()})
+        stats.high_priority = data['high_priority']
+        stats.top.update({table: [dict(entry) for entry in entries] for table, entries in data['top'].items()})
+        stats.stale = set(data['stale'])
+        # 행 ID 이전에 저장된 상위 목록(행 위치 기준)은 다시 계산
+        stats.stale.update(table for table, entries in stats.top.items()
+                           if any(ROW_ID not in entry for entry in entries))
+        return stats
+
+    def to_dict(self):
+        return {
+            'rows': dict(self.rows),
+            'sums': {table: {c: list(v) for c, v in columns.items()} for table, columns in self.sums.items()},
+            'counts': {table: {c: dict(v) for c, v in columns.items()} for table, columns in self.counts.items()},
+            'high_priority': self.high_priority,
+            'top': {table: [dict(entry) for entry in entries] for table, entries in self.top.items()},
+            'stale': sorted(self.stale),
+        }
+
+    def _add_frame(self, table, frame, sign):
+        """여러 행의 값을 컬럼 단위로 한 번에 더하거나(sign=1) 뺀다(sign=-1)"""
+        self.rows[table] += sign * len(frame)
+        for column, total in self.sums.get(table, {}).items():
+            if column in frame.columns:
+                values = pd.to_numeric(frame[column], errors='coerce').astype(NUMERIC_DTYPE).astype('float64')
+                total[0] += sign * float(values.sum())
+                total[1] += sign * int(values.count())
+        for column, counts in self.counts.get(table, {}).items():
+            if column in frame.columns:
+                for key, count in frame[column].value_counts().items():
+                    if count:
+                        counts[key] = counts.get(key, 0) + sign * int(count)
+                        if counts[key] <= 0:
+                            del counts[key]
+        if table == 'wishlist' and '우선순위' in frame.columns:
+            self.high_priority += sign * int((pd.to_numeric(frame['우선순위'], errors='coerce') >= HIGH_PRIORITY).sum())
+
+    def _add(self, table, row, sign):
+        self.rows[table] += sign
+        for column, total in self.sums.get(table, {}).items():
+            value = stats_number(row.get(column))
+            if value is not None:
+                total[0] += sign * value
+                total[1] += sign
+        for column, counts in self.counts.get(table, {}).items():
+            key = row.get(column)
+            if key is None or pd.isna(key):
+                continue
+            counts[key] = counts.get(key, 0) + sign
+            if counts[key] <= 0:
+                del counts[key]
+        if table == 'wishlist' and (stats_number(row.get('우선순위')) or 0) >= HIGH_PRIORITY:
+            self.high_priority += sign
+
+    def _entry(self, table, row):
+        entry = {column: row.get(column) for column in STATS_TOP[table][2]}
+        entry[ROW_ID] = int(row.get(ROW_ID))
+        return entry
+
+    def _offer(self, table, row):
+        """새 행이 상위 목록에 들어가는지 확인 (목록이 stale이면 어차피 다시 계산)"""
+        if table not in STATS_TOP or table in self.stale:
+            return
+        if pd.isna(row.get(ROW_ID, np.nan)):
+            # 행 ID가 생기기 전의 저널 레코드: 로드 후 표에서 다시 계산
+            self.stale.add(table)
+            return
+        column, limit, _ = STATS_TOP[table]
+        value = stats_number(row.get(column))
+        entries = self.top[table]
+        if table == 'wishlist':
+            # 표 순서상 앞쪽 행들이라 끝에 붙는 새 행은 자리가 남을 때만 들어간다
+            if value is not None and value >= HIGH_PRIORITY and len(entries) < limit:
+                entries.append(self._entry(table, row))
+        elif value is not None and (len(entries) < limit or value > stats_number(entries[-1][column])):
+            # 같은 값이면 앞 행이 우선 (nlargest keep='first'와 같음)
+            entries.append(self._entry(table, row))
+            entries.sort(key=lambda entry: (-stats_number(entry[column]), entry[ROW_ID]))
+            del entries[limit:]
+
+    def insert(self, table, row):
+        self._add(table, row, 1)
+        self._offer(table, row)
+
+    def extend(self, table, frame):
+        """여러 행 추가 (컬럼 단위로 한 번에 집계)"""
+        self._add_frame(table, frame, 1)
+        if table in STATS_TOP and table not in self.stale and STATS_TOP[table][0] in frame.columns:
+            self._offer_frame(table, frame)
+
+    def delete(self, table, frame):
+        """삭제된 행들(DataFrame)만큼 빼기. 상위 목록에 든 행이 있으면 stale"""
+        self._add_frame(table, frame, -1)
+        if table in STATS_TOP and table not in self.stale and len(frame):
+            removed = set(frame[ROW_ID].tolist()) if ROW_ID in frame.columns else None
+            if removed is None or any(entry[ROW_ID] in removed for entry in self.top[table]):
+                self.stale.add(table)
+
+    def update(self, table, old_row, new_row):
+        self._add(table, old_row, -1)
+        self._add(table, new_row, 1)
+        if table in STATS_TOP and table not in self.stale:
+            column = STATS_TOP[table][0]
+            changed = stats_number(old_row.get(column)) != stats_number(new_row.get(column))
+            row_id = old_row.get(ROW_ID)
+            if changed or row_id is None or any(entry[ROW_ID] == row_id for entry in self.top[table]):
+                self.stale.add(table)
+
+    def _offer_frame(self, table, frame):
+        """frame에서 상위 목록 후보만 골라 _offer"""
+        column, limit, _ = STATS_TOP[table]
+        frame = frame.reset_index(drop=True)
+        values = pd.to_numeric(frame[column], errors='coerce')
+        if table == 'wishlist':
+            candidates = values[values >= HIGH_PRIORITY].index[:limit]
+        else:
+            candidates = values.nlargest(limit).index
+        for offset in candidates:
+            self._offer(table, frame.iloc[offset])
+
+    def refresh_top(self, get_frame):
+        """stale 상위 목록을 표에서 다시 계산"""
+        for table in list(self.stale):
+            self.stale.discard(table)
+            self.top[table] = []
+            frame = get_frame(table)
+            if STATS_TOP[table][0] in frame.columns:
+                self._offer_frame(table, frame)
+
+    def total(self, table, column):
+        return self.sums[table][column][0]
+
+    def mean(self, table, column):
+        total, count = self.sums[table][column]
+        return total / count if count else float('nan')
+
+    def distribution(self, table, column, limit=None):
+        """값별 행 수 (많은 순)"""
+        items = sorted(self.counts[table][column].items(), key=lambda item: -item[1])
+        return items[:limit] if limit else items
+
+# 가격 기록 폴더 (일자/카드 행 ID/가격/수량을 컬럼별 파일에 덧붙이기만 한다)
+PRICE_DIR = "card_magic_prices"
+PRICE_COLUMNS = {'day': np.int32, 'card': np.int32, 'price': np.float32, 'qty': np.int32}
+# 카드 행 ID → (카드명, 제조사) 표시 정보. 카드명으로 묶던 예전 기록은 cards.jsonl을 썼다
+PRICE_SERIES_FILE = "series.jsonl"
+PRICE_LEGACY_FILE = "cards.jsonl"
+PRICE_CHART_POINTS = 400
+PRICE_PERIODS = {"1개월": 30, "3개월": 90, "1년": 365, "전체": None}
+
+# 오늘 날짜 (1970-01-01부터의 일수)
+def today_day():
+    return int(np.datetime64(datetime.now().date(), 'D').astype(np.int64))
+
+# 카드 가격 이력
+class PriceHistory:
+    """카드별 현재가격 변화를 기록하는 시계열 저장소.
+
+    값이 바뀐 카드만 (일자, 카드 행 ID, 가격, 보유 수량) 한 행으로 덧붙이므로 매일
+    스냅샷을 찍어도 바뀌지 않은 카드는 공간을 쓰지 않는다. 컬럼마다 파일을 따로 두고
+    조회할 때 memmap으로 읽으며, 데이터 로드와는 별개라 차트를 열거나 가격이 바뀔 때만
+    읽는다. 시계열은 카드 표의 행 ID(ROW_ID)마다 따로 두므로 이름이 같은 덱도 섞이지 않는다.
+    카드명과 제조사는 표시용으로 마지막 값만 두고, 수량은 보유 중이면 1, 삭제되면 0이다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.names = None
+        self.manufacturers = {}
+        self.last = {}
+        self.synced = None
+        self.rows = 0
+        self.cache = {}
+
+    def __len__(self):
+        self._sync()
+        return self.rows
+
+    def _file(self, column):
+        return os.path.join(self.path, f"{column}.bin")
+
+    def _length(self):
+        # 기록 도중 끊겼으면 가장 짧은 컬럼까지만 유효
+        lengths = []
+        for column, dtype in PRICE_COLUMNS.items():
+            try:
+                lengths.append(os.path.getsize(self._file(column)) // np.dtype(dtype).itemsize)
+            except FileNotFoundError:
+                return 0
+        return min(lengths)
+
+    def columns(self):
+        """기록 전체를 컬럼별 배열(memmap)로 반환"""
+        length = self._length()
+        if not length:
+            return {column: np.empty(0, dtype) for column, dtype in PRICE_COLUMNS.items()}
+        return {
+            column: np.memmap(self._file(column), dtype=dtype, mode='r', shape=(length,))
+            for column, dtype in PRICE_COLUMNS.items()
+        }
+
+    def _series_size(self):
+        try:
+            return os.path.getsize(os.path.join(self.path, PRICE_SERIES_FILE))
+        except FileNotFoundError:
+            return 0
+
+    def _retire_legacy(self):
+        """카드명으로 묶던 예전 기록은 행 ID로 나눌 수 없으므로 옆 폴더로 옮겨 두고 새로 시작한다"""
+        if (not os.path.exists(os.path.join(self.path, PRICE_LEGACY_FILE))
+                or os.path.exists(os.path.join(self.path, PRICE_SERIES_FILE))):
+            return
+        try:
+            os.rename(self.path, f"{self.path}.by_name")
+        except OSError:  # 다른 프로세스가 먼저 옮겼거나 예전 폴더가 이미 있다
+            logging.getLogger(__name__).warning("예전 가격 기록을 옮기지 못했습니다: %s", self.path)
+
+    def _read_series(self):
+        self.names, self.manufacturers = {}, {}
+        path = os.path.join(self.path, PRICE_SERIES_FILE)
+        if not os.path.exists(path):
+            return
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    row_id, name, manufacturer = json.loads(line)
+                except ValueError:
+                    break
+                # 이름/제조사가 바뀐 카드는 마지막 줄이 현재 값
+                self.names[row_id] = name
+                self.manufacturers[row_id] = manufacturer
+
+    def _sync(self):
+        """다른 프로세스가 덧붙인 기록이 있으면 카드 정보와 카드별 마지막 값을 다시 읽기"""
+        if self.names is None:
+            self._retire_legacy()
+        synced = (self._length(), self._series_size())
+        if self.names is not None and synced == self.synced:
+            return
+        length = synced[0]
+        self._read_series()
+        data = self.columns()
+        self.last = {}
+        if length:
+            # 뒤에서부터 처음 나오는 행이 카드별 마지막 기록
+            ids, first = np.unique(data['card'][::-1], return_index=True)
+            rows = length - 1 - first
+            self.last = dict(zip(ids.tolist(), zip(data['price'][rows].tolist(), data['qty'][rows].tolist())))
+        self.rows = length
+        self.synced = synced
+        self.cache.clear()
+
+    @staticmethod
+    def summarize(frame):
+        """카드 표에서 행 ID별 (카드명, 현재가격, 수량 1, 제조사)"""
+        frame = frame.reindex(columns=[ROW_ID, '카드명', '현재가격($)', '제조사'])
+        return dict(zip(
+            frame[ROW_ID].astype(np.int64).tolist(),
+            zip(frame['카드명'].astype(object).tolist(),
+                frame['현재가격($)'].to_numpy(dtype=float, na_value=np.nan).tolist(),
+                itertools.repeat(1),
+                frame['제조사'].astype(object).tolist()),
+        ))
+
+    def observe(self, frame, day=None):
+        """카드 표(frame) 전체의 현재가격으로 맞춘다 (바뀐 카드만 기록하고, 표에 없는 카드는 수량 0)"""
+        self._sync()
+        current = self.summarize(frame)
+        for row_id in self.names:
+            current.setdefault(row_id, (None, float('nan'), 0, None))
+        return self._write(current, day)
+
+    def record(self, changes, day=None):
+        """(행 ID, 카드명, 가격, 수량, 제조사) 변경분을 기록. 카드명/가격/제조사가 None이면 마지막 값을 쓴다.
+        표 전체를 보지 않으므로 행 하나를 추가/삭제할 때도 비용이 일정하다"""
+        self._sync()
+        targets = {}
+        for row_id, name, price, qty, manufacturer in changes:
+            row_id = int(row_id)
+            old_price = targets[row_id][1] if row_id in targets else self.last.get(row_id, (float('nan'), 0))[0]
+            targets[row_id] = (name, old_price if price is None or pd.isna(price) else price, qty, manufacturer)
+        return self._write(targets, day)
+
+    def _write(self, targets, day=None):
+        # targets: 행 ID → (카드명, 가격, 수량, 제조사). 마지막 기록과 다른 카드만 덧붙인다
+        rows, new_series = [], []
+        for row_id, (name, price, qty, manufacturer) in targets.items():
+            price = float(NUMERIC_DTYPE(price))
+            name = None if pd.isna(name) else str(name)
+            manufacturer = None if pd.isna(manufacturer) else str(manufacturer)
+            known = row_id in self.names
+            if not known and not qty:
+                continue
+            if qty and (not known or name not in (None, self.names[row_id])
+                        or manufacturer not in (None, self.manufacturers[row_id])):
+                # 처음 보는 카드이거나 이름/제조사가 바뀐 카드
+                name = self.names.get(row_id) if name is None else name
+                manufacturer = self.manufacturers.get(row_id) if manufacturer is None else manufacturer
+                self.names[row_id], self.manufacturers[row_id] = name, manufacturer
+                new_series.append((row_id, name, manufacturer))
+            old = self.last.get(row_id)
+            if old is not None and old[1] == qty and (qty == 0 or old[0] == price):
+                continue
+            self.last[row_id] = (price, qty)
+            rows.append((row_id, price, qty))
+        if not rows and not new_series:
+            return 0
+        os.makedirs(self.path, exist_ok=True)
+        if new_series:
+            with open(os.path.join(self.path, PRICE_SERIES_FILE), 'a+b') as f:
+                # 기록 도중 끊겨 줄바꿈 없이 남은 마지막 줄은 버린다 (이어 쓰면 뒤의 줄까지 읽지 못한다)
+                f.seek(0, os.SEEK_END)
+                if f.tell():
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        f.seek(0)
+                        content = f.read()
+                        f.truncate(content.rfind(b"\n") + 1)
+                for series in new_series:
+                    f.write((json.dumps(series, ensure_ascii=False) + "\n").encode('utf-8'))
+        if rows:
+            card_ids, prices, quantities = zip(*rows)
+            values = {
+                'day': np.full(len(rows), today_day() if day is None else day, np.int32),
+                'card': np.array(card_ids, np.int32),
+                'price': np.array(prices, np.float32),
+                'qty': np.array(quantities, np.int32),
+            }
+            # 끊긴 기록이 남긴 꼬리를 잘라 컬럼 파일 길이를 맞춘 뒤 덧붙인다
+            length = self._length()
+            for column, dtype in PRICE_COLUMNS.items():
+                with open(self._file(column), 'ab') as f:
+                    f.truncate(length * np.dtype(dtype).itemsize)
+                    f.write(values[column].tobytes())
+        self.rows += len(rows)
+        self.synced = (self.rows, self._series_size())
+        self.cache.clear()
+        return len(rows)
+
+    def _select(self, names=None, manufacturer=None, row_ids=None):
+        # 카드명/제조사/행 ID 조건에 맞는 카드 행 ID (조건이 없으면 None)
+        ids = None if row_ids is None else {int(row_id) for row_id in row_ids}
+        if names is not None:
+            names = set(names)
+            matched = {row_id for row_id, name in self.names.items() if name in names}
+            ids = matched if ids is None else ids & matched
+        if manufacturer is not None:
+            matched = {row_id for row_id, m in self.manufacturers.items() if m == manufacturer}
+            ids = matched if ids is None else ids & matched
+        return None if ids is None else np.array(sorted(ids), np.int32)
+
+    def history(self, names=None, manufacturer=None, start=None, end=None, row_ids=None):
+        """카드명/제조사/행 ID/기간(일수 범위)으로 고른 가격 기록 (이름이 같은 덱은 ROW_ID로 구분)"""
+        self._sync()
+        data = self.columns()
+        mask = np.ones(len(data['day']), dtype=bool)
+        ids = self._select(names, manufacturer, row_ids)
+        if ids is not None:
+            mask &= np.isin(data['card'], ids)
+        if start is not None:
+            mask &= data['day'] >= start
+        if end is not None:
+            mask &= data['day'] <= end
+        rows = np.flatnonzero(mask)
+        card_ids = data['card'][rows]
+        return pd.DataFrame({
+            '일자': data['day'][rows].astype(np.int64).astype('datetime64[D]'),
+            ROW_ID: card_ids.astype(np.int64),
+            '카드명': [self.names.get(i) for i in card_ids.tolist()],
+            '제조사': [self.manufacturers.get(i) for i in card_ids.tolist()],
+            '가격($)': data['price'][rows],
+            '수량': data['qty'][rows],
+        })
+
+    def portfolio(self, manufacturer=None, start=None, end=None, points=PRICE_CHART_POINTS):
+        """일자별 보유 카드 총 가치(가격 × 수량). points개 이하로 줄여서 반환"""
+        self._sync()
+        key = ('portfolio', manufacturer, start, end, points)
+        if key in self.cache:
+            return self.cache[key]
+        data = self.columns()
+        day, card = np.asarray(data['day']), np.asarray(data['card'])
+        value = np.nan_to_num(data['price'].astype(np.float64)) * data['qty']
+        ids = self._select(None, manufacturer)
+        if ids is not None:
+            mask = np.isin(card, ids)
+            day, card, value = day[mask], card[mask], value[mask]
+        if not len(day):
+            return pd.Series(dtype=np.float64)
+        # 카드별로 직전 기록과의 차이를 그날의 변화량으로 더한 뒤 누적
+        order = np.lexsort((day, card))
+        card, value = card[order], value[order]
+        previous = np.concatenate([[0.0], value[:-1]])
+        previous[np.concatenate([[True], card[1:] != card[:-1]])] = 0.0
+        first = int(day.min())
+        last = max(int(day.max()), today_day())
+        totals = np.cumsum(np.bincount(day[order] - first, weights=value - previous, minlength=last - first + 1))
+        days = np.arange(first, last + 1)
+        lo = 0 if start is None else max(start - first, 0)
+        hi = len(days) if end is None else max(min(end - first + 1, len(days)), lo)
+        days, totals = days[lo:hi], totals[lo:hi]
+        # 구간마다 마지막 날의 값을 남긴다
+        step = max(-(-len(days) // points), 1)
+        picks = np.arange(len(days) - 1, -1, -step)[::-1]
+        series = pd.Series(totals[picks], index=days[picks].astype('datetime64[D]'))
+        self.cache[key] = series
+        return series
+
+# 보관할 목록 조회 결과 개수 (오래 안 쓴 것부터 버림)
+QUERY_CACHE_SIZE = 64
+
+# 행(dict)과 내용이 같은 행 찾기
+def matching_rows(frame, row):
+    """frame에서 row의 모든 값이 같은 행의 위치 (숫자는 float32 정밀도로, 빈 값끼리는 같다고 비교)"""
+    mask = np.ones(len(frame), dtype=bool)
+    for column, value in row.items():
+        if column not in frame.columns:
+            continue
+        series = frame[column]
+        if pd.isna(value):
+            mask &= series.isna().to_numpy()
+        elif column in NUMERIC_COLUMNS:
+            mask &= series.to_numpy(dtype=NUMERIC_DTYPE, na_value=np.nan) == NUMERIC_DTYPE(value)
+        else:
+            mask &= (series.astype(object) == value).to_numpy()
+    return np.flatnonzero(mask)
+
+# 프로세스 공유 데이터 저장소
+# 자동 저장 설정 (초). 마지막 변경 뒤 이만큼 조용하면 기록하고, 변경이 계속 이어져도
+# 첫 변경 뒤 AUTOSAVE_MAX_DELAY초 안에는 기록한다. 0이면 변경마다 바로 기록
+AUTOSAVE_WINDOW = float(os.environ.get("CARD_MAGIC_AUTOSAVE_WINDOW", "0.5"))
+AUTOSAVE_MAX_DELAY = 5.0
+
+# 백그라운드 자동 저장
+class AutoSaver:
+    """변경을 모았다가 백그라운드 스레드에서 flush()로 한 번에 기록.
+
+    notify()는 변경이 생겼다고 알리기만 하고 바로 돌아온다. 연달아 들어온 변경은
+    window초 동안 새 변경이 없을 때(길어도 max_delay초 안에) 기록 한 번으로 합친다.
+    기록이 실패하면 error에 남기고 window초 뒤 다시 시도한다.
+    프로세스가 끝날 때(atexit) 남은 변경을 마저 기록한다.
+    """
+
+    def __init__(self, flush, window=AUTOSAVE_WINDOW, max_delay=AUTOSAVE_MAX_DELAY):
+        self.flush = flush
+        self.window = window
+        self.max_delay = max(max_delay, window)
+        self.first_change = None
+        self.last_change = None
+        self.writes = 0
+        self.error = None
+        self.closed = False
+        self.condition = threading.Condition()
+        self.thread = None
+        atexit.register(self.close)
+
+    def notify(self):
+        with self.condition:
+            now = time.monotonic()
+            if self.first_change is None:
+                self.first_change = now
+            self.last_change = now
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="card-magic-autosave", daemon=True)
+                self.thread.start()
+            self.condition.notify()
+
+    def _due(self):
+        """기록할 때까지 남은 시간 (변경이 없으면 None)"""
+        if self.first_change is None:
+            return None
+        deadline = min(self.last_change + self.window, self.first_change + self.max_delay)
+        return deadline - time.monotonic()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                wait = self._due()
+                while not self.closed and (wait is None or wait > 0):
+                    self.condition.wait(wait)
+                    wait = self._due()
+                if wait is None:
+                    return
+                self.first_change = self.last_change = None
+            self._flush()
+
+    def _flush(self):
+        try:
+            if self.flush():
+                self.writes += 1
+            self.error = None
+        except Exception as e:
+            logging.getLogger(__name__).exception("자동 저장 실패")
+            self.error = e
+            if not self.closed:
+                # 모아 둔 변경은 그대로 남아 있으므로 잠시 뒤 다시 시도
+                self.notify()
+
+    def close(self):
+        """스레드를 멈추고 남은 변경을 지금 기록"""
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join()
+        self._flush()
+
+class DataStore:
+    """저장소 내용을 프로세스 단위로 한 번만 불러와 모든 세션이 공유하는 캐시.
+
+    파일의 (mtime, size, inode)가 바뀌었을 때만 다시 불러온다. 표는 AppendBuffer로
+    들고 있어서 행 추가가 표 전체를 복사하지 않는다. 데이터가 바뀔 때마다
+    version이 올라가고, memo()로 만든 파생 결과는 버전이 같을 때만 재사용된다.
+    대시보드 집계(DashboardStats)도 변경 레코드마다 갱신해서 데이터와 함께 저장한다.
+    카드 가격이나 수량이 바뀌면 가격 이력(PriceHistory)에도 기록한다.
+    읽기는 공유 잠금, 쓰기는 배타 잠금 안에서 하므로 여러 프로세스가 같은 파일을 써도 된다.
+    행은 ROW_ID로 가리키며, 여러 행 삭제/수정은 레코드 하나('remove'/'edit')로 한 번에 기록한다.
+    autosave(초)를 주면 변경은 메모리에만 반영하고 AutoSaver가 모아서 기록한다.
+    SQLite 저장소의 표는 열 때 행 수만 알아 두고(lazy), 검색/수정/백업 등으로 처음 쓸 때 읽는다.
+    """
+
+    def __init__(self, backend, prices=None, autosave=None):
+        self.backend = backend
+        self.prices = prices
+        self.tables = {}
+        # 아직 읽지 않은 표: 이름 → (행 수, 다음 ID)
+        self.lazy = {}
+        self.lists = {}
+        self.loaded = False
+        self.signature = None
+        self.version = 0
+        self.derived = {}
+        self.indexes = {}
+        self.stats = DashboardStats()
+        self.memory = {}
+        self.query_cache = OrderedDict()
+        self.needs_row_ids = False
+        self.lock = threading.RLock()
+        # 자동 저장: 아직 기록하지 않은 레코드와 표별 변경 수
+        self.pending = []
+        self.pending_prices = []
+        self.dirty = {}
+        self.autosave = AutoSaver(self.flush, autosave) if autosave else None
+
+    def _bump_version(self):
+        self.version += 1
+        self.derived.clear()
+
+    def _set_data(self, data):
+        self._bump_version()
+        self.indexes = {}
+        self.query_cache.clear()
+        data = data or {}
+        next_ids = data.get('next_ids', {})
+        row_counts = data.get('row_counts', {})
+        self.lazy = {
+            name: (row_counts[name], next_ids.get(name, 0))
+            for name in TABLE_COLUMNS if name not in data and name in row_counts
+        }
+        self.tables = {
+            name: AppendBuffer(conform_table(name, data[name] if name in data else pd.DataFrame(columns=columns)),
+                               next_ids.get(name, 0))
+            for name, columns in TABLE_COLUMNS.items() if name not in self.lazy
+        }
+        # 행 ID 없이 저장된 파일은 다음 쓰기 때 ID를 붙인 스냅샷으로 바꾼다
+        self.needs_row_ids = any(name in data and ROW_ID not in data[name].columns for name in TABLE_COLUMNS)
+        self.lists = {name: list(data[name]) for name in LIST_NAMES if name in data}
+        # 저장된 집계는 행 수가 맞을 때만 사용하고, 없거나 어긋나면 표에서 다시 계산
+        stats = DashboardStats.from_dict(data['stats']) if data.get('stats') else None
+        # 로드 시점의 스키마 적용 효과 (표별 (적용 전 추정, 적용 후) 바이트, 읽은 표만)
+        self.memory = {name: schema_memory(buffer.frame()) for name, buffer in self.tables.items()}
+        rows = {name: len(buffer) for name, buffer in self.tables.items()}
+        rows.update({name: count for name, (count, _) in self.lazy.items()})
+        if stats is None or stats.rows != rows:
+            # 집계를 표에서 다시 계산해야 하면 표를 모두 읽는다 (로드 중이라 파일은 잠겨 있다)
+            for name in list(self.lazy):
+                self._read_table(name)
+            stats = DashboardStats.from_tables({name: buffer.frame() for name, buffer in self.tables.items()})
+        self.stats = stats
+
+    def _load(self):
+        # 표를 나중에 읽을 때 그 사이 파일이 바뀌었는지 이 서명으로 확인한다
+        self.signature = self.backend.signature()
+        data = self.backend.load()
+        self._set_data(data)
+        self.loaded = data is not None
+
+    def _read_table(self, name):
+        """아직 읽지 않은 표를 읽는다. 로드한 뒤 다른 프로세스가 기록했으면 읽지 않고 False"""
+        if name not in self.lazy:
+            return True
+        frame = self.backend.load_table(name)
+        if self.backend.signature() != self.signature:
+            return False
+        _, next_id = self.lazy.pop(name)
+        buffer = self.tables[name] = AppendBuffer(conform_table(name, frame), next_id)
+        self.memory[name] = schema_memory(buffer.frame())
+        return True
+
+    def _buffer(self, name):
+        """표의 AppendBuffer (아직 읽지 않은 표는 이때 읽는다)"""
+        self.load_tables([name])
+        return self.tables.get(name)
+
+    def load_tables(self, names=tuple(TABLE_COLUMNS)):
+        """아직 읽지 않은 표를 읽어 둔다. 그 사이 파일이 바뀌었으면 다시 로드해서
+        읽은 표들이 모두 같은 시점의 내용이 되게 한다"""
+        with self.lock:
+            while not all(self._read_table(name) for name in names):
+                self._reload()
+
+    def refresh(self):
+        """파일이 변경된 경우에만 다시 로드. 저장된 데이터가 있으면 True"""
+        with self.lock, self.backend.lock(shared=True):
+            signature = self.backend.signature()
+            if signature is None and not self.pending:
+                self._set_data(None)
+                self.loaded = False
+                self.signature = None
+            elif signature != self.signature:
+                self._reload()
+            return self.loaded
+
+    def table(self, name):
+        """표를 DataFrame으로 반환 (버퍼에 쌓인 행은 이때 반영)"""
+        with self.lock:
+            if name not in self.tables and name not in self.lazy:
+                self._set_data(None)
+            return self._buffer(name).frame()
+
+    def search(self, table, query):
+        """검색어와 일치하는 행 위치를 관련도 순으로 반환 (색인은 처음 검색할 때 생성)"""
+        with self.lock:
+            index = self.indexes.get(table)
+            if index is None:
+                index = SearchIndex(SEARCH_FIELDS[table])
+                index.extend(self.table(table))
+                self.indexes[table] = index
+            return index.search(query)
+
+    def query_result(self, table, key):
+        """(표, 조회 조건)별 결과 캐시 항목(dict). 그 표가 바뀔 때만 무효화된다"""
+        with self.lock:
+            entry = self.query_cache.pop((table, key), None)
+            if entry is None:
+                entry = {}
+                if len(self.query_cache) >= QUERY_CACHE_SIZE:
+                    self.query_cache.popitem(last=False)
+            self.query_cache[(table, key)] = entry
+            return entry
+
+    def dashboard_stats(self):
+        """대시보드 집계 (상위 목록이 stale이면 이때 다시 계산)"""
+        with self.lock:
+            if not self.tables and not self.lazy:
+                self._set_data(None)
+            self.stats.refresh_top(self.table)
+            return self.stats
+
+    def memo(self, name, key, build):
+        """데이터 버전과 key가 같으면 이전에 build()로 만든 결과를 재사용"""
+        with self.lock:
+            cached = self.derived.get(name)
+            if cached is not None and cached[0] == key:
+                return cached[1]
+            value = build()
+            self.derived[name] = (key, value)
+            return value
+
+    def snapshot(self):
+        with self.lock:
+            self.load_tables()
+            data = {name: self.table(name) for name in TABLE_COLUMNS}
+            data.update({name: list(values) for name, values in self.lists.items()})
+            data['next_ids'] = {name: buffer.next_id for name, buffer in self.tables.items()}
+            data['stats'] = self.stats.to_dict()
+            return data
+
+    def put(self, data):
+        """전체 데이터를 기록하고 공유 사본을 갱신"""
+        with self.lock, self.backend.lock():
+            # 표가 통째로 바뀌었을 수 있으므로 타입을 맞추고 집계는 표에서 새로 계산
+            data = {
+                name: apply_schema(value) if name in TABLE_COLUMNS else value
+                for name, value in data.items() if name != 'stats'
+            }
+            # 새로 들어온 표(복원 등)도 행 ID를 갖추고, 이미 준 ID는 다시 쓰지 않는다
+            next_ids = dict(data.get('next_ids', {}))
+            for name, buffer in self.tables.items():
+                next_ids[name] = max(next_ids.get(name, 0), buffer.next_id)
+            for name, (_, next_id) in self.lazy.items():
+                next_ids[name] = max(next_ids.get(name, 0), next_id)
+            for name in TABLE_COLUMNS:
+                if name in data:
+                    data[name], next_ids[name] = with_row_ids(data[name], next_ids.get(name, 0))
+            data['next_ids'] = next_ids
+            data['stats'] = DashboardStats.from_tables(data).to_dict()
+            self.backend.save(data)
+            # 전체를 새로 썼으므로 모아 둔 변경은 더 기록하지 않는다
+            self.pending, self.pending_prices, self.dirty = [], [], {}
+            self._set_data(data)
+            self.loaded = True
+            self.signature = self.backend.signature()
+            if self.prices is not None:
+                self.prices.observe(self.table('card_collection'))
+
+    def _locate(self, name, position, row):
+        """사용자가 본 행(row)의 현재 위치. 그 사이 앞쪽 행이 지워졌으면 옮겨간 위치를 찾는다
+        (행 위치로 가리키는 예전 방식의 delete/update 레코드용)"""
+        frame = self._buffer(name).frame()
+        row = {column: value for column, value in dict(row).items() if column in TABLE_COLUMNS[name]}
+        if position < len(frame) and len(matching_rows(frame.iloc[position:position + 1], row)):
+            return position
+        candidates = matching_rows(frame, row)
+        if not len(candidates):
+            raise WriteConflict("다른 사용자가 이미 삭제하거나 수정한 항목입니다. 최신 데이터를 다시 불러왔습니다.")
+        return int(candidates[np.abs(candidates - position).argmin()])
+
+    def _check_rows(self, name, frame, positions, rows):
+        """positions의 행이 사용자가 본 행(rows)과 같은지 확인. 그 사이 바뀌었으면 WriteConflict"""
+        current = frame.iloc[positions]
+        same = np.ones(len(positions), dtype=bool)
+        for column in [c for c in TABLE_COLUMNS[name] if rows and c in rows[0]]:
+            expected = pd.Series([row.get(column) for row in rows], dtype=object)
+            expected_na = expected.isna().to_numpy()
+            current_na = current[column].isna().to_numpy()
+            if column in NUMERIC_COLUMNS:
+                equal = (current[column].to_numpy(dtype=NUMERIC_DTYPE, na_value=np.nan)
+                         == pd.to_numeric(expected, errors='coerce').to_numpy(dtype=NUMERIC_DTYPE, na_value=np.nan))
+            else:
+                equal = current[column].astype(object).to_numpy() == expected.to_numpy()
+            same &= np.where(expected_na, current_na, equal & ~current_na)
+        if not same.all():
+            raise WriteConflict("다른 사용자가 이미 수정한 항목입니다. 최신 데이터를 다시 불러왔습니다.")
+
+    def append(self, records, expected=None):
+        """변경 레코드를 공유 사본에 반영하고 기록.
+
+        레코드는 ('insert', 표, 행) / ('extend', 표, DataFrame) / ('remove', 표, [행 ID]) /
+        ('edit', 표, [(행 ID, 변경값)]) / ('list', 이름, 값)이다. 예전 방식의
+        ('delete', 표, 위치) / ('update', 표, (위치, 변경값))도 받아서 행 ID 레코드로 바꿔 기록한다.
+
+        expected는 레코드별로 사용자가 화면에서 본 행이다 (remove/edit는 행 목록, 없으면 None).
+        다른 세션이나 프로세스가 먼저 기록했으면 최신 데이터 위에 적용하는데, 이미 지워진 행의
+        삭제는 건너뛰고 목록은 합친다. 고칠 행이 없어졌거나 본 행의 내용이 바뀌었으면
+        아무것도 반영하지 않고 WriteConflict를 낸다. 레코드가 몇 개든 기록은 한 번이다.
+        자동 저장(autosave)이 켜져 있으면 메모리에만 반영하고 바로 돌아오며, 기록은
+        AutoSaver가 모아서 나중에 한다. 반영한 레코드를 반환한다 (추가한 행에는 ROW_ID가 붙어 있다).
+        """
+        expected = list(expected or [])
+        expected += [None] * (len(records) - len(expected))
+        # 자동 저장이면 파일은 flush()에서 잠그므로 여기서는 메모리만 잠근다
+        with self.lock, (self.backend.lock() if self.autosave is None else nullcontext()):
+            # 마지막으로 읽은 뒤 파일이 바뀌었으면 다시 읽어서 덮어쓰지 않게 한다
+            if self.backend.signature() != self.signature:
+                self._reload()
+            if not self.tables and not self.lazy:
+                self._set_data(None)
+            # 레코드를 적용하는 도중에 다시 로드되지 않도록 바꿀 표를 먼저 읽어 둔다
+            self.load_tables({name for _, name, _ in records})
+            try:
+                applied, price_changes = self._apply(records, expected)
+            except WriteConflict:
+                # 앞쪽 레코드가 반영된 메모리 사본을 파일 내용(+ 아직 기록하지 않은 변경)으로 되돌린다
+                self._reload()
+                raise
+            if not applied:
+                return applied
+            if self.autosave is None:
+                self._write(applied, price_changes)
+                return applied
+            self.pending.extend(applied)
+            self.pending_prices.extend(price_changes)
+            for _, name, _ in applied:
+                self.dirty[name] = self.dirty.get(name, 0) + 1
+        self.autosave.notify()
+        return applied
+
+    def _apply(self, records, expected, rebase=False):
+        """레코드를 메모리 사본에 적용하고 (기록할 레코드, 가격 이력 변화)를 반환.
+
+        rebase는 다른 프로세스가 먼저 기록한 데이터 위에 아직 기록하지 않은 레코드를
+        다시 적용할 때 쓴다. 그 사이 다른 쪽이 쓴 행 ID와 겹치는 새 행은 ID를 새로 받고,
+        다른 쪽이 지운 행의 수정은 버린다.
+        """
+        applied = []
+        price_changes = []  # 가격 이력에 반영할 (행 ID, 카드명, 가격, 수량, 제조사)
+        id_map = {}  # rebase로 ID가 바뀐 새 행: (표, 예전 ID) → 새 ID
+        for (op, name, value), row in zip(records, expected):
+            buffer = self._buffer(name)
+            index = self.indexes.get(name)
+            cards = name == 'card_collection'
+            if op == 'delete':
+                position = self._locate(name, value, row) if row is not None else value
+                op, value, row = 'remove', [int(buffer.frame()[ROW_ID].iat[position])], None
+            elif op == 'update':
+                position = self._locate(name, value[0], row) if row is not None else value[0]
+                op, value, row = 'edit', [(int(buffer.frame()[ROW_ID].iat[position]), value[1])], None
+            if op == 'insert':
+                if rebase and ROW_ID in value and int(value[ROW_ID]) < buffer.next_id:
+                    old_id = int(value[ROW_ID])
+                    value = buffer.append({column: v for column, v in value.items() if column != ROW_ID})
+                    id_map[name, old_id] = value[ROW_ID]
+                else:
+                    value = buffer.append(value)
+                self.stats.insert(name, value)
+                if index is not None:
+                    index.add(value)
+                if cards:
+                    price_changes.append(
+                        (value[ROW_ID], value.get('카드명'), value.get('현재가격($)'), 1, value.get('제조사')))
+            elif op == 'extend':
+                if rebase and ROW_ID in value.columns and len(value) and int(value[ROW_ID].min()) < buffer.next_id:
+                    old_ids = value[ROW_ID].to_numpy()
+                    value = buffer.extend(value.drop(columns=ROW_ID))
+                    id_map.update(zip(((name, int(i)) for i in old_ids), value[ROW_ID].tolist()))
+                else:
+                    value = buffer.extend(value)
+                self.stats.extend(name, value)
+                if index is not None:
+                    index.extend(value)
+                if cards and '카드명' in value:
+                    price_changes.extend((row_id, *card) for row_id, card in PriceHistory.summarize(value).items())
+            elif op == 'remove':
+                frame = buffer.frame()
+                row_ids = np.asarray([id_map.get((name, int(i)), int(i)) for i in value], dtype=np.int64)
+                positions = row_positions(frame, row_ids)
+                # 이미 지워진 행은 건너뛴다
+                found = positions >= 0
+                if row is not None:
+                    self._check_rows(name, frame, positions[found], [r for r, f in zip(row, found) if f])
+                positions, row_ids = positions[found], row_ids[found]
+                if not len(row_ids):
+                    continue
+                old_rows = frame.iloc[positions]
+                self.stats.delete(name, old_rows)
+                if index is not None:
+                    index.remove(positions)
+                buffer.remove(row_ids)
+                if cards:
+                    price_changes.extend((row_id, None, None, 0, None) for row_id in row_ids.tolist())
+                value = row_ids.tolist()
+            elif op == 'edit':
+                frame = buffer.frame()
+                value = [(id_map.get((name, int(row_id)), int(row_id)), changes) for row_id, changes in value]
+                positions = row_positions(frame, [row_id for row_id, _ in value])
+                if rebase:
+                    value = [edit for edit, position in zip(value, positions) if position >= 0]
+                    positions = positions[positions >= 0]
+                    if not value:
+                        continue
+                if (positions < 0).any():
+                    raise WriteConflict("다른 사용자가 이미 삭제한 항목입니다. 최신 데이터를 다시 불러왔습니다.")
+                if row is not None:
+                    self._check_rows(name, frame, positions, list(row))
+                for position, (row_id, changes) in zip(positions, value):
+                    old_row = frame.iloc[position]
+                    buffer.update(position, changes)
+                    new_row = buffer.frame().iloc[position]
+                    self.stats.update(name, old_row, new_row)
+                    if index is not None:
+                        index.replace(position, new_row)
+                    if cards:
+                        price_changes.append((row_id, new_row['카드명'], new_row['현재가격($)'], 1, new_row['제조사']))
+                value = [(int(row_id), dict(changes)) for row_id, changes in value]
+            elif op == 'list':
+                # 다른 세션이 추가한 항목도 남긴다
+                value = list(value) + [v for v in self.lists.get(name, []) if v not in value]
+                self.lists[name] = value
+            applied.append((op, name, value))
+        if applied:
+            self._forget_queries(applied)
+            self._bump_version()
+        return applied, price_changes
+
+    def _forget_queries(self, applied):
+        """레코드가 바꾼 표의 조회 결과 캐시를 비운다"""
+        changed = {name for op, name, _ in applied if op != 'list'}
+        for key in [key for key in self.query_cache if key[0] in changed]:
+            del self.query_cache[key]
+
+    def _write(self, applied, price_changes):
+        """반영한 레코드를 파일에 기록 (호출하는 쪽이 파일을 배타적으로 잠근 상태)"""
+        try:
+            if self.needs_row_ids:
+                # 행 ID 없이 저장된 파일은 ID를 붙인 스냅샷으로 바꾼다 (레코드도 스냅샷에 포함됨)
+                self.backend.save(self.snapshot())
+                self.needs_row_ids = False
+            else:
+                self.backend.append(applied, self.snapshot, self.stats.to_dict)
+        except Exception:
+            # 메모리 사본과 파일이 어긋났으므로 다음 조회 때 다시 로드
+            self.signature = None
+            raise
+        self.loaded = True
+        self.signature = self.backend.signature()
+        # 기록 전에 SQL로 센 결과는 이 레코드를 빠뜨렸을 수 있다
+        self._forget_queries(applied)
+        if self.prices is not None and price_changes:
+            self.prices.record(price_changes)
+
+    def _reload(self):
+        """파일에서 다시 읽고, 아직 기록하지 않은 변경이 있으면 그 위에 다시 적용"""
+        self._load()
+        # 아직 기록하지 않은 변경이 바꿀 표를 읽는다 (읽는 사이 파일이 바뀌면 처음부터)
+        while not all(self._read_table(name) for _, name, _ in self.pending):
+            self._load()
+        if self.pending:
+            self.pending, self.pending_prices = self._apply(self.pending, [None] * len(self.pending), rebase=True)
+
+    def flush(self):
+        """자동 저장이 모아 둔 변경을 한 번에 기록하고 기록한 레코드 수를 반환.
+        AutoSaver 스레드가 부르고, 종료할 때와 전체 저장(put) 전에도 부른다"""
+        with self.lock:
+            if not self.pending:
+                return 0
+            with self.backend.lock():
+                # 그 사이 다른 프로세스가 기록했으면 그 위에 다시 적용해서 기록
+                if self.backend.signature() != self.signature:
+                    self._reload()
+                records, price_changes = self.pending, self.pending_prices
+                self._write(records, price_changes)
+                self.pending, self.pending_prices, self.dirty = [], [], {}
+            return len(records)
+
+    def price_history(self):
+        """카드 가격 이력 (기록이 아직 없으면 현재 가격으로 시작점을 만든다)"""
+        if self.prices is not None and not len(self.prices):
+            with self.lock, self.backend.lock():
+                if not len(self.prices):
+                    self.prices.observe(self.table('card_collection'))
+        return self.prices
+
+# 사용자별 데이터 폴더 (비어 있으면 예전처럼 작업 폴더의 파일을 함께 쓴다)
+DATA_DIR = os.environ.get("CARD_MAGIC_DATA_DIR", ".")
+
+# 사용자 이름을 폴더 이름으로 쓸 수 있게 정리
+def normalize_user_name(name):
+    return re.sub(r"[^0-9A-Za-z가-힣_-]", "", str(name or ""))[:40]
+
+# 사용자별 데이터 파일 경로
+def user_data_path(filename, user=""):
+    if not user:
+        return os.path.join(DATA_DIR, filename)
+    directory = os.path.join(DATA_DIR, "users", user)
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, filename)
+
+# 저장된 목록이 없을 때 쓰는 기본 제조사/장르
+DEFAULT_LISTS = {
+    'manufacturers': [
+        "Bicycle", "Theory11", "Ellusionist", "D&D", "Fontaine",
+        "Art of Play", "Kings Wild Project", "USPCC", "Cartamundi"
+    ],
+    'magic_genres': [
+        "카드-세팅", "카드-즉석", "동전", "멘탈리즘", "클로즈업-세팅",
+        "클로즈업-즉석", "일상 즉석", "스테이지", "레스토레이션"
+    ],
+}
+
+# 저장소의 제조사/장르 목록 (없으면 기본 목록)
+def store_lists(store):
+    return {name: list(store.lists.get(name, DEFAULT_LISTS[name])) for name in LIST_NAMES}
+
+# 사용자별 저장소 열기
+def open_store(user="", storage=None, autosave=None):
+    """user의 데이터 파일을 쓰는 DataStore. storage는 "journal"/"pickle"/"sqlite" (기본: STORAGE_MODE).
+    autosave는 자동 저장 간격(초)으로, 없으면 변경마다 바로 기록한다"""
+    storage = storage or STORAGE_MODE
+    path = user_data_path(DATA_FILE, user)
+    prices = PriceHistory(user_data_path(PRICE_DIR, user))
+    if storage == "sqlite":
+        sqlite_path = user_data_path(SQLITE_FILE, user)
+        if not os.path.exists(sqlite_path):
+            migrate_pickle_to_sqlite(path, sqlite_path)
+        return DataStore(SQLiteBackend(sqlite_path), prices, autosave)
+    return DataStore(PickleBackend(path, journal=(storage == "journal")), prices, autosave)
+
+# 사진 저장소 폴더 (사용자별)
+IMAGE_DIR = "card_magic_images"
+# 사진을 붙일 수 있는 표
+IMAGE_TABLES = ('card_collection', 'wishlist')
+# 썸네일 크기 (긴 변 픽셀)
+THUMBNAIL_SIZES = {'small': 96, 'medium': 320}
+# 썸네일 LRU 캐시 상한 (바이트)
+THUMBNAIL_CACHE_BYTES = 32 * 1024 * 1024
+# 썸네일을 만드는 작업자 수 (Pillow는 디코딩/축소/인코딩 중 GIL을 놓는다)
+IMAGE_WORKERS = min(4, os.cpu_count() or 1)
+# 한 장의 크기 상한
+MAX_IMAGE_BYTES = 20 * 1024 * 1024
+
+# 바이트를 임시 파일에 쓴 뒤 원자적으로 교체 (여러 스레드가 같은 파일을 써도 된다)
+def atomic_write_bytes(data, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+class ImageStore:
+    """카드/위시리스트 행에 붙인 사진 저장소 (내용 주소 방식).
+
+    원본은 sha256 해시를 이름으로 objects/에 한 번만 저장하므로 같은 사진을 여러 행에 붙여도
+    공간은 한 장만큼 쓴다. 행과 사진의 연결은 images.db에 (표, 행 ID, 순서, 해시)로 두며,
+    행 ID는 다시 쓰이지 않으므로 지운 행의 연결은 그대로 남아도 보이지 않는다.
+    크기별 썸네일은 사진을 처음 넣을 때 작업자 풀에서 한 번만 만들어 thumbs/에 저장하고,
+    읽은 썸네일은 바이트 상한이 있는 LRU 캐시에서 내준다.
+    """
+
+    def __init__(self, path, workers=IMAGE_WORKERS, cache_bytes=THUMBNAIL_CACHE_BYTES):
+        self.path = path
+        self.db_path = os.path.join(path, "images.db")
+        self.workers = workers
+        self.pool = None
+        self.building = {}
+        self.cache = OrderedDict()
+        self.cache_bytes = cache_bytes
+        self.cached_bytes = 0
+        self.lock = threading.RLock()
+        os.makedirs(path, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS attachments (tbl TEXT NOT NULL, row_id INTEGER NOT NULL, "
+                "position INTEGER NOT NULL, digest TEXT NOT NULL, "
+                "PRIMARY KEY (tbl, row_id, position), UNIQUE (tbl, row_id, digest))"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _object_path(self, digest):
+        return os.path.join(self.path, "objects", digest[:2], digest)
+
+    def _thumbnail_path(self, digest, size):
+        return os.path.join(self.path, "thumbs", size, digest[:2], f"{digest}.jpg")
+
+    def put(self, data):
+        """사진 바이트를 저장하고 해시를 반환 (이미 있는 사진이면 다시 쓰지 않는다)"""
+        try:
+            from PIL import Image  # 시작 시간을 줄이려고 사진을 처음 다룰 때 불러온다
+        except ImportError:  # 사진 첨부 기능만 쓸 수 없다
+            raise RuntimeError("사진 기능에는 Pillow가 필요합니다 (pip install pillow)")
+        if len(data) > MAX_IMAGE_BYTES:
+            raise ValueError(f"사진은 한 장에 {MAX_IMAGE_BYTES // 2**20}MB까지 올릴 수 있습니다")
+        try:
+            with Image.open(io.BytesIO(data)) as image:
+                image.verify()
+        except Exception as e:  # Pillow는 형식마다 다른 예외를 낸다
+            raise ValueError("사진 파일을 읽을 수 없습니다") from e
+        digest = hashlib.sha256(data).hexdigest()
+        if not os.path.exists(self._object_path(digest)):
+            atomic_write_bytes(data, self._object_path(digest))
+        self.build_thumbnails(digest)
+        return digest
+
+    def build_thumbnails(self, digest):
+        """썸네일이 없으면 작업자 풀에 만들기를 맡기고 Future를 반환 (만드는 중이면 그 Future, 다 있으면 None)"""
+        with self.lock:
+            future = self.building.get(digest)
+            if future is not None:
+                return future
+            if all(os.path.exists(self._thumbnail_path(digest, size)) for size in THUMBNAIL_SIZES):
+                return None
+            if self.pool is None:
+                self.pool = ThreadPoolExecutor(self.workers, thread_name_prefix="card-magic-thumbnails")
+            future = self.building[digest] = self.pool.submit(self._make_thumbnails, digest)
+            future.add_done_callback(lambda _: self._finish_build(digest))
+            return future
+
+    def _finish_build(self, digest):
+        with self.lock:
+            self.building.pop(digest, None)
+
+    def _make_thumbnails(self, digest):
+        """원본을 한 번만 디코딩해서 큰 크기부터 차례로 줄이며 모든 크기의 썸네일을 만든다"""
+        from PIL import Image, ImageOps
+        with Image.open(self._object_path(digest)) as original:
+            # JPEG은 디코딩할 때부터 필요한 크기 근처로 줄여서 읽는다
+            largest = max(THUMBNAIL_SIZES.values())
+            original.draft('RGB', (largest, largest))
+            image = ImageOps.exif_transpose(original)
+            if image.mode in ('RGBA', 'LA', 'P'):
+                image = image.convert('RGBA')
+                background = Image.new('RGB', image.size, 'white')
+                background.paste(image, mask=image.getchannel('A'))
+                image = background
+            elif image.mode != 'RGB':
+                image = image.convert('RGB')
+            for size, pixels in sorted(THUMBNAIL_SIZES.items(), key=lambda item: -item[1]):
+                image.thumbnail((pixels, pixels))
+                buffer = io.BytesIO()
+                image.save(buffer, 'JPEG', quality=85)
+                atomic_write_bytes(buffer.getvalue(), self._thumbnail_path(digest, size))
+
+    def thumbnail(self, digest, size='small'):
+        """썸네일 바이트 (LRU 캐시 → 파일 → 아직 없으면 만들어질 때까지 기다린다)"""
+        key = (digest, size)
+        with self.lock:
+            data = self.cache.get(key)
+            if data is not None:
+                self.cache.move_to_end(key)
+                return data
+        path = self._thumbnail_path(digest, size)
+        if not os.path.exists(path):
+            future = self.build_thumbnails(digest)
+            if future is not None:
+                future.result()
+        with open(path, 'rb') as f:
+            data = f.read()
+        with self.lock:
+            if key not in self.cache:
+                self.cache[key] = data
+                self.cached_bytes += len(data)
+                while self.cached_bytes > self.cache_bytes and len(self.cache) > 1:
+                    _, evicted = self.cache.popitem(last=False)
+                    self.cached_bytes -= len(evicted)
+        return data
+
+    def thumbnails(self, digests, size='small'):
+        """{해시: 썸네일 바이트}. 없는 썸네일은 한꺼번에 작업자 풀에 맡긴 뒤 모은다"""
+        for digest in digests:
+            if (digest, size) not in self.cache and not os.path.exists(self._thumbnail_path(digest, size)):
+                self.build_thumbnails(digest)
+        return {digest: self.thumbnail(digest, size) for digest in digests}
+
+    def original(self, digest):
+        with open(self._object_path(digest), 'rb') as f:
+            return f.read()
+
+    def attach(self, table, row_ids, data):
+        """사진을 저장하고 행들에 붙인 뒤 해시를 반환 (같은 사진은 한 번만 저장하고 한 번만 붙는다)"""
+        digest = self.put(data)
+        with closing(self._connect()) as conn, conn:
+            for row_id in row_ids:
+                conn.execute(
+                    "INSERT OR IGNORE INTO attachments (tbl, row_id, position, digest) "
+                    "SELECT ?, ?, COALESCE(MAX(position) + 1, 0), ? FROM attachments WHERE tbl = ? AND row_id = ?",
+                    (table, int(row_id), digest, table, int(row_id))
+                )
+        return digest
+
+    def detach(self, table, row_ids, digest=None):
+        """행들에서 사진을 뗀다 (digest가 없으면 모든 사진). 원본 파일은 다른 행이 쓸 수 있어 남겨 둔다"""
+        with closing(self._connect()) as conn, conn:
+            for row_id in row_ids:
+                if digest is None:
+                    conn.execute("DELETE FROM attachments WHERE tbl = ? AND row_id = ?", (table, int(row_id)))
+                else:
+                    conn.execute("DELETE FROM attachments WHERE tbl = ? AND row_id = ? AND digest = ?",
+                                 (table, int(row_id), digest))
+
+    def images(self, table, row_ids):
+        """{행 ID: [해시, ...]} (붙인 순서). 화면에 보이는 행만 조회한다"""
+        row_ids = [int(row_id) for row_id in row_ids]
+        if not row_ids:
+            return {}
+        placeholders = ", ".join("?" for _ in row_ids)
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f"SELECT row_id, digest FROM attachments WHERE tbl = ? AND row_id IN ({placeholders}) "
+                "ORDER BY row_id, position", [table] + row_ids
+            ).fetchall()
+        result = {}
+        for row_id, digest in rows:
+            result.setdefault(row_id, []).append(digest)
+        return result
+
+# 사용자별 사진 저장소 열기
+def open_image_store(user=""):
+    return ImageStore(user_data_path(IMAGE_DIR, user))
+
+# 목록 필터 연산자
+FILTER_OPERATORS = {
+    '==': operator.eq, '>=': operator.ge, '>': operator.gt, '<': operator.lt, '<=': operator.le
+}
+
+# (컬럼, 연산자, 값) 필터 목록을 DataFrame에 적용
+def filter_frame(df, filters):
+    if df.empty or not filters:
+        return df
+    mask = np.ones(len(df), dtype=bool)
+    for column, op, value in filters:
+        series = df[column]
+        if op == 'contains':
+            mask &= series.str.contains(value, case=False, na=False, regex=False).to_numpy()
+        elif op == '==' and isinstance(series.dtype, pd.CategoricalDtype):
+            # 범주형 같음 비교는 정수 코드끼리 비교
+            code = series.cat.categories.get_indexer([value])[0]
+            mask &= series.cat.codes.to_numpy() == code if code >= 0 else False
+        else:
+            mask &= FILTER_OPERATORS[op](series, value).to_numpy()
+    return df[mask]
+
+# 목록 화면 조회
+class TableQuery:
+    """필터/정렬 조건에 맞는 행 조회.
+
+    SQLite 저장소에서는 개수/집계/페이지를 SQL로 처리하고 (자동 저장이 아직 기록하지 않은
+    변경이 그 표에 있으면 SQL에는 없으므로 메모리 사본을 쓴다), 그 외에는 표를 한 번 필터링/정렬해서 얻은 행 위치 배열을 사용한다.
+    검색어가 있으면 검색 색인이 찾은 행만 대상으로 하고, sort_by가 None이면
+    관련도 순(검색어가 없으면 저장 순서)으로 둔다.
+    행 위치와 개수/집계 결과는 DataStore.query_result()에 조건별로 보관되므로
+    페이지 이동처럼 조건이 같은 rerun은 한 페이지만 잘라낸다.
+    """
+
+    def __init__(self, store, table, filters, sort_by, ascending=True, search=None):
+        self.store = store
+        self.table = table
+        self.filters = list(filters)
+        self.sort_by = sort_by
+        self.ascending = ascending
+        self.search = (search or "").strip()
+        self.sql = (store.backend if isinstance(store.backend, SQLiteBackend) and not self.search
+                    and not store.dirty.get(table) else None)
+        self.result = store.query_result(table, (tuple(self.filters), sort_by, ascending, self.search))
+
+    def _memo(self, key, build):
+        if key not in self.result:
+            self.result[key] = build()
+        return self.result[key]
+
+    @property
+    def positions(self):
+        """조건에 맞는 행의 (표 전체 기준) 위치 배열, 표시 순서대로"""
+        def build():
+            df = self.store.table(self.table)
+            if self.search:
+                df = df.iloc[self.store.search(self.table, self.search)]
+            df = filter_frame(df, self.filters)
+            if not df.empty and self.sort_by is not None:
+                df = df.sort_values(self.sort_by, ascending=self.ascending, kind='stable')
+            return df.index.to_numpy()
+        return self._memo('positions', build)
+
+    def count(self, *extra_filters):
+        extra_filters = list(extra_filters)
+        if self.sql is not None:
+            return self._memo(('count', tuple(extra_filters)),
+                              lambda: self.sql.count(self.table, self.filters + extra_filters))
+        if not extra_filters:
+            return len(self.positions)
+        return self._memo(('count', tuple(extra_filters)),
+                          lambda: len(filter_frame(self.store.table(self.table).iloc[self.positions], extra_filters)))
+
+    def aggregate(self, func, column):
+        if self.sql is not None:
+            return self._memo(('aggregate', func, column),
+                              lambda: self.sql.aggregate(self.table, self.filters, func, column))
+        return self._memo(('aggregate', func, column),
+                          lambda: getattr(self.store.table(self.table)[column].iloc[self.positions], func)())
+
+    def page(self, offset, limit):
+        if self.sql is not None:
+            return self.sql.page(self.table, self.filters, self.sort_by, self.ascending, offset, limit)
+        return self.store.table(self.table).iloc[self.positions[offset:offset + limit]]
+
+# 환율 설정
+EXCHANGE_RATE_URL = os.environ.get("CARD_MAGIC_RATE_URL", "https://api.exchangerate-api.com/v4/latest/USD")
+EXCHANGE_RATE_FILE = "exchange_rate.json"  # 데이터 폴더(DATA_DIR) 안, 모든 사용자가 함께 쓴다
+EXCHANGE_RATE_TTL = 3600
+EXCHANGE_RATE_TIMEOUT = 3.0
+EXCHANGE_RATE_RETRY = 60
+DEFAULT_EXCHANGE_RATE = 1300
+
+# 표시 통화 (코드 → (기호, 소수 자릿수))
+DISPLAY_CURRENCIES = {"KRW": ("₩", 0), "USD": ("$", 2), "EUR": ("€", 2), "JPY": ("¥", 0)}
+
+# 환율 API 조회 (제한 시간 초과/실패 시 예외). 1달러당 통화별 환율 딕셔너리 반환
+def fetch_exchange_rate(url=EXCHANGE_RATE_URL, timeout=EXCHANGE_RATE_TIMEOUT):
+    import requests  # 시작 시간을 줄이려고 처음 조회할 때 불러온다 (백그라운드 스레드)
+    response = requests.get(url, timeout=timeout)
+    response.raise_for_status()
+    rates = {code: float(rate) for code, rate in response.json()['rates'].items()}
+    if 'KRW' not in rates:
+        raise ValueError("KRW 환율이 없습니다")
+    return rates
+
+# 환율 제공자
+class ExchangeRateProvider:
+    """환율을 백그라운드 스레드에서 갱신하고 화면에는 마지막으로 알려진 값을 바로 반환.
+
+    마지막 정상 환율과 시각은 데이터 폴더의 파일에 저장해 두고 재시작 후에도 사용한다.
+    값이 오래되면 이전 값을 그대로 돌려주면서 갱신 스레드를 깨운다.
+    source는 인자 없이 {통화: 환율} 딕셔너리를 반환하는 함수라서
+    테스트용 서버로 바꿔 끼울 수 있다.
+    """
+
+    def __init__(self, source, path=None, ttl=EXCHANGE_RATE_TTL,
+                 retry_interval=EXCHANGE_RATE_RETRY):
+        self.source = source
+        # 작업 폴더가 아니라 데이터 파일과 같은 폴더에 둔다 (--data-dir로 바꿔도 따라간다)
+        self.path = path or user_data_path(EXCHANGE_RATE_FILE)
+        self.ttl = ttl
+        self.retry_interval = retry_interval
+        self.rates = None
+        self.updated_at = None
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.thread = None
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            if 'rates' in saved:
+                self.rates = {code: float(rate) for code, rate in saved['rates'].items()}
+            else:
+                self.rates = {'USD': 1.0, 'KRW': float(saved['rate'])}
+            self.updated_at = float(saved['timestamp'])
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    def _save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'rates': self.rates, 'timestamp': self.updated_at}, f)
+        os.replace(tmp_path, self.path)
+
+    def is_stale(self):
+        return self.updated_at is None or time.time() - self.updated_at > self.ttl
+
+    def refresh(self):
+        """source에서 환율을 가져와 저장. 성공하면 True"""
+        try:
+            rates = self.source()
+        except Exception:
+            return False
+        with self.lock:
+            self.rates = rates
+            self.updated_at = time.time()
+            try:
+                self._save()
+            except OSError:
+                pass
+        return True
+
+    def _run(self):
+        while True:
+            if self.is_stale() and not self.refresh():
+                wait = self.retry_interval
+            else:
+                wait = max(self.updated_at + self.ttl - time.time(), 1)
+            self.wake.wait(timeout=wait)
+            self.wake.clear()
+
+    def start(self):
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="exchange-rate-refresher", daemon=True)
+                self.thread.start()
+        return self
+
+    def get_rates(self):
+        """네트워크를 기다리지 않고 현재 환율 딕셔너리를 반환 (오래된 값이면 갱신 요청)"""
+        if self.is_stale():
+            self.wake.set()
+        rates = self.rates
+        if rates is None:
+            return {'USD': 1.0, 'KRW': DEFAULT_EXCHANGE_RATE}
+        return rates
+
+    def get(self):
+        """현재 원/달러 환율"""
+        return self.get_rates().get('KRW', DEFAULT_EXCHANGE_RATE)
+
+# 통화 변환기
+class CurrencyConverter:
+    """달러 가격을 표시 통화로 변환.
+
+    화면을 그릴 때 한 번 만들어서 환율 조회를 한 번으로 줄이고,
+    가격 컬럼 전체를 NumPy 곱셈 한 번으로 변환한다.
+    """
+
+    def __init__(self, currency, rates):
+        if currency not in rates or currency not in DISPLAY_CURRENCIES:
+            currency = 'KRW'
+        self.currency = currency
+        self.symbol, self.decimals = DISPLAY_CURRENCIES[currency]
+        self.rate = rates.get(currency, DEFAULT_EXCHANGE_RATE)
+
+    def convert(self, usd_amounts):
+        return np.asarray(usd_amounts, dtype=float) * self.rate
+
+    def column_name(self, column):
+        return column.replace("($)", f"({self.symbol})")
+
+    def add_columns(self, df, columns):
+        """df에 변환된 가격 컬럼(예: '가격(₩)')을 추가한 사본을 반환"""
+        return df.assign(**{
+            self.column_name(column): self.convert(df[column].to_numpy(dtype=float, na_value=np.nan))
+            for column in columns
+        })
+
+    def format(self, amount):
+        return f"{self.symbol}{amount:,.{self.decimals}f}"
+
+# 대량 가져오기 설정
+IMPORT_CHUNK_SIZE = 5000
+
+# 파일 컬럼명(정규화된 형태) → 표 컬럼명
+IMPORT_COLUMN_ALIASES = {
+    'card_collection': {
+        'name': '카드명', 'card': '카드명', 'cardname': '카드명', 'deck': '카드명',
+        'purchaseprice': '구매가격($)', 'price': '구매가격($)', 'currentprice': '현재가격($)', 'value': '현재가격($)',
+        'manufacturer': '제조사', 'brand': '제조사', 'discontinued': '단종여부', 'status': '개봉여부',
+        'url': '판매사이트', 'site': '판매사이트', 'rating': '디자인별점', 'finish': '피니시', 'style': '디자인스타일',
+    },
+    'wishlist': {
+        'name': '이름', 'item': '이름', '아이템명': '이름', 'type': '타입', 'price': '가격($)', '예상가격': '가격($)',
+        'url': '판매사이트', 'site': '판매사이트', 'priority': '우선순위', 'note': '비고', 'notes': '비고',
+    },
+    'magic_list': {
+        'name': '마술명', 'trick': '마술명', 'genre': '장르', 'rating': '신기함정도', '신기함': '신기함정도',
+        'difficulty': '난이도', 'video': '관련영상', 'url': '관련영상', 'note': '비고', 'notes': '비고',
+    },
+}
+
+# 빈 값/잘못된 값에 채울 기본값
+IMPORT_DEFAULTS = {
+    'card_collection': {'구매가격($)': 0.0, '현재가격($)': 0.0, '단종여부': "현재판매", '개봉여부': "미개봉",
+                        '디자인별점': 3.0, '피니시': "Standard", '디자인스타일': "클래식"},
+    'wishlist': {'타입': "기타", '가격($)': 0.0, '우선순위': 3.0},
+    'magic_list': {'신기함정도': 3.0, '난이도': 3.0},
+}
+
+# 선택지가 정해진 컬럼
+IMPORT_CHOICES = {
+    '단종여부': ["단종", "현재판매"],
+    '개봉여부': ["미개봉", "개봉", "새 덱"],
+    '피니시': ["Standard", "Air Cushion", "Linen", "Smooth", "Embossed"],
+    '디자인스타일': ["클래식", "모던", "빈티지", "미니멀", "화려함", "테마"],
+    '타입': ["카드", "마술용품", "책", "DVD", "기타"],
+}
+
+# 1~5점 컬럼
+RATING_COLUMNS = {'디자인별점', '우선순위', '신기함정도', '난이도'}
+
+# 파일 컬럼명을 표 컬럼명으로 변환
+def resolve_import_column(table, column):
+    column = str(column).strip()
+    if column in TABLE_COLUMNS[table]:
+        return column
+    key = column.lower().replace(" ", "").replace("_", "").replace("($)", "")
+    for candidate in TABLE_COLUMNS[table]:
+        if key == candidate.replace("($)", ""):
+            return candidate
+    return IMPORT_COLUMN_ALIASES[table].get(key, column)
+
+# CSV/XLSX 파일을 청크 단위로 읽기
+def iter_import_chunks(uploaded_file, file_name, chunksize=IMPORT_CHUNK_SIZE):
+    if file_name.lower().endswith(('.xlsx', '.xlsm')):
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise ValueError("엑셀 파일을 읽으려면 openpyxl 패키지가 필요합니다")
+        workbook = load_workbook(uploaded_file, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) == chunksize:
+                    yield pd.DataFrame(batch, columns=header)
+                    batch = []
+            if batch:
+                yield pd.DataFrame(batch, columns=header)
+        finally:
+            workbook.close()
+    else:
+        yield from pd.read_csv(uploaded_file, chunksize=chunksize, dtype=str, encoding='utf-8-sig')
+
+# 청크 하나를 표 형식에 맞게 검증/변환 (벡터 연산)
+def coerce_import_chunk(table, chunk):
+    """(유효한 행 DataFrame, 건너뛴 행 수)를 반환"""
+    chunk = chunk.rename(columns=lambda c: resolve_import_column(table, c))
+    chunk = chunk.loc[:, ~chunk.columns.duplicated()]
+    defaults = IMPORT_DEFAULTS[table]
+    result = {}
+    for column in TABLE_COLUMNS[table]:
+        default = defaults.get(column, "")
+        if column not in chunk.columns:
+            values = pd.Series(default, index=chunk.index)
+        else:
+            values = chunk[column]
+        if column in NUMERIC_COLUMNS:
+            values = pd.to_numeric(values, errors='coerce')
+            values = values.clip(1.0, 5.0) if column in RATING_COLUMNS else values.clip(lower=0.0)
+            values = values.fillna(default).astype(float)
+        else:
+            values = values.fillna(default).astype(str).str.strip()
+            if column in IMPORT_CHOICES:
+                values = values.where(values.isin(IMPORT_CHOICES[column]), default)
+        result[column] = values
+    coerced = pd.DataFrame(result, index=chunk.index)
+    name_column = TABLE_COLUMNS[table][0]
+    valid = coerced[name_column] != ""
+    return coerced[valid], int((~valid).sum())
+# 가져올 때 새 값을 목록에 등록하는 표 → (목록 이름, 컬럼)
+IMPORT_LIST_COLUMNS = {'card_collection': ('manufacturers', '제조사'), 'magic_list': ('magic_genres', '장르')}
+
+# 대량 가져오기
+def import_file(store, table, source, file_name, lists=None, chunksize=IMPORT_CHUNK_SIZE):
+    """CSV/XLSX 파일의 행을 청크마다 검증해서 표에 추가하고, 마지막에 한 번만 기록.
+    검증한 청크는 표 스키마(범주형/float32)로 줄여서 모아 둔다. 도중에 파일 오류가 나면 아무것도 추가하지 않는다.
+    lists는 새 제조사/장르를 판단할 {목록 이름: 값} (기본: 저장소의 목록)"""
+    start = time.perf_counter()
+    chunks = []
+    skipped = 0
+    for chunk in iter_import_chunks(source, file_name, chunksize):
+        valid, invalid = coerce_import_chunk(table, chunk)
+        skipped += invalid
+        if not valid.empty:
+            chunks.append(apply_schema(valid.reset_index(drop=True)))
+    rows = sum(len(chunk) for chunk in chunks)
+
+    # 처음 보는 제조사/장르를 한 번에 등록
+    records = []
+    new_names = []
+    if table in IMPORT_LIST_COLUMNS and chunks:
+        list_name, column = IMPORT_LIST_COLUMNS[table]
+        current = (store_lists(store) if lists is None else lists)[list_name]
+        seen = set().union(*(chunk[column].unique() for chunk in chunks))
+        new_names = sorted(seen - set(current) - {""})
+        if new_names:
+            records.append(('list', list_name, sorted(list(current) + new_names)))
+    if chunks:
+        records.append(('extend', table, concat_typed_frames(chunks)))
+        chunks.clear()
+        store.append(records)
+
+    elapsed = time.perf_counter() - start
+    return {
+        'rows': rows,
+        'skipped': skipped,
+        'new_names': new_names,
+        'seconds': elapsed,
+        'rows_per_second': rows / elapsed if elapsed > 0 else float('inf'),
+    }
+
+# 표 하나의 저장소
+class Repository:
+    """DataStore의 표 하나(카드 컬렉션/위시리스트/마술)에 대한 조회와 변경.
+
+    행은 ROW_ID로 가리키고, 변경은 DataStore.append()의 변경 레코드로 기록된다.
+    delete/edit에 expected(화면에서 본 행 목록)를 넘기면 그 사이 다른 프로세스가
+    내용을 바꾼 행이 있을 때 아무것도 바꾸지 않고 WriteConflict를 낸다.
+    """
+
+    def __init__(self, store, name):
+        self.store = store
+        self.name = name
+        self.columns = TABLE_COLUMNS[name]
+
+    def __len__(self):
+        return len(self.frame())
+
+    def frame(self):
+        return self.store.table(self.name)
+
+    def add(self, row):
+        self.store.append([('insert', self.name, dict(row))])
+
+    def add_many(self, frame):
+        self.store.append([('extend', self.name, frame)])
+
+    def get(self, row_id):
+        """행 ID의 행 (없으면 None)"""
+        frame = self.frame()
+        position = row_positions(frame, [row_id])[0]
+        return None if position < 0 else frame.iloc[position]
+
+    def delete(self, row_ids, expected=None):
+        """여러 행을 한 번의 기록으로 삭제 (이미 없는 행은 건너뜀)"""
+        self.store.append([('remove', self.name, [int(row_id) for row_id in row_ids])], [expected])
+
+    def edit(self, changes_by_id, expected=None):
+        """{행 ID: 변경값}을 한 번의 기록으로 적용"""
+        edits = [(int(row_id), dict(changes)) for row_id, changes in changes_by_id.items()]
+        self.store.append([('edit', self.name, edits)], [expected])
+
+    def update(self, row_id, changes, expected=None):
+        self.edit({row_id: changes}, None if expected is None else [expected])
+
+    def query(self, filters=(), sort_by=None, ascending=True, search=None):
+        return TableQuery(self.store, self.name, filters, sort_by, ascending, search)
+
+    def search(self, text):
+        """검색어와 일치하는 행 (관련도 순)"""
+        return self.frame().iloc[self.store.search(self.name, text)]
+
+# 사용자 한 명의 컬렉션
+class Library:
+    """카드 컬렉션, 위시리스트, 마술 저장소와 제조사/장르 목록을 묶은 진입점.
+
+    화면(card_magic_app.py)과 명령줄 도구(card_magic_cli.py)가 같은 저장소를 이 API로 다룬다.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.cards = Repository(store, 'card_collection')
+        self.wishlist = Repository(store, 'wishlist')
+        self.magic = Repository(store, 'magic_list')
+
+    @classmethod
+    def open(cls, user="", storage=None):
+        store = open_store(normalize_user_name(user), storage)
+        store.refresh()
+        return cls(store)
+
+    def repository(self, table):
+        return {repo.name: repo for repo in (self.cards, self.wishlist, self.magic)}[table]
+
+    def lists(self):
+        return store_lists(self.store)
+
+    def add_names(self, list_name, names):
+        """제조사/장르 목록에 새 이름을 추가"""
+        current = self.lists()[list_name]
+        names = [name for name in names if name and name not in current]
+        if names:
+            self.store.append([('list', list_name, sorted(current + names))])
+
+    def stats(self):
+        return self.store.dashboard_stats()
+
+    def price_history(self):
+        return self.store.price_history()
+
+    def backup(self):
+        return backup_archive(self.store)
+
+    def restore(self, fileobj):
+        return restore_backup(self.store, fileobj)
+
+    def write_backup(self, fileobj, base=None):
+        """fileobj에 전체 백업(base가 없을 때) 또는 base(BackupIndex) 이후의 변경분 백업을 쓰고
+        새 BackupIndex를 반환"""
+        lists = self.lists()
+        return write_backup_stream(fileobj, self.store, lists['manufacturers'], lists['magic_genres'], base)
+
+    def restore_chain(self, fileobjs):
+        return restore_backup_chain(self.store, fileobjs)
+
+    def import_file(self, table, source, file_name, chunksize=IMPORT_CHUNK_SIZE):
+        return import_file(self.store, table, source, file_name, chunksize=chunksize)
+
+    def revalue(self, prices=None, percent=None, manufacturer=None):
+        """카드 현재가격을 한 번에 바꾸고 바뀐 행 수를 반환.
+
+        prices는 {카드명: 새 가격}, percent는 현재가격에 곱할 증감률(%)이고,
+        manufacturer를 주면 그 제조사 카드만 바꾼다. 표 전체를 한 번 다시 기록하므로
+        가격 이력에도 바뀐 카드만 남는다.
+        """
+        with self.store.lock:
+            self.store.refresh()
+            data = self.store.snapshot()
+            cards = data['card_collection']
+            current = cards['현재가격($)'].to_numpy(dtype=float, na_value=np.nan)
+            values = current.copy()
+            if prices:
+                mapped = cards['카드명'].astype(object).map(prices).to_numpy(dtype=float, na_value=np.nan)
+                values = np.where(np.isnan(mapped), values, mapped)
+            if percent is not None:
+                values = values * (1 + percent / 100)
+            target = np.ones(len(cards), dtype=bool)
+            if manufacturer:
+                target = (cards['제조사'].astype(object) == manufacturer).to_numpy()
+            values = np.where(target, np.round(values, 2), current)
+            changed = ~np.isclose(values, current, equal_nan=True)
+            if not changed.any():
+                return 0
+            cards = cards.copy()
+            cards['현재가격($)'] = values.astype(NUMERIC_DTYPE)
+            data['card_collection'] = cards
+            self.store.put(data)
+            return int(changed.sum())
@@ -0,0 +1,13 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """데이터 파일을 임시 폴더에 만든다"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
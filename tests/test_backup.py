@@ -0,0 +1,148 @@
+import gzip
+import io
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from card_magic_cli import chain_files, main
+from card_magic_core import (
+    BACKUP_FORMAT, ROW_ID, Library, read_backup_file, read_backup_header, read_backup_stream, scan_backup_chain,
+)
+
+
+def gzipped(*lines):
+    return io.BytesIO(gzip.compress(b"".join(line + b"\n" for line in lines)))
+
+
+def header_line():
+    return json.dumps({'format': BACKUP_FORMAT, 'kind': 'full'}).encode()
+
+
+@pytest.mark.parametrize('fileobj', [
+    io.BytesIO(gzip.compress(b"")),                                   # 헤더 없음
+    io.BytesIO(b"not a backup"),                                      # gzip 아님
+    gzipped(b"[1, 2, 3]"),                                            # 헤더가 객체가 아님
+    gzipped(header_line(), b'["Bee", 1.0]'),                         # 표 머리줄 없이 행
+    gzipped(header_line(), b'{"table": "wishlist", "columns": ["x"]}'),  # 행 수 없음
+    gzipped(header_line(), b'{"table": "wishlist", "columns": ["x"], "count": 2}', b'["a"]'),  # 잘림
+])
+def test_malformed_backup_raises_value_error(fileobj):
+    with pytest.raises(ValueError):
+        read_backup_file(fileobj)
+
+
+def test_read_backup_header_rejects_empty_stream():
+    with pytest.raises(ValueError):
+        read_backup_header(io.BytesIO(gzip.compress(b"")))
+
+
+def test_truncated_backup_file(workdir):
+    library = Library.open("", 'journal')
+    library.repository('card_collection').add({'카드명': "Bee", '현재가격($)': 3.0})
+    buffer = io.BytesIO()
+    library.write_backup(buffer)
+    data = gzip.decompress(buffer.getvalue())
+    with pytest.raises(ValueError):
+        read_backup_file(io.BytesIO(gzip.compress(data[:-20])))
+    with pytest.raises(ValueError):
+        read_backup_file(io.BytesIO(buffer.getvalue()[:-10]))
+    assert read_backup_file(io.BytesIO(buffer.getvalue()))['data']['card_collection']['카드명'].tolist() == ["Bee"]
+
+
+def make_library(rows=20):
+    library = Library.open("", 'journal')
+    library.repository('card_collection').add_many(pd.DataFrame({
+        '카드명': [f"Deck {i}" for i in range(rows)],
+        '현재가격($)': [float(i) for i in range(rows)],
+        '제조사': ["Bicycle"] * rows,
+    }))
+    return library
+
+
+def change(library, day):
+    cards = library.repository('card_collection')
+    ids = cards.frame()[ROW_ID].tolist()
+    cards.add({'카드명': f"New {day}", '현재가격($)': 1.0})
+    cards.edit({ids[day]: {'현재가격($)': 100.0 + day}})
+    cards.delete([ids[-1]])
+
+
+def backup(library, base=None):
+    buffer = io.BytesIO()
+    index = library.write_backup(buffer, base)
+    buffer.seek(0)
+    return buffer, index
+
+
+def test_delta_chain_restores_latest_state(workdir):
+    library = make_library()
+    full, index = backup(library)
+    chain = [full]
+    for day in range(3):
+        change(library, day)
+        delta, index = backup(library, index)
+        chain.append(delta)
+        # 변경분에는 추가 1행 + 수정 1행만 실린다
+        assert index.changes['card_collection'] == {'added': 1, 'changed': 1, 'removed': 1}
+        assert read_backup_file(io.BytesIO(delta.getvalue()))['data']['card_collection'].shape[0] == 2
+    expected = library.store.table('card_collection')
+
+    summaries, scanned = scan_backup_chain([io.BytesIO(f.getvalue()) for f in reversed(chain)], track_rows=True)
+    assert [s['sequence'] for s in summaries] == [0, 1, 2, 3]
+    assert scanned.state() == index.state()
+
+    restored = Library.open("other", 'journal')
+    restored.restore_chain([io.BytesIO(f.getvalue()) for f in chain])
+    cards = restored.store.table('card_collection')
+    assert cards[ROW_ID].tolist() == expected[ROW_ID].tolist()
+    assert cards['카드명'].tolist() == expected['카드명'].tolist()
+    assert cards['현재가격($)'].tolist() == expected['현재가격($)'].tolist()
+
+
+def test_broken_chain_is_rejected(workdir):
+    library = make_library()
+    full, index = backup(library)
+    change(library, 0)
+    first, index = backup(library, index)
+    change(library, 1)
+    second, index = backup(library, index)
+    with pytest.raises(ValueError):
+        scan_backup_chain([io.BytesIO(full.getvalue()), io.BytesIO(second.getvalue())])
+    with pytest.raises(ValueError):
+        library.restore_chain([io.BytesIO(full.getvalue()), io.BytesIO(second.getvalue())])
+    with pytest.raises(ValueError):
+        read_backup_stream(io.BytesIO(first.getvalue()))
+
+
+def test_cli_backup_and_deep_verify(workdir, capsys):
+    library = make_library()
+    directory = str(workdir / "backups")
+    main(["--storage", "journal", "backup", directory])
+    for day in range(2):
+        change(library, day)
+        main(["--storage", "journal", "backup", directory])
+    files = chain_files(directory)
+    assert [name.rsplit("_", 1)[1] for name in files] == ["full.jsonl.gz", "delta.jsonl.gz", "delta.jsonl.gz"]
+
+    capsys.readouterr()
+    main(["--storage", "journal", "verify", "--deep", directory])
+    assert "체인 정상" in capsys.readouterr().out
+
+    # 가운데 변경분이 빠지면 깊은 검사도 실패한다
+    os.remove(files[1])
+    with pytest.raises(SystemExit, match="검사 실패"):
+        main(["--storage", "journal", "verify", "--deep", directory])
+
+
+def test_verify_does_not_open_the_store(workdir, monkeypatch, capsys):
+    make_library()
+    directory = str(workdir / "backups")
+    main(["--storage", "journal", "backup", directory])
+
+    def locked(*args):
+        raise AssertionError("verify가 데이터 저장소를 열었습니다")
+    monkeypatch.setattr(Library, 'open', locked)
+    main(["--storage", "journal", "verify", directory])
+    assert "체인 정상" in capsys.readouterr().out
@@ -0,0 +1,88 @@
+import pandas as pd
+import pytest
+
+from card_magic_core import ROW_ID, WriteConflict, open_store
+
+STORAGES = ['journal', 'sqlite', 'pickle']
+
+
+def seed(storage, rows=5):
+    store = open_store("", storage)
+    store.put({'card_collection': pd.DataFrame({
+        '카드명': [f"Deck {i}" for i in range(rows)],
+        '현재가격($)': [float(i) for i in range(rows)],
+        '제조사': ["Bicycle"] * rows,
+    })})
+
+
+def two_stores(storage):
+    seed(storage)
+    stores = open_store("", storage), open_store("", storage)
+    for store in stores:
+        store.refresh()
+    return stores
+
+
+def seen(store, row_id):
+    """사용자가 화면에서 본 행"""
+    cards = store.table('card_collection')
+    return cards[cards[ROW_ID] == row_id].iloc[0].to_dict()
+
+
+def reopen(storage):
+    store = open_store("", storage)
+    store.refresh()
+    return store.table('card_collection')
+
+
+@pytest.mark.parametrize("storage", STORAGES)
+def test_stale_edit_applies_nothing(workdir, storage):
+    mine, other = two_stores(storage)
+    row = seen(mine, 1)
+    other.append([('edit', 'card_collection', [(1, {'현재가격($)': 50.0})])])
+    with pytest.raises(WriteConflict):
+        mine.append([('insert', 'card_collection', {'카드명': "Mine", '현재가격($)': 1.0}),
+                     ('edit', 'card_collection', [(1, {'현재가격($)': 9.0})])],
+                    [None, [row]])
+    # 같은 묶음의 추가도 기록되지 않고, 화면은 최신 데이터로 바뀐다
+    for cards in (mine.table('card_collection'), reopen(storage)):
+        assert cards['카드명'].tolist() == [f"Deck {i}" for i in range(5)]
+        assert cards.loc[cards[ROW_ID] == 1, '현재가격($)'].item() == 50.0
+
+
+@pytest.mark.parametrize("storage", STORAGES)
+def test_stale_remove_raises(workdir, storage):
+    mine, other = two_stores(storage)
+    row = seen(mine, 3)
+    other.append([('edit', 'card_collection', [(3, {'카드명': "Renamed"})])])
+    with pytest.raises(WriteConflict):
+        mine.append([('remove', 'card_collection', [3])], [[row]])
+    assert 3 in reopen(storage)[ROW_ID].tolist()
+
+
+@pytest.mark.parametrize("storage", STORAGES)
+def test_remove_of_deleted_row_is_skipped(workdir, storage):
+    mine, other = two_stores(storage)
+    rows = [seen(mine, 2), seen(mine, 4)]
+    other.append([('remove', 'card_collection', [2])])
+    mine.append([('remove', 'card_collection', [2, 4])], [rows])
+    assert reopen(storage)[ROW_ID].tolist() == [0, 1, 3]
+    assert mine.dashboard_stats().rows['card_collection'] == 3
+
+
+@pytest.mark.parametrize("storage", STORAGES)
+def test_edit_of_deleted_row_raises(workdir, storage):
+    mine, other = two_stores(storage)
+    other.append([('remove', 'card_collection', [2])])
+    with pytest.raises(WriteConflict):
+        mine.append([('edit', 'card_collection', [(2, {'현재가격($)': 9.0})])])
+    assert reopen(storage)[ROW_ID].tolist() == [0, 1, 3, 4]
+
+
+def test_positional_delete_follows_moved_row(workdir):
+    mine, other = two_stores('journal')
+    row = seen(mine, 3)
+    other.append([('remove', 'card_collection', [0])])
+    # 예전 방식(행 위치) 삭제는 앞 행이 지워져 옮겨간 행을 찾아 지운다
+    mine.append([('delete', 'card_collection', 3)], [row])
+    assert reopen('journal')['카드명'].tolist() == ["Deck 1", "Deck 2", "Deck 4"]
@@ -0,0 +1,68 @@
+import random
+
+import pandas as pd
+import pytest
+
+from card_magic_core import (
+    NUMERIC_COLUMNS, ROW_ID, STATS_TOP, TABLE_COLUMNS, DashboardStats, open_store,
+)
+
+
+def assert_same_stats(live, fresh):
+    assert live.rows == fresh.rows
+    for table, columns in fresh.sums.items():
+        for column, (total, count) in columns.items():
+            assert live.sums[table][column][1] == count
+            assert live.sums[table][column][0] == pytest.approx(total, abs=1e-6)
+    assert live.counts == fresh.counts
+    assert live.high_priority == fresh.high_priority
+    for table, (_, _, columns) in STATS_TOP.items():
+        assert [(e[ROW_ID], e[columns[0]]) for e in live.top[table]] == \
+            [(e[ROW_ID], e[columns[0]]) for e in fresh.top[table]]
+
+
+def recompute(store):
+    return DashboardStats.from_tables({name: store.table(name) for name in TABLE_COLUMNS})
+
+
+def random_row(rng, table, i):
+    row = {
+        '카드명': f"c{i}", '구매가격($)': rng.uniform(1, 9), '현재가격($)': rng.uniform(1, 9),
+        '제조사': rng.choice("ABC"), '개봉여부': rng.choice(["개봉", "미개봉"]), '디자인별점': rng.choice([1.0, 3.5, 5.0]),
+        '이름': f"w{i}", '타입': "카드", '가격($)': rng.uniform(1, 9), '우선순위': rng.choice([1.0, 4.0, 5.0]),
+        '마술명': f"m{i}", '신기함정도': rng.choice([1.0, 2.0, 4.5, 5.0]), '난이도': rng.choice([1.0, 3.0]),
+    }
+    return {column: value for column, value in row.items() if column in TABLE_COLUMNS[table]}
+
+
+def random_record(rng, store, step):
+    table = rng.choice(list(TABLE_COLUMNS))
+    ids = store.table(table)[ROW_ID].tolist()
+    r = rng.random()
+    if r < 0.45 or not ids:
+        return ('insert', table, random_row(rng, table, step))
+    if r < 0.6:
+        return ('extend', table, pd.DataFrame([random_row(rng, table, step * 100 + k) for k in range(rng.randint(1, 6))]))
+    if r < 0.8:
+        return ('remove', table, rng.sample(ids, min(len(ids), rng.randint(1, 4))))
+    column = STATS_TOP[table][0] if table in STATS_TOP else '현재가격($)'
+    value = rng.choice([1.0, 4.0, 5.0]) if column in NUMERIC_COLUMNS else "X"
+    return ('edit', table, [(row_id, {column: value}) for row_id in rng.sample(ids, min(len(ids), 3))])
+
+
+@pytest.mark.parametrize('storage', ['journal', 'pickle', 'sqlite'])
+def test_incremental_stats_match_recompute(workdir, storage):
+    rng = random.Random(7)
+    store = open_store("", storage)
+    store.refresh()
+    for step in range(150):
+        store.append([random_record(rng, store, step)])
+        if step % 25 == 0:
+            assert_same_stats(store.dashboard_stats(), recompute(store))
+    assert_same_stats(store.dashboard_stats(), recompute(store))
+
+    # 저장된 집계를 다시 읽어도 같아야 한다
+    reloaded = open_store("", storage)
+    reloaded.refresh()
+    assert_same_stats(reloaded.dashboard_stats(), recompute(reloaded))
+    assert_same_stats(reloaded.dashboard_stats(), store.dashboard_stats())
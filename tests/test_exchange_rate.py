@@ -0,0 +1,20 @@
+import card_magic_core
+from card_magic_core import EXCHANGE_RATE_FILE, ExchangeRateProvider
+
+
+def test_rate_cache_lives_in_data_dir(workdir, monkeypatch):
+    data_dir = workdir / "data"
+    data_dir.mkdir()
+    monkeypatch.setattr(card_magic_core, 'DATA_DIR', str(data_dir))
+    provider = ExchangeRateProvider(lambda: {'USD': 1.0, 'KRW': 1400.0})
+    assert provider.refresh()
+    assert (data_dir / EXCHANGE_RATE_FILE).exists()
+    assert not (workdir / EXCHANGE_RATE_FILE).exists()
+
+    # 다른 폴더에서 실행해도 같은 캐시를 읽는다
+    other = workdir / "elsewhere"
+    other.mkdir()
+    monkeypatch.chdir(other)
+    cached = ExchangeRateProvider(lambda: {})
+    assert cached.get_rates()['KRW'] == 1400.0
+    assert cached.updated_at == provider.updated_at
@@ -0,0 +1,21 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from card_magic_core import ImageStore
+
+
+def test_core_import_does_not_load_pillow():
+    code = "import sys, card_magic_core; print('PIL' in sys.modules)"
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
+
+
+def test_put_without_pillow(workdir, monkeypatch):
+    monkeypatch.setitem(sys.modules, 'PIL', None)
+    store = ImageStore(str(workdir / "images"))
+    with pytest.raises(RuntimeError, match="Pillow"):
+        store.put(b"not an image")
@@ -0,0 +1,61 @@
+import io
+
+import pytest
+
+from card_magic_core import Library, open_store
+
+
+CSV = """name,price,brand,status
+Bicycle Rider,3.5,Bicycle,개봉
+,9,NoName,
+Tally-Ho,abc,Orbit,unknown
+Fontaine,12,Phoenix,미개봉
+Bee,-1,Orbit,
+"""
+
+
+@pytest.mark.parametrize('storage', ['journal', 'sqlite', 'pickle'])
+def test_import_in_chunks(workdir, monkeypatch, storage):
+    library = Library.open("", storage)
+    writes = []
+    append = library.store.append
+    monkeypatch.setattr(library.store, 'append', lambda records, *args: writes.append(records) or append(records, *args))
+    report = library.import_file('card_collection', io.StringIO(CSV), "cards.csv", chunksize=2)
+    # 청크가 여러 개여도 목록 갱신과 행 추가를 한 번에 기록한다
+    assert [[op for op, _, _ in records] for records in writes] == [['list', 'extend']]
+    assert report['rows'] == 4
+    assert report['skipped'] == 1
+    # 여러 청크에 나온 Orbit도 한 번만 등록한다
+    assert report['new_names'] == ["Orbit", "Phoenix"]
+
+    store = open_store("", storage)
+    store.refresh()
+    cards = store.table('card_collection')
+    assert cards['카드명'].tolist() == ["Bicycle Rider", "Tally-Ho", "Fontaine", "Bee"]
+    assert cards['구매가격($)'].tolist() == [3.5, 0.0, 12.0, 0.0]
+    assert cards['개봉여부'].astype(object).tolist() == ["개봉", "미개봉", "미개봉", "미개봉"]
+    assert store.dashboard_stats().rows['card_collection'] == 4
+    manufacturers = Library(store).lists()['manufacturers']
+    assert {"Orbit", "Phoenix", "Bicycle"} <= set(manufacturers)
+    assert manufacturers.count("Orbit") == 1
+
+
+def test_import_empty_file(workdir):
+    library = Library.open("", 'journal')
+    report = library.import_file('wishlist', io.StringIO("name,price\n"), "wish.csv")
+    assert report['rows'] == 0 and report['new_names'] == []
+    assert len(library.store.table('wishlist')) == 0
+
+
+@pytest.mark.parametrize('storage', ['journal', 'sqlite'])
+def test_import_error_adds_nothing(workdir, storage):
+    library = Library.open("", storage)
+    before = library.lists()['manufacturers']
+    broken = CSV + "Broken,1,Orbit,개봉,extra,fields\n"
+    with pytest.raises(ValueError):
+        library.import_file('card_collection', io.StringIO(broken), "cards.csv", chunksize=2)
+    # 앞 청크까지 검증했더라도 아무것도 기록하지 않는다
+    store = open_store("", storage)
+    store.refresh()
+    assert len(store.table('card_collection')) == 0
+    assert Library(store).lists()['manufacturers'] == before
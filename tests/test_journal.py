@@ -0,0 +1,83 @@
+import os
+
+import pandas as pd
+
+import card_magic_core
+from card_magic_core import ROW_ID, TABLE_COLUMNS, Library, open_store
+
+
+def reopen(storage='journal'):
+    store = open_store("", storage)
+    store.refresh()
+    return store
+
+
+def test_partial_rows_keep_table_columns(workdir):
+    # 스냅샷 없이 저널의 첫 레코드가 일부 컬럼만 가진 행일 때
+    library = Library.open("", 'journal')
+    library.repository('card_collection').add({'카드명': "Bee", '현재가격($)': 3.0, '제조사': "USPCC"})
+    library.repository('wishlist').add_many(pd.DataFrame({'이름': ["Bicycle Gold"], '가격($)': [12.0]}))
+    store = reopen()
+    cards = store.table('card_collection')
+    assert list(cards.columns) == TABLE_COLUMNS['card_collection'] + [ROW_ID]
+    assert cards['구매가격($)'].isna().all()
+    assert cards['현재가격($)'].tolist() == [3.0]
+    wishes = store.table('wishlist')
+    assert list(wishes.columns) == TABLE_COLUMNS['wishlist'] + [ROW_ID]
+    assert wishes['이름'].tolist() == ["Bicycle Gold"]
+
+
+def test_replay_matches_live_store(workdir):
+    store = open_store("", 'journal')
+    store.refresh()
+    store.append([('extend', 'card_collection', pd.DataFrame({
+        '카드명': ["A", "B", "C", "D"], '현재가격($)': [1.0, 2.0, 3.0, 4.0], '제조사': ["Bicycle"] * 4,
+    }))])
+    store.append([('insert', 'card_collection', {'카드명': "E", '현재가격($)': 5.0, '제조사': "Theory11"})])
+    store.append([('remove', 'card_collection', [1, 3])])
+    store.append([('edit', 'card_collection', [(2, {'현재가격($)': 30.0, '제조사': "Fontaine"})])])
+    store.append([('list', 'manufacturers', ["Bicycle", "Orbit"])])
+    assert os.path.exists("card_magic_data.pkl.wal")
+
+    replayed = reopen()
+    live = store.table('card_collection')
+    cards = replayed.table('card_collection')
+    assert cards[ROW_ID].tolist() == live[ROW_ID].tolist() == [0, 2, 4]
+    assert cards['카드명'].tolist() == ["A", "C", "E"]
+    assert cards['현재가격($)'].tolist() == [1.0, 30.0, 5.0]
+    assert cards['제조사'].astype(object).tolist() == ["Bicycle", "Fontaine", "Theory11"]
+    assert "Orbit" in replayed.lists['manufacturers']
+    # 삭제된 행의 ID는 다시 쓰지 않는다
+    applied = replayed.append([('insert', 'card_collection', {'카드명': "F"})])
+    assert applied[0][2][ROW_ID] == 5
+
+
+def test_journal_compacts_into_snapshot(workdir, monkeypatch):
+    monkeypatch.setattr(card_magic_core, 'JOURNAL_COMPACT_THRESHOLD', 10)
+    store = open_store("", 'journal')
+    store.refresh()
+    for i in range(9):
+        store.append([('insert', 'wishlist', {'이름': f"w{i}", '가격($)': float(i)})])
+    assert os.path.exists("card_magic_data.pkl.wal")
+    store.append([('insert', 'wishlist', {'이름': "w9", '가격($)': 9.0})])
+    # 10번째 레코드에서 스냅샷으로 압축되고 저널은 지워진다
+    assert not os.path.exists("card_magic_data.pkl.wal")
+    assert os.path.exists("card_magic_data.pkl")
+    store.append([('remove', 'wishlist', [0])])
+    assert os.path.exists("card_magic_data.pkl.wal")
+
+    reloaded = reopen()
+    assert reloaded.table('wishlist')['이름'].tolist() == [f"w{i}" for i in range(1, 10)]
+    assert reloaded.dashboard_stats().rows['wishlist'] == 9
+
+
+def test_torn_journal_record_is_dropped(workdir):
+    store = open_store("", 'journal')
+    store.refresh()
+    store.append([('insert', 'magic_list', {'마술명': "Ambitious Card"})])
+    with open("card_magic_data.pkl.wal", 'ab') as f:
+        f.write(b"\x80\x05\x95garbage")
+    reloaded = reopen()
+    assert reloaded.table('magic_list')['마술명'].tolist() == ["Ambitious Card"]
+    reloaded.append([('insert', 'magic_list', {'마술명': "Triumph"})])
+    assert reopen().table('magic_list')['마술명'].tolist() == ["Ambitious Card", "Triumph"]
@@ -0,0 +1,96 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from card_magic_core import PRICE_COLUMNS, PRICE_LEGACY_FILE, PRICE_SERIES_FILE, ROW_ID, PriceHistory, open_store
+
+
+def test_append_after_torn_write_keeps_columns_aligned(tmp_path):
+    prices = PriceHistory(str(tmp_path))
+    prices.record([(0, "Bee", 3.0, 1, "USPCC")], day=1)
+    prices.record([(1, "Bicycle", 10.0, 1, "Bicycle")], day=2)
+    # 'day'와 'card' 파일에만 한 행이 기록되고 끊긴 경우
+    for column in ('day', 'card'):
+        with open(prices._file(column), 'ab') as f:
+            f.write(np.zeros(1, PRICE_COLUMNS[column]).tobytes())
+    assert len(PriceHistory(str(tmp_path))) == 2
+
+    prices = PriceHistory(str(tmp_path))
+    prices.record([(0, None, 5.0, 1, None)], day=3)
+    sizes = {column: os.path.getsize(prices._file(column)) // np.dtype(dtype).itemsize
+             for column, dtype in PRICE_COLUMNS.items()}
+    assert set(sizes.values()) == {3}
+    history = PriceHistory(str(tmp_path)).history()
+    assert history['카드명'].tolist() == ["Bee", "Bicycle", "Bee"]
+    assert history['가격($)'].tolist() == [3.0, 10.0, 5.0]
+    assert history['일자'].dt.day.tolist() == [2, 3, 4]  # 1970-01-01부터 일수
+
+
+def test_new_card_after_torn_series_line(tmp_path):
+    prices = PriceHistory(str(tmp_path))
+    prices.record([(0, "Bee", 3.0, 1, "USPCC")], day=1)
+    with open(os.path.join(str(tmp_path), PRICE_SERIES_FILE), 'a', encoding='utf-8') as f:
+        f.write('[1, "Tally')
+    prices = PriceHistory(str(tmp_path))
+    prices.record([(1, "Bicycle", 10.0, 1, "Bicycle"), (2, "Fontaine", 20.0, 1, "Fontaine")], day=2)
+    history = PriceHistory(str(tmp_path)).history()
+    assert history['카드명'].tolist() == ["Bee", "Bicycle", "Fontaine"]
+    assert history['제조사'].tolist() == ["USPCC", "Bicycle", "Fontaine"]
+
+
+def test_same_name_decks_keep_separate_series(tmp_path):
+    prices = PriceHistory(str(tmp_path))
+    cards = pd.DataFrame({ROW_ID: [0, 1], '카드명': ["Bicycle", "Bicycle"],
+                          '현재가격($)': [5.0, 50.0], '제조사': ["Bicycle", "Bicycle"]})
+    prices.observe(cards, day=1)
+    # 한 덱만 값이 오르고, 다른 덱은 지운다
+    prices.record([(0, None, 7.0, 1, None), (1, None, None, 0, None)], day=2)
+
+    history = PriceHistory(str(tmp_path)).history(["Bicycle"])
+    assert history[ROW_ID].tolist() == [0, 1, 0, 1]
+    assert history['가격($)'].tolist() == [5.0, 50.0, 7.0, 50.0]
+    assert history['수량'].tolist() == [1, 1, 1, 0]
+    assert PriceHistory(str(tmp_path)).history(row_ids=[1])['가격($)'].tolist() == [50.0, 50.0]
+    assert PriceHistory(str(tmp_path)).portfolio(end=2).tolist() == [55.0, 7.0]
+
+
+def test_rename_keeps_series_and_updates_display_name(tmp_path):
+    prices = PriceHistory(str(tmp_path))
+    prices.record([(3, "Bee", 3.0, 1, "USPCC")], day=1)
+    prices.record([(3, "Bee Red", 3.0, 1, None)], day=2)
+    prices.record([(3, None, 4.0, 1, None)], day=3)
+    history = PriceHistory(str(tmp_path)).history()
+    assert history[ROW_ID].tolist() == [3, 3]
+    assert history['카드명'].tolist() == ["Bee Red", "Bee Red"]
+    assert history['제조사'].tolist() == ["USPCC", "USPCC"]
+
+
+def test_store_records_prices_by_row_id(workdir):
+    store = open_store("", 'journal')
+    store.refresh()
+    store.append([('extend', 'card_collection', pd.DataFrame({
+        '카드명': ["Bicycle", "Bicycle", "Bee"], '현재가격($)': [5.0, 6.0, 3.0], '제조사': ["Bicycle", "Bicycle", "USPCC"],
+    }))])
+    store.append([('edit', 'card_collection', [(1, {'현재가격($)': 60.0})])])
+    store.append([('remove', 'card_collection', [0])])
+
+    history = store.price_history().history(["Bicycle"])
+    assert history[ROW_ID].tolist() == [0, 1, 1, 0]
+    assert history['가격($)'].tolist() == [5.0, 6.0, 60.0, 5.0]
+    assert history['수량'].tolist() == [1, 1, 1, 0]
+    assert store.price_history().portfolio().iloc[-1] == 63.0
+
+
+def test_name_keyed_history_is_set_aside(tmp_path):
+    path = tmp_path / "prices"
+    path.mkdir()
+    (path / PRICE_LEGACY_FILE).write_text('[0, "Bee", "USPCC"]\n', encoding='utf-8')
+    for column, dtype in PRICE_COLUMNS.items():
+        (path / f"{column}.bin").write_bytes(np.ones(1, dtype).tobytes())
+
+    prices = PriceHistory(str(path))
+    assert len(prices) == 0
+    prices.record([(0, "Bicycle", 10.0, 1, "Bicycle")], day=1)
+    assert PriceHistory(str(path)).history()['카드명'].tolist() == ["Bicycle"]
+    assert (tmp_path / "prices.by_name" / PRICE_LEGACY_FILE).exists()
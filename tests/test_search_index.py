@@ -0,0 +1,41 @@
+import pandas as pd
+
+from card_magic_core import SearchIndex
+
+
+def make_index(frame, fields=('이름', '비고')):
+    index = SearchIndex(list(fields))
+    index.extend(frame)
+    return index
+
+
+def test_extend_matches_add():
+    frame = pd.DataFrame({'이름': ["Bicycle Rider", "바이시클 덱", "Tally-Ho"], '비고': ["red", "", "fan"]})
+    bulk = make_index(frame)
+    single = SearchIndex(['이름', '비고'])
+    for row in frame.to_dict('records'):
+        single.add(row)
+    assert {key: list(value) for key, value in bulk.postings.items()} == \
+        {key: list(value) for key, value in single.postings.items()}
+    for query in ["bicycle", "ㅂㅇㅅㅋ", "ho", "red", "x"]:
+        assert bulk.search(query) == single.search(query)
+
+
+def test_extend_all_empty_column():
+    # 빈 text_area로 추가한 비고처럼 모든 행이 빈 값인 컬럼
+    frame = pd.DataFrame({'이름': ["Bicycle", "Tally-Ho"], '비고': ["", None]})
+    index = make_index(frame)
+    assert not any(field == 1 for field, _ in index.postings)
+    assert list(index.search("tally")) == [1]
+    index.extend(pd.DataFrame({'이름': ["Bee"], '비고': [""]}))
+    assert list(index.search("bee")) == [2]
+
+
+def test_remove_and_replace():
+    index = make_index(pd.DataFrame({'이름': ["Bicycle", "Bee", "Tally-Ho"], '비고': ["", "", ""]}))
+    index.remove([0])
+    assert list(index.search("bicycle")) == []
+    assert list(index.search("bee")) == [0]
+    index.replace(1, {'이름': "Bicycle Gold", '비고': "gold"})
+    assert list(index.search("gold")) == [1]
+    assert list(index.search("tally")) == []
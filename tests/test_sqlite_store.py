@@ -0,0 +1,54 @@
+import pandas as pd
+
+from card_magic_core import ROW_ID, TableQuery, open_store
+
+
+def seed(rows=5):
+    store = open_store("", 'sqlite')
+    store.put({'card_collection': pd.DataFrame({
+        '카드명': [f"Deck {i}" for i in range(rows)],
+        '현재가격($)': [float(i) for i in range(rows)],
+        '제조사': ["Bicycle"] * rows,
+    })})
+
+
+def test_open_reads_counts_not_tables(workdir):
+    seed()
+    store = open_store("", 'sqlite')
+    store.refresh()
+    assert set(store.lazy) == {'card_collection', 'wishlist', 'magic_list'}
+    assert store.dashboard_stats().rows['card_collection'] == 5
+    query = TableQuery(store, 'card_collection', [('현재가격($)', '>=', 2.0)], '현재가격($)', ascending=False)
+    assert query.count() == 3
+    assert query.page(0, 2)['카드명'].tolist() == ["Deck 4", "Deck 3"]
+    # 목록 조회만으로는 표를 읽지 않는다
+    assert 'card_collection' in store.lazy
+    assert store.table('card_collection')['카드명'].tolist() == [f"Deck {i}" for i in range(5)]
+    assert 'card_collection' not in store.lazy
+
+
+def test_lazy_table_rereads_after_other_writer(workdir):
+    seed()
+    store = open_store("", 'sqlite')
+    store.refresh()
+    other = open_store("", 'sqlite')
+    other.refresh()
+    other.append([('insert', 'card_collection', {'카드명': "Other", '현재가격($)': 1.0})])
+    # 로드 뒤 다른 프로세스가 기록한 표는 다시 로드해서 읽는다
+    assert store.table('card_collection')['카드명'].tolist()[-1] == "Other"
+    assert store.dashboard_stats().rows['card_collection'] == 6
+
+
+def test_write_to_lazy_table_keeps_ids(workdir):
+    seed()
+    store = open_store("", 'sqlite', autosave=3600)
+    store.refresh()
+    applied = store.append([('insert', 'card_collection', {'카드명': "New", '현재가격($)': 9.0})])
+    assert applied[0][2][ROW_ID] == 5
+    other = open_store("", 'sqlite')
+    other.refresh()
+    other.append([('remove', 'card_collection', [0])])
+    store.flush()
+    check = open_store("", 'sqlite')
+    check.refresh()
+    assert check.table('card_collection')['카드명'].tolist() == [f"Deck {i}" for i in range(1, 5)] + ["New"]
@@ -0,0 +1,49 @@
+import pytest
+
+from card_magic_core import TableQuery, open_store
+
+
+def add_card(store, name, price):
+    store.append([('insert', 'card_collection', {'카드명': name, '구매가격($)': price, '현재가격($)': price})])
+
+
+@pytest.mark.parametrize('storage', ['sqlite', 'journal'])
+def test_query_sees_pending_and_flushed_rows(workdir, storage):
+    # 자동 저장 간격을 길게 잡아 flush()를 직접 부른다
+    store = open_store("", storage, autosave=3600)
+    store.refresh()
+    add_card(store, "Bicycle", 10.0)
+    query = TableQuery(store, 'card_collection', [], '카드명')
+    assert store.dirty
+    assert query.count() == 1
+    assert query.aggregate('sum', '현재가격($)') == 10.0
+    assert query.page(0, 10)['카드명'].tolist() == ["Bicycle"]
+
+    store.flush()
+    assert not store.pending
+    query = TableQuery(store, 'card_collection', [], '카드명')
+    assert query.count() == 1
+    assert query.page(0, 10)['카드명'].tolist() == ["Bicycle"]
+
+    add_card(store, "Bee", 5.0)
+    store.flush()
+    query = TableQuery(store, 'card_collection', [], '카드명')
+    assert query.count() == 2
+    assert query.aggregate('sum', '현재가격($)') == 15.0
+    assert query.page(0, 10)['카드명'].tolist() == ["Bee", "Bicycle"]
+
+
+def test_sqlite_count_cached_before_flush(workdir):
+    store = open_store("", 'sqlite', autosave=3600)
+    store.refresh()
+    add_card(store, "Bicycle", 10.0)
+    store.flush()
+    # 기록이 끝난 표는 SQL로 세고, 그 결과는 다음 기록 뒤에 다시 센다
+    assert TableQuery(store, 'card_collection', [], None).count() == 1
+    add_card(store, "Bee", 5.0)
+    assert TableQuery(store, 'card_collection', [], None).count() == 2
+    store.flush()
+    assert TableQuery(store, 'card_collection', [], None).count() == 2
+    other = open_store("", 'sqlite')
+    other.refresh()
+    assert TableQuery(other, 'card_collection', [('현재가격($)', '>=', 6.0)], None).count() == 1